@@ -1,204 +1,601 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Blueprint, Flask, Response, current_app, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
-from Crypto.PublicKey import RSA
-from Crypto.Cipher import PKCS1_v1_5, AES
-from Crypto.Util.Padding import unpad
-import base64
+import numpy as np
+import atexit
+import csv
+import io
 import json
 import os
+import sys
+
+# Backend modules live under app/ and are imported flat
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+for _subdir in ('models', 'utils'):
+    sys.path.insert(0, os.path.join(BASE_DIR, 'app', _subdir))
+
 import codigoia # Import the AI module
+import compression
+import jsonio
+import metrics
+import profiling
+import storage
+from record_cache import RecordCache
+from validation import PREDICTION_SIGNATURE_FIELD, RECORD_FIELDS, validate_record
+from jobs import JobManager
+from crypto_context import DecryptionContext, DecryptionError, SessionExpired
+import write_behind
 
-app = Flask(__name__)
-CORS(app)  # Enable CORS for all routes
+# Routes are registered on a blueprint; create_app() builds the Flask app and
+# the per-process state below. Production servers use wsgi.py (see gunicorn.conf.py)
+api = Blueprint('edu_select', __name__)
 
-# --- RSA Key Generation ---
-# In a real app, you might load these from files.
-# Here we generate them on startup for simplicity.
-key = RSA.generate(2048)
-private_key = key
-public_key = key.publickey().export_key().decode('utf-8')
-private_key_pem = key.export_key().decode('utf-8')
+# Set by create_app(). Each worker process owns its copies; anything shared
+# between workers (records, model artifacts, RSA key, job state) lives on disk.
+crypto = None
+public_key = None
+store = None
+records_cache = None
+jobs = None
 
-cipher_rsa = PKCS1_v1_5.new(private_key)
 
-DB_FILE = 'base_del_proto.json'
+def create_app(load_model=True):
+    """
+    Build the Flask app: RSA key, record store, caches, job manager and, unless
+    `load_model` is False, the AI model.
 
-# Train the model on startup
-print("Entrenando modelo de IA...")
-try:
-    codigoia.train_model()
-except Exception as e:
-    print(f"Error entrenando modelo: {e}")
+    Call it once per process before forking workers (gunicorn's preload_app)
+    so the model weights are loaded once and shared copy-on-write.
+    """
+    global crypto, public_key, store, records_cache, jobs
 
-def load_db():
-    if not os.path.exists(DB_FILE):
-        return []
-    try:
-        with open(DB_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Error loading DB: {e}")
-        return []
+    app = Flask(__name__)
+    # orjson-backed jsonify/request.json (see jsonio.py); stdlib json if orjson is missing
+    app.json = jsonio.FastJSONProvider(app)
+    CORS(app)  # Enable CORS for all routes
+    app.register_blueprint(api)
 
-def save_db(data):
-    try:
-        with open(DB_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
-    except Exception as e:
-        print(f"Error saving DB: {e}")
+    # --- RSA Key ---
+    # Loaded from keys/private.pem (generated on first start) so every worker serves
+    # the same public key; the cipher objects are built once and reused per request
+    crypto = DecryptionContext.from_file()
+    public_key = crypto.public_key_pem
+
+    # Applicant records (SQLite by default, see storage.open_store)
+    store = storage.open_store()
+    if write_behind.ENABLED:
+        # Registrations are logged and acknowledged at once, then group-committed (see write_behind.py)
+        store = write_behind.WriteBehindStore(store)
+        atexit.register(store.flush)
+    # Parsed records and the serialized GET /api/records body, reused until the store changes
+    records_cache = RecordCache(store, jsonio.dumps)
+
+    # Background jobs (predict_all) with progress polling and cancellation
+    jobs = JobManager()
+
+    # Request latency/status histograms, hot-path stage timings and scrape-time gauges (GET /metrics)
+    metrics.instrument_app(app)
+    codigoia.set_timing_observer(metrics.observe_stage)
+    register_gauges()
+    # Opt-in cProfile/tracemalloc dumps of slow requests (EDU_PROFILE, see profiling.py)
+    profiling.instrument_app(app)
+    # gzip/brotli bodies for clients that accept them (see compression.py)
+    compression.instrument_app(app)
+
+    if load_model:
+        # Load the saved model on startup (trains only if the spreadsheet changed)
+        # Force a retrain with: python codigoia.py --retrain
+        print("Cargando modelo de IA...")
+        try:
+            codigoia.load_or_train_model()
+        except Exception as e:
+            print(f"Error cargando modelo: {e}")
+
+    return app
+
+def _db_size_bytes():
+    # SQLite keeps recent writes in the -wal file until the next checkpoint
+    return sum(os.path.getsize(path) for path in (store.path, f"{store.path}-wal") if os.path.exists(path))
+
+def register_gauges():
+    metrics.REGISTRY.gauge('edu_records', 'Records in the store', lambda: store.count())
+    metrics.REGISTRY.gauge('edu_db_size_bytes', 'Size of the record store on disk', _db_size_bytes)
+    metrics.REGISTRY.gauge('edu_prediction_cache', 'Prediction cache counters (this process)',
+                           lambda: {k: v for k, v in codigoia.prediction_cache_stats().items()
+                                    if k in ('hits', 'misses', 'size')}, ('stat',))
+    metrics.REGISTRY.gauge('edu_inference_batches', 'Micro-batches run by the inference broker (this process)',
+                           lambda: codigoia.inference_broker_stats()['batches'])
+    metrics.REGISTRY.gauge('edu_inference_batch_size_avg', 'Average inference broker batch size (this process)',
+                           lambda: codigoia.inference_broker_stats()['avg_batch_size'])
 
-@app.route('/')
+@api.route('/metrics', methods=['GET'])
+def get_metrics():
+    # Prometheus text exposition format
+    return Response(metrics.REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+@api.route('/')
 def index():
     return send_from_directory('.', 'index.html')
 
-@app.route('/admin')
+@api.route('/admin')
 def admin():
     return send_from_directory('.', 'admin.html')
 
-@app.route('/api/records', methods=['GET'])
+# GET /api/records pagination: ?limit=&cursor=&sort=[-]field&fields=a,b plus {field}=value filters
+# on storage.INDEXED_FIELDS; without any of these the whole list is returned
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+PAGINATION_PARAMS = ('limit', 'cursor', 'sort', 'fields')
+
+@api.route('/api/records', methods=['GET'])
 def get_records():
-    return jsonify(load_db())
+    # Other parameters (e.g. a ?_= cache buster) keep the legacy full list
+    if any(k in PAGINATION_PARAMS or k in storage.INDEXED_FIELDS for k in request.args):
+        return get_records_page()
+
+    body, etag = records_cache.response()
+    response = current_app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    # Browsers revalidate on every poll; an unchanged table gets a 304 with no body
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+def get_records_page():
+    try:
+        limit = int(request.args.get('limit', PAGE_SIZE))
+        if limit < 1:
+            raise ValueError("limit must be positive")
+        limit = min(limit, MAX_PAGE_SIZE)
+        sort = request.args.get('sort', 'ID')
+        descending = sort.startswith('-')
+        filters = {k: v for k, v in request.args.items() if k in storage.INDEXED_FIELDS}
+        # Stores without indexes (the JSON file) are paged from the cached, encoded table
+        source = store if store.indexed else records_cache.table()
+        records, next_cursor = source.query(
+            filters, sort.lstrip('-'), descending, limit, request.args.get('cursor')
+        )
+    except ValueError as e:
+        return jsonify({'msg': f'Invalid query: {e}'}), 400
 
-@app.route('/api/records/<int:id>', methods=['PUT'])
+    fields = request.args.get('fields')
+    if fields:
+        # Projection: only the requested fields (ID is always included)
+        keep = ['ID'] + [f for f in fields.split(',') if f and f != 'ID']
+        records = [{f: r[f] for f in keep if f in r} for r in records]
+
+    return jsonify({'records': records, 'next_cursor': next_cursor})
+
+# Bulk export/import work in batches so memory stays flat regardless of table size
+EXPORT_BATCH_SIZE = 1000
+IMPORT_BATCH_SIZE = 1000
+MAX_IMPORT_ERRORS = 100
+
+@api.route('/api/records/export', methods=['GET'])
+def export_records():
+    fmt = request.args.get('format', 'ndjson')
+    if fmt == 'ndjson':
+        mimetype = 'application/x-ndjson'
+
+        def generate():
+            lines = []
+            for record in store.iter_records(EXPORT_BATCH_SIZE):
+                lines.append(jsonio.dumps_str(record) + '\n')
+                if len(lines) == EXPORT_BATCH_SIZE:
+                    yield ''.join(lines)
+                    lines = []
+            yield ''.join(lines)
+    elif fmt == 'csv':
+        mimetype = 'text/csv'
+        fields = request.args.get('fields')
+        columns = ['ID'] + [f for f in (fields.split(',') if fields else RECORD_FIELDS + ['Prediccion_IA']) if f and f != 'ID']
+
+        def generate():
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction='ignore')
+            writer.writeheader()
+            for i, record in enumerate(store.iter_records(EXPORT_BATCH_SIZE), 1):
+                writer.writerow(record)
+                if i % EXPORT_BATCH_SIZE == 0:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+            yield buffer.getvalue()
+    else:
+        return jsonify({'msg': 'Unsupported format (use ndjson or csv)'}), 400
+
+    response = current_app.response_class(stream_with_context(generate()), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename=registros.{fmt}'
+    return response
+
+@api.route('/api/records/import', methods=['POST'])
+def import_records():
+    """
+    Import an NDJSON body (one record per line), read as a stream.
+
+    Valid rows are scored with one batched prediction and inserted every
+    IMPORT_BATCH_SIZE rows. New IDs are assigned unless ?keep_ids=1, which
+    keeps (and overwrites) the IDs in the file.
+    """
+    keep_ids = request.args.get('keep_ids') in ('1', 'true')
+    batch = []
+    imported = 0
+    failed = 0
+    errors = []
+
+    def flush():
+        """Score and save the batch; returns how many records were saved."""
+        records = [record for record, _ in batch]
+        for record, prediction in zip(records, codigoia.predict_batch(records)):
+            record.update(prediction_fields(record, prediction))
+        if keep_ids:
+            store.import_records([dict(record, ID=record_id) for record, record_id in batch if record_id is not None])
+            store.insert_many([record for record, record_id in batch if record_id is None])
+        else:
+            store.insert_many(records)
+        batch.clear()
+        return len(records)
+
+    try:
+        for line_no, line in enumerate(request.stream, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                data = jsonio.loads(line)
+                record = validate_record(data)
+            except ValueError as e:
+                failed += 1
+                if len(errors) < MAX_IMPORT_ERRORS:
+                    errors.append({'line': line_no, 'msg': str(e)})
+                continue
+            record_id = data.get('ID') if keep_ids and isinstance(data.get('ID'), int) else None
+            batch.append((record, record_id))
+            if len(batch) == IMPORT_BATCH_SIZE:
+                imported += flush()
+        if batch:
+            imported += flush()
+    except Exception as e:
+        print(f"Error importing records: {e}")
+        metrics.count_error('server')
+        return jsonify({'msg': 'Server error importing records', 'imported': imported}), 500
+
+    return jsonify({
+        'msg': f'{imported} registros importados',
+        'imported': imported,
+        'failed': failed,
+        'errors': errors,
+    }), 200
+
+@api.route('/api/records/<int:id>', methods=['GET'])
+def get_record(id):
+    record = store.get(id)
+    if record is None:
+        return jsonify({'msg': 'Registro no encontrado'}), 404
+    return jsonify(record)
+
+@api.route('/api/records/<int:id>', methods=['PUT'])
 def update_record(id):
     try:
         data = request.json
-        db = load_db()
-        for i, record in enumerate(db):
-            if record.get('ID') == id:
-                # Update fields
-                db[i].update(data)
-                save_db(db)
-                return jsonify({'msg': 'Registro actualizado'}), 200
+        if store.update(id, data):
+            return jsonify({'msg': 'Registro actualizado'}), 200
         return jsonify({'msg': 'Registro no encontrado'}), 404
     except Exception as e:
         print(f"Error updating record: {e}")
+        metrics.count_error('server')
         return jsonify({'msg': 'Server error'}), 500
 
-@app.route('/api/records/<int:id>', methods=['DELETE'])
+@api.route('/api/records/<int:id>', methods=['DELETE'])
 def delete_record(id):
     try:
-        db = load_db()
-        new_db = [r for r in db if r.get('ID') != id]
-        if len(new_db) == len(db):
+        if not store.delete(id):
             return jsonify({'msg': 'Registro no encontrado'}), 404
-        save_db(new_db)
         return jsonify({'msg': 'Registro eliminado'}), 200
     except Exception as e:
         print(f"Error deleting record: {e}")
+        metrics.count_error('server')
         return jsonify({'msg': 'Server error'}), 500
 
-@app.route('/api/predict_all', methods=['POST'])
+def stats_summary(counts):
+    """
+    GET /api/stats body from `stat_counts()`: per-field counts, the declared
+    Nivel vs Prediccion_IA confusion matrix and their agreement. Records
+    missing either value are left out of the agreement.
+    """
+    confusion = {}
+    matching = compared = 0
+    for (declared, predicted), n in sorted(counts['confusion'].items()):
+        confusion.setdefault(declared, {})[predicted] = n
+        if declared and predicted and predicted != 'Error':
+            compared += n
+            matching += n if declared == predicted else 0
+    return {
+        'total': counts['total'],
+        'counts': counts['fields'],
+        'confusion': confusion,
+        'agreement': {
+            'matching': matching,
+            'compared': compared,
+            'rate': round(matching / compared, 4) if compared else None,
+        },
+    }
+
+@api.route('/api/stats', methods=['GET'])
+def get_stats():
+    # SQLite keeps the aggregates up to date on every write (record_stats triggers);
+    # the JSON store counts them once per version of the cached table
+    source = store if store.indexed else records_cache.table()
+    return jsonify(stats_summary(source.stat_counts()))
+
+# The fields the model reads; records are rescored per distinct combination of them
+FEATURE_FIELDS = ('Experiencia (años)', 'Nivel Educativo', 'Campo Estudio')
+RESCORE_BATCH_SIZE = 1000
+
+def prediction_fields(record, prediction, signature=None):
+    """
+    Fields to store for a new prediction, including the signature used to detect staleness.
+
+    Callers pass predict_batch results, where "Error" means the features cannot
+    be encoded; it is signed too, so predict_all only retries such a record
+    when its features or the model change (or with force). An "Error" saved
+    after an exception (see register) has no signature and is retried.
+    """
+    fields = {'Prediccion_IA': prediction}
+    metrics.PREDICTIONS.inc(label=prediction)
+    if codigoia.model_version() is not None:
+        fields[PREDICTION_SIGNATURE_FIELD] = signature or codigoia.prediction_signature(record)
+    return fields
+
+def rescore_records(job, force=False, delta=False):
+    """
+    Job body for predict_all: rescore only records whose features or the
+    model version changed since their last Prediccion_IA (all of them if force).
+    With `delta`, the result also lists the new {ID, Prediccion_IA} pairs.
+
+    Works on the encoded table: signatures and predictions are computed once
+    per distinct combination of FEATURE_FIELDS, not once per record.
+    """
+    if codigoia.model_version() is None:
+        raise RuntimeError("Modelo no cargado")
+
+    table = records_cache.table()
+    profiles, profile_of_row = table.group_by(FEATURE_FIELDS)
+    signatures = [codigoia.prediction_signature(profile) for profile in profiles]
+    if force:
+        stale_rows = np.arange(len(table))
+    else:
+        # Signature code each row should have (-1: no record has it yet) against the stored one
+        expected = np.array([-1 if code is None else code for code in
+                             (table.code(PREDICTION_SIGNATURE_FIELD, s) for s in signatures)], dtype=np.int64)
+        stored = table.codes(PREDICTION_SIGNATURE_FIELD).astype(np.int64)
+        stale_rows = np.flatnonzero(stored != expected[profile_of_row])
+    job.progress(0, len(stale_rows))
+
+    stale_profiles = np.unique(profile_of_row[stale_rows]).tolist()
+    predictions = dict(zip(stale_profiles, codigoia.predict_batch([profiles[p] for p in stale_profiles])))
+
+    updated = 0
+    changes = []
+    for start in range(0, len(stale_rows), RESCORE_BATCH_SIZE):
+        chunk = stale_rows[start:start + RESCORE_BATCH_SIZE].tolist()
+        updates = {}
+        for row in chunk:
+            profile = int(profile_of_row[row])
+            updates[int(table.ids[row])] = prediction_fields(
+                profiles[profile], predictions[profile], signatures[profile])
+        updated += store.update_many(updates)
+        if delta:
+            changes.extend({'ID': record_id, 'Prediccion_IA': fields['Prediccion_IA']}
+                           for record_id, fields in updates.items())
+        job.progress(start + len(chunk))
+
+    up_to_date = len(table) - len(stale_rows)
+    result = {
+        'msg': f'Predicciones generadas para {updated} registros ({up_to_date} ya estaban al día)',
+        'updated': updated,
+        'up_to_date': up_to_date,
+    }
+    if delta:
+        result['predictions'] = changes
+    return result
+
+@api.route('/api/predict_all', methods=['POST'])
 def predict_all():
+    # Runs as a background job; poll GET /api/jobs/<id>. ?force=1 rescores every record;
+    # ?delta=1 adds the new {ID, Prediccion_IA} pairs to the job result, so clients can
+    # patch what they already have instead of downloading every record again.
     try:
-        db = load_db()
-        updated_count = 0
-        for record in db:
-            # Predict only if not present or force update (here we force update)
-            prediction = codigoia.predict_candidate(record)
-            record['Prediccion_IA'] = prediction
-            updated_count += 1
-        
-        save_db(db)
-        return jsonify({'msg': f'Predicciones generadas para {updated_count} registros', 'records': db}), 200
+        force = request.args.get('force') in ('1', 'true')
+        delta = request.args.get('delta') in ('1', 'true')
+        # Sampled like a request; a request carrying the profiling token always profiles the job
+        job_body = profiling.PROFILER.wrap('job predict_all', rescore_records, forced=profiling.requested())
+        job, started = jobs.submit_exclusive('predict_all', job_body, force=force, delta=delta)
+        if not started:
+            return jsonify({'msg': 'Ya hay una generación de predicciones en curso', 'job': job}), 202
+        return jsonify({'msg': 'Generación de predicciones iniciada', 'job': job}), 202
     except Exception as e:
         print(f"Error generating predictions: {e}")
+        metrics.count_error('server')
         return jsonify({'msg': 'Server error generating predictions'}), 500
 
-@app.route('/public-key', methods=['GET'])
+@api.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'msg': 'Tarea no encontrada'}), 404
+    return jsonify(job)
+
+@api.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    job = jobs.cancel(job_id)
+    if job is None:
+        return jsonify({'msg': 'Tarea no encontrada'}), 404
+    return jsonify(job), 202
+
+@api.route('/public-key', methods=['GET'])
 def get_public_key():
     return jsonify({'publicKey': public_key})
 
-@app.route('/register', methods=['POST'])
+@api.route('/session', methods=['POST'])
+def open_session():
+    # One RSA exchange; later /register calls send {session, iv, data} and skip the RSA decrypt
+    req_data = request.get_json(silent=True)
+    try:
+        session_id, expires_at = crypto.open_session(req_data.get('key') if isinstance(req_data, dict) else None)
+    except DecryptionError as e:
+        print(f"Session key error: {e}")
+        metrics.count_error('decryption')
+        return jsonify({'msg': 'Key decryption error'}), 400
+    return jsonify({'session': session_id, 'expires_at': expires_at, 'ttl': crypto.session_ttl}), 200
+
+# Seconds a registration waits for its micro-batched prediction before saving "Error"
+PREDICTION_TIMEOUT = 30
+
+@api.route('/register', methods=['POST'])
 def register():
     try:
-        req_data = request.json
-        
         # Expecting: { "key": "encrypted_aes_key_b64", "iv": "iv_b64", "data": "encrypted_data_b64" }
-        encrypted_key_b64 = req_data.get('key')
-        iv_b64 = req_data.get('iv')
-        encrypted_data_b64 = req_data.get('data')
-        
-        if not encrypted_key_b64 or not iv_b64 or not encrypted_data_b64:
+        # or, after POST /session: { "session": "session_id", "iv": "iv_b64", "data": "encrypted_data_b64" }
+        req_data = request.get_json(silent=True)
+        if not isinstance(req_data, dict) or not req_data.get('iv') or not req_data.get('data') \
+                or not (req_data.get('key') or req_data.get('session')):
             return jsonify({'msg': 'Missing encryption parameters'}), 400
 
-        # 1. Decrypt AES Key with RSA
         try:
-            encrypted_key = base64.b64decode(encrypted_key_b64)
-            sentinel = None
-            aes_key_b64_bytes = cipher_rsa.decrypt(encrypted_key, sentinel)
-            if aes_key_b64_bytes is None:
-                return jsonify({'msg': 'Key decryption failed'}), 400
-            
-            # The decrypted content is the Base64 string of the AES key (as bytes)
-            aes_key = base64.b64decode(aes_key_b64_bytes)
-            
-        except Exception as e:
-            print(f"Key decryption error: {e}")
-            return jsonify({'msg': 'Key decryption error'}), 400
+            decrypted_data = crypto.decrypt_envelope(req_data)
+        except SessionExpired as e:
+            # The client should open a new session and resend
+            metrics.count_error('session_expired')
+            return jsonify({'msg': str(e)}), 401
+        except DecryptionError as e:
+            print(f"Decryption error: {e}")
+            metrics.count_error('decryption')
+            return jsonify({'msg': 'Data decryption error'}), 400
 
-        # 2. Decrypt Data with AES
         try:
-            iv = base64.b64decode(iv_b64)
-            encrypted_data = base64.b64decode(encrypted_data_b64)
-            
-            # Using AES GCM (or CBC if GCM is too complex for simple JS lib, but WebCrypto supports GCM)
-            # WebCrypto default is usually GCM. Let's assume GCM.
-            # Note: PyCryptodome GCM requires the tag (MAC) to be separate or appended.
-            # WebCrypto usually produces ciphertext + tag.
-            # If using GCM, the tag is usually the last 16 bytes.
-            
-            cipher_aes = AES.new(aes_key, AES.MODE_GCM, nonce=iv)
-            
-            # Assuming the tag is appended to the end of the ciphertext (common in some libs, but WebCrypto returns it as part of the buffer? No, WebCrypto encrypt returns ciphertext which includes the tag at the end usually).
-            # Let's try to split tag.
-            tag = encrypted_data[-16:]
-            ciphertext = encrypted_data[:-16]
-            
-            decrypted_data = cipher_aes.decrypt_and_verify(ciphertext, tag)
-            
-            # Parse decrypted JSON
             final_data = json.loads(decrypted_data.decode('utf-8'))
-            
-        except Exception as e:
-            print(f"Data decryption error: {e}")
+        except ValueError as e:
+            print(f"Data decoding error: {e}")
+            metrics.count_error('decryption')
             return jsonify({'msg': 'Data decryption error'}), 400
 
-        # Save to DB
-        db = load_db()
-        
-        # Determine ID
-        new_id = 1
-        if db:
-            # Assuming ID is numeric and unique
-            ids = [item.get('ID', 0) for item in db]
-            if ids:
-                new_id = max(ids) + 1
-        
-        record = {}
-        record['ID'] = new_id
-        
-        # Merge decrypted data into record
-        record.update(final_data)
+        # The store assigns the ID when the record is saved; ID and prediction fields are the server's
+        try:
+            record = validate_record(final_data)
+        except ValueError as e:
+            return jsonify({'msg': str(e)}), 400
         
-        # Generate prediction for new record
+        # Generate prediction for new record (batched with concurrent registrations)
         try:
-            prediction = codigoia.predict_candidate(record)
-            record['Prediccion_IA'] = prediction
+            prediction = codigoia.predict_candidate_batched(record, timeout=PREDICTION_TIMEOUT)
+            record.update(prediction_fields(record, prediction))
         except Exception as e:
             print(f"Error predicting for new record: {e}")
+            metrics.count_error('prediction')
             record['Prediccion_IA'] = "Error"
         
-        db.append(record)
-        save_db(db)
+        # Save to DB
+        new_id = store.insert(record)
 
         return jsonify({'msg': 'Registro exitoso', 'id': new_id}), 200
 
     except Exception as e:
         print(f"Server error: {e}")
+        metrics.count_error('server')
         return jsonify({'msg': 'Server error'}), 500
 
+# Records accepted per POST /register/batch; larger intakes are split into several requests
+MAX_BATCH_RECORDS = 10000
+
+@api.route('/register/batch', methods=['POST'])
+def register_batch():
+    """
+    Register many applicants from one encrypted envelope (bulk intake).
+
+    Expects { "key": ..., "chunks": [{ "iv": ..., "data": ... }, ...] } (or
+    "session" instead of "key"), where every chunk decrypts to a JSON array
+    of records. The AES key is unwrapped once for the whole batch and every
+    chunk is decrypted before anything is saved, so a tampered chunk rejects
+    the request. Each record is validated; valid ones are scored with one
+    batched prediction and inserted IMPORT_BATCH_SIZE at a time. `results`
+    has, in input order, each record's new ID or why it was rejected.
+    """
+    try:
+        plaintexts = crypto.decrypt_chunks(request.get_json(silent=True))
+    except SessionExpired as e:
+        metrics.count_error('session_expired')
+        return jsonify({'msg': str(e)}), 401
+    except DecryptionError as e:
+        print(f"Decryption error: {e}")
+        metrics.count_error('decryption')
+        return jsonify({'msg': 'Data decryption error'}), 400
+
+    records = []
+    try:
+        for plaintext in plaintexts:
+            chunk = jsonio.loads(plaintext)
+            if not isinstance(chunk, list):
+                raise ValueError("Every chunk must be a JSON array of records")
+            records.extend(chunk)
+    except ValueError as e:
+        print(f"Data decoding error: {e}")
+        metrics.count_error('decryption')
+        return jsonify({'msg': 'Data decryption error'}), 400
+    if not records:
+        return jsonify({'msg': 'No records'}), 400
+    if len(records) > MAX_BATCH_RECORDS:
+        return jsonify({'msg': f'At most {MAX_BATCH_RECORDS} records per batch'}), 413
+
+    results = []
+    batch = []
+
+    def flush():
+        batch_records = [record for _, record in batch]
+        try:
+            for record, prediction in zip(batch_records, codigoia.predict_batch(batch_records)):
+                record.update(prediction_fields(record, prediction))
+        except Exception as e:
+            print(f"Error predicting for new records: {e}")
+            metrics.count_error('prediction')
+            for record in batch_records:
+                record['Prediccion_IA'] = "Error"
+        # IDs for the whole group come from one allocation
+        new_ids = store.insert_many(batch_records)
+        results.extend({'index': index, 'id': new_id} for (index, _), new_id in zip(batch, new_ids))
+        batch.clear()
+
+    try:
+        for index, data in enumerate(records):
+            try:
+                batch.append((index, validate_record(data)))
+            except ValueError as e:
+                results.append({'index': index, 'msg': str(e)})
+                continue
+            if len(batch) == IMPORT_BATCH_SIZE:
+                flush()
+        if batch:
+            flush()
+    except Exception as e:
+        print(f"Error registering batch: {e}")
+        metrics.count_error('server')
+        # Groups saved before the error keep their IDs
+        return jsonify({'msg': 'Server error', 'results': sorted(results, key=lambda r: r['index'])}), 500
+
+    registered = sum('id' in r for r in results)
+    return jsonify({
+        'msg': f'{registered} registros guardados',
+        'registered': registered,
+        'failed': len(records) - registered,
+        'results': sorted(results, key=lambda r: r['index']),
+    }), 200
+
 if __name__ == '__main__':
-    print("Starting Flask server on port 5000...")
-    print(f"Database file: {os.path.abspath(DB_FILE)}")
-    app.run(port=5000, debug=True)
+    # Development server. For production run: gunicorn -c gunicorn.conf.py wsgi:app
+    debug = os.environ.get('EDU_DEBUG', '1') == '1'
+    # With debug on, the reloader re-runs this file in a child process that serves
+    # the requests; only that child needs the model
+    serving = not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true'
+    app = create_app(load_model=serving)
+    if serving:
+        print("Starting Flask server on port 5000...")
+        print(f"Database: {os.path.abspath(store.path)}")
+    app.run(port=5000, debug=debug)
@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+
+# Directorio donde se guardan los artefactos entrenados (relativo al directorio de trabajo, como DB_FILE)
+ARTIFACTS_DIR = os.environ.get("EDU_ARTIFACTS_DIR", "artifacts")
+
+# Se incrementa cuando cambia el contenido o el formato de los artefactos guardados,
+# para que un artefacto viejo nunca se cargue con código nuevo.
+ARTIFACT_FORMAT = 2
+
+METADATA_FILE = "metadata.json"
+LATEST_FILE = "LATEST"
+
+
+def file_hash(file_path, chunk_size=1 << 20):
+    """Calcula el SHA-256 del archivo de entrenamiento leyendo por bloques."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def artifact_key(file_path, backend=None):
+    """
+    Clave versionada del artefacto para un archivo de entrenamiento.
+
+    El backend "mlp" (el original) no lleva sufijo, así los artefactos ya
+    publicados siguen siendo válidos.
+    """
+    key = f"v{ARTIFACT_FORMAT}-{file_hash(file_path)[:16]}"
+    if backend and backend != "mlp":
+        key = f"{key}-{backend}"
+    return key
+
+
+def new_model_version(key):
+    """
+    Versión de un modelo recién entrenado: la clave de su artefacto más un id
+    único del entrenamiento.
+
+    La clave solo depende del archivo de entrenamiento y del backend, así que
+    un reentrenamiento (--retrain, otros hiperparámetros o --search) publica
+    en el mismo directorio; el id hace que su versión, y con ella las firmas
+    de las predicciones y el cache, cambie de todos modos.
+    """
+    return f"{key}.{uuid.uuid4().hex[:12]}"
+
+
+def artifact_path(key, root=None):
+    return os.path.join(root or ARTIFACTS_DIR, key)
+
+
+def staging_path(key, root=None):
+    """Directorio temporal donde se escribe un artefacto antes de publicarlo."""
+    return os.path.join(root or ARTIFACTS_DIR, f".tmp-{key}-{os.getpid()}")
+
+
+def publish(staging_dir, key, metadata, root=None):
+    """
+    Publica un artefacto escrito en `staging_dir` bajo su clave.
+
+    Los archivos se escriben primero en un directorio temporal y se renombran
+    al final, así un proceso que arranca nunca ve un artefacto a medias.
+    """
+    root = root or ARTIFACTS_DIR
+    metadata = dict(metadata, key=key, format=ARTIFACT_FORMAT, created_at=time.time())
+    with open(os.path.join(staging_dir, METADATA_FILE), "w", encoding="utf-8") as f:
+        json.dump(metadata, f, indent=4, ensure_ascii=False)
+
+    final_dir = artifact_path(key, root)
+    old_dir = None
+    if os.path.exists(final_dir):
+        old_dir = f"{final_dir}.old-{os.getpid()}"
+        os.replace(final_dir, old_dir)
+    os.replace(staging_dir, final_dir)
+    if old_dir:
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+    latest_tmp = os.path.join(root, f".{LATEST_FILE}-{os.getpid()}")
+    with open(latest_tmp, "w", encoding="utf-8") as f:
+        f.write(key)
+    os.replace(latest_tmp, os.path.join(root, LATEST_FILE))
+    return final_dir
+
+
+def read_metadata(key, root=None):
+    """Devuelve los metadatos del artefacto o None si no existe o es de otro formato."""
+    path = os.path.join(artifact_path(key, root), METADATA_FILE)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Artefacto {key} ilegible: {e}")
+        return None
+    if metadata.get("format") != ARTIFACT_FORMAT:
+        return None
+    return metadata
+
+
+def latest_key(root=None):
+    """Clave del último artefacto publicado, o None."""
+    path = os.path.join(root or ARTIFACTS_DIR, LATEST_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read().strip() or None
@@ -0,0 +1,141 @@
+import os
+import pickle
+
+import numpy as np
+
+from runtime import NumpyMLP, export_mlp, WEIGHTS_FILE
+
+# Backends de modelo intercambiables. Todos reciben la matriz ya escalada y las
+# etiquetas como índices de `LabelEncoder`, y el objeto que devuelve `load`
+# expone `predict(X, batch_size=None, verbose=0)` con probabilidades por clase,
+# que es lo único que usan predict_candidate/predict_batch.
+
+
+class ModelBackend:
+    name = None
+    requires_keras = False
+
+    def fit(self, X_train, y_train, X_test, y_test, n_classes, params=None, early_stopping=False):
+        """
+        Entrena y devuelve `(modelo, info)`. El modelo ya expone `predict` como
+        el que devuelve `load`; info se guarda en metadata.json.
+        """
+        raise NotImplementedError
+
+    def save(self, model, directory):
+        raise NotImplementedError
+
+    def load(self, directory, runtime="numpy"):
+        raise NotImplementedError
+
+
+class KerasMLPBackend(ModelBackend):
+    """La red densa de Keras de siempre; se sirve con el runtime NumPy (o Keras)."""
+
+    name = "mlp"
+    requires_keras = True
+
+    def fit(self, X_train, y_train, X_test, y_test, n_classes, params=None, early_stopping=False):
+        import codigoia
+        from keras.utils import to_categorical
+
+        model, history = codigoia.fit_model(
+            X_train, to_categorical(y_train, n_classes),
+            X_test, to_categorical(y_test, n_classes),
+            params, early_stopping,
+        )
+        return model, {"epochs_run": len(history.history["loss"])}
+
+    def save(self, model, directory):
+        model.save(os.path.join(directory, "model.keras"))
+        export_mlp(model, os.path.join(directory, WEIGHTS_FILE))
+
+    def load(self, directory, runtime="numpy"):
+        if runtime == "keras":
+            from keras.models import load_model
+            return load_model(os.path.join(directory, "model.keras"))
+        return NumpyMLP.load(os.path.join(directory, WEIGHTS_FILE))
+
+
+class SklearnPredictor:
+    """Adapta `predict_proba` de scikit-learn a la firma de `predict` de Keras."""
+
+    def __init__(self, model):
+        self.model = model
+
+    def predict(self, X, batch_size=None, verbose=0):
+        return self.model.predict_proba(X)
+
+
+class LogisticRegressionBackend(ModelBackend):
+    """
+    Regresión logística multinomial de scikit-learn.
+
+    Se exporta como una sola capa softmax al formato de `runtime.NumpyMLP`,
+    así que en producción no necesita scikit-learn.
+    """
+
+    name = "logreg"
+
+    def fit(self, X_train, y_train, X_test, y_test, n_classes, params=None, early_stopping=False):
+        from sklearn.linear_model import LogisticRegression
+
+        params = params or {}
+        model = LogisticRegression(C=params.get("C", 1.0), max_iter=params.get("max_iter", 1000))
+        model.fit(X_train, y_train)
+        return SklearnPredictor(model), {"iterations": int(np.max(model.n_iter_))}
+
+    def save(self, model, directory):
+        coef = model.model.coef_.T
+        intercept = model.model.intercept_
+        if coef.shape[1] == 1:
+            # Binario: sigmoid(z) == softmax([-z/2, z/2])[1]
+            coef = np.hstack([-coef / 2, coef / 2])
+            intercept = np.array([-intercept[0] / 2, intercept[0] / 2])
+        np.savez(os.path.join(directory, WEIGHTS_FILE),
+                 W0=coef.astype(np.float32), b0=intercept.astype(np.float32),
+                 activations=np.array(["softmax"]))
+
+    def load(self, directory, runtime="numpy"):
+        return NumpyMLP.load(os.path.join(directory, WEIGHTS_FILE))
+
+
+class HistGradientBoostingBackend(ModelBackend):
+    """HistGradientBoostingClassifier de scikit-learn, guardado con pickle."""
+
+    name = "hgb"
+    MODEL_FILE = "model.pkl"
+
+    def fit(self, X_train, y_train, X_test, y_test, n_classes, params=None, early_stopping=False):
+        from sklearn.ensemble import HistGradientBoostingClassifier
+
+        params = params or {}
+        model = HistGradientBoostingClassifier(
+            max_iter=params.get("max_iter", 200),
+            learning_rate=params.get("learning_rate", 0.1),
+            early_stopping=early_stopping,
+            random_state=42,
+        )
+        model.fit(X_train, y_train)
+        return SklearnPredictor(model), {"iterations": int(model.n_iter_)}
+
+    def save(self, model, directory):
+        with open(os.path.join(directory, self.MODEL_FILE), "wb") as f:
+            pickle.dump(model.model, f)
+
+    def load(self, directory, runtime="numpy"):
+        with open(os.path.join(directory, self.MODEL_FILE), "rb") as f:
+            return SklearnPredictor(pickle.load(f))
+
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (KerasMLPBackend(), LogisticRegressionBackend(), HistGradientBoostingBackend())
+}
+
+
+def get_backend(name):
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Backend de modelo desconocido: {name} (opciones: {', '.join(BACKENDS)})")
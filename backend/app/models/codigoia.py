@@ -1,93 +1,86 @@
-import pandas as pd
 import numpy as np
 import os
+import json
+import hashlib
+import pickle
+import argparse
+import time
 
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.metrics import confusion_matrix, classification_report
+import artifacts
+import dataset
+from features import FeatureEncoder, feature_key
+import backends
+from runtime import NumpyMLP
+from prediction_cache import PredictionCache
+from inference_broker import InferenceBroker
 
-import matplotlib.pyplot as plt
-import seaborn as sns
-
-from keras.models import Sequential
-from keras.layers import Dense, Dropout
-from keras.optimizers import Adam
-from keras.utils import to_categorical
+# pandas, scikit-learn y Keras se importan solo al entrenar o al cargar el modelo Keras:
+# el proceso web sirve las predicciones con el runtime NumPy (ver runtime.py)
 
 # Global artifacts for reuse
 _model = None
 _scaler = None
 _encoder = None
 _training_columns = None # To store the exact column order and names after one-hot encoding
+_feature_encoder = None # Codificador precompilado (columnas + scaler) para la ruta de predicción
+_model_version = None # Versión del modelo cargado: clave del artefacto + id del entrenamiento (ver artifacts.new_model_version)
+_classes = None # Etiquetas del target en el orden de salida del modelo
+_train_info = None # Hiperparámetros y métricas del último entrenamiento (se guardan en metadata.json)
+_backend = None # Nombre del backend del modelo cargado (ver backends.py)
+_timing_observer = None # fn(etapa, segundos) para métricas (ver set_timing_observer)
 
-def train_model(file_path="Base de datos para el PP (actualizada).xlsx"):
-    global _model, _scaler, _encoder, _training_columns
-    
-    if not os.path.exists(file_path):
-        print(f"Advertencia: No se encontró el archivo {file_path}. El modelo no se entrenará.")
-        return None
-
-    print(f"Entrenando modelo con {file_path}...")
-    df = pd.read_excel(file_path, header=1)
-
-    # Limpiar los nombres de las columnas para que coincidan con las características esperadas
-    df.columns = df.columns.str.replace(' ', '_').str.replace('(', '').str.replace(')', '')
-    
-    # Normalizar nombres de columna (quitar espacios y minúsculas para evitar errores)
-    df.columns = df.columns.str.strip().str.replace(" ", "_").str.replace("á","a").str.replace("é","e").str.replace("í","i").str.replace("ó","o").str.replace("ú","u")
-
-    # Nombres esperados (ajustados a la normalización anterior)
-    expected_features = ["Experiencia_años", "Nivel_Educativo", "Campo_Estudio"]
-    # Aplica la misma normalizacion a los nombres esperados para comparación robusta
-    expected_features_norm = [c.strip().replace(" ", "_").replace("á","a").replace("é","e").replace("í","i").replace("ó","o").replace("ú","u") for c in expected_features]
-    target_col = "Nivel"
-    target_col_norm = target_col.strip().replace(" ", "_")
+# "numpy" carga inference.npz sin TensorFlow; "keras" carga model.keras
+MODEL_RUNTIME = os.environ.get("EDU_MODEL_RUNTIME", "numpy")
+# Modelo a entrenar y servir: "mlp" (Keras), "logreg" o "hgb" (ver backends.py)
+MODEL_BACKEND = os.environ.get("EDU_MODEL_BACKEND", "mlp")
+ENCODER_FILE = "encoder.json"
 
-    # Verificar existencia de columnas
-    missing = [c for c in expected_features_norm + [target_col_norm] if c not in df.columns]
-    if missing:
-        raise ValueError(f"Faltan columnas en el Excel: {missing}")
+TRAINING_FILE = "Base de datos para el PP (actualizada).xlsx"
 
-    # Usar columnas normalizadas
-    features = expected_features_norm
-    target = target_col_norm
+# Filas por lote al predecir muchos registros a la vez (ver predict_batch)
+PREDICT_BATCH_SIZE = 1024
 
-    df = df[features + [target]].copy()
+# Predicciones recientes por (versión del modelo, características); se vacía al entrenar o cargar un modelo
+PREDICTION_CACHE_SIZE = int(os.environ.get("EDU_PREDICTION_CACHE_SIZE", "4096"))
+_prediction_cache = PredictionCache(PREDICTION_CACHE_SIZE)
 
-    df["Experiencia_años"] = pd.to_numeric(df["Experiencia_años"], errors='coerce')
+# Micro-lotes para predicciones concurrentes (ver predict_candidate_batched): un lote
+# se envía al llegar a INFERENCE_MAX_BATCH candidatos o tras INFERENCE_MAX_WAIT_MS.
+# "auto" lo activa solo para modelos Keras o scikit-learn: una pasada del runtime
+# NumPy cuesta menos que la espera del lote, así que allí se predice directamente.
+INFERENCE_BROKER = os.environ.get("EDU_INFERENCE_BROKER", "auto")
+INFERENCE_MAX_BATCH = int(os.environ.get("EDU_INFERENCE_MAX_BATCH", "64"))
+INFERENCE_MAX_WAIT_MS = float(os.environ.get("EDU_INFERENCE_MAX_WAIT_MS", "2"))
+_broker = InferenceBroker(lambda candidates: predict_batch(candidates, lookup_cache=False),
+                          max_batch_size=INFERENCE_MAX_BATCH, max_wait=INFERENCE_MAX_WAIT_MS / 1000)
 
-    # Categorías a texto seguro
-    df["Nivel_Educativo"] = df["Nivel_Educativo"].fillna("Desconocido").astype(str)
-    df["Campo_Estudio"] = df["Campo_Estudio"].fillna("Desconocido").astype(str)
+# Hiperparámetros por defecto de la red (ver build_model); --search busca otros
+DEFAULT_PARAMS = {
+    "layers": [64, 32, 16],
+    "dropout": 0.2,
+    "learning_rate": 0.001,
+    "epochs": 60,
+    "batch_size": 16,
+}
 
-    df[target] = df[target].astype(str)
+# Épocas sin mejora en val_loss antes de detener el entrenamiento (si early_stopping)
+EARLY_STOPPING_PATIENCE = 8
 
-    # Eliminar filas con datos faltantes
-    df = df.dropna(subset=["Experiencia_años", "Nivel_Educativo", "Campo_Estudio", target])
-
-    df_cat = pd.get_dummies(
-        df[["Nivel_Educativo", "Campo_Estudio"]],
-        prefix=["NivelEd", "Campo"]
-    )
-
-    # Dataset final de entrada X
-    X_df = pd.concat(
-        [df[["Experiencia_años"]].reset_index(drop=True),
-         df_cat.reset_index(drop=True)],
-        axis=1
-    )
-    
-    # Guardar las columnas de entrenamiento para alinear en predicción
-    _training_columns = X_df.columns.tolist()
+def split_and_scale(X, y_labels):
+    """
+    Separa entrenamiento/validación (80/20, semilla fija) y ajusta el scaler
+    y el codificador de etiquetas solo con la parte de entrenamiento.
 
-    X = X_df.values
+    Returns:
+        tuple: (X_train, X_test, y_train, y_test, scaler, label_encoder), con
+               las etiquetas como índices de clase.
+    """
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import StandardScaler, LabelEncoder
 
     # Codificación del target
     encoder = LabelEncoder()
-    y_encoded = encoder.fit_transform(df[target])
-    y = to_categorical(y_encoded)
-    
-    _encoder = encoder # Store the encoder globally
+    y = encoder.fit_transform(y_labels)
 
     X_train, X_test, y_train, y_test = train_test_split(
         X, y, test_size=0.20, random_state=42
@@ -95,37 +88,288 @@ def train_model(file_path="Base de datos para el PP (actualizada).xlsx"):
 
     scaler = StandardScaler()
     scaler.fit(X_train)
-    _scaler = scaler # Store the scaler globally
 
-    X_train = scaler.transform(X_train)
-    X_test = scaler.transform(X_test)
+    return scaler.transform(X_train), scaler.transform(X_test), y_train, y_test, scaler, encoder
+
+def build_model(input_dim, n_classes, params=None):
+    """
+    Red densa: capas `params["layers"]` con ReLU, dropout tras la primera y
+    salida softmax, compilada con Adam a `params["learning_rate"]`.
+    """
+    from keras.models import Sequential
+    from keras.layers import Dense, Dropout, Input
+    from keras.optimizers import Adam
+
+    params = dict(DEFAULT_PARAMS, **(params or {}))
 
     model = Sequential()
-    model.add(Dense(64, activation='relu', input_shape=(X_train.shape[1],)))
-    model.add(Dropout(0.2))
-    model.add(Dense(32, activation='relu'))
-    model.add(Dense(16, activation='relu'))
-    model.add(Dense(y.shape[1], activation='softmax'))
+    model.add(Input(shape=(input_dim,)))
+    for i, units in enumerate(params["layers"]):
+        model.add(Dense(units, activation='relu'))
+        if i == 0 and params["dropout"] > 0:
+            model.add(Dropout(params["dropout"]))
+    model.add(Dense(n_classes, activation='softmax'))
 
     model.compile(
-        optimizer=Adam(learning_rate=0.001),
+        optimizer=Adam(learning_rate=params["learning_rate"]),
         loss='categorical_crossentropy',
         metrics=['accuracy']
     )
+    return model
+
+def fit_model(X_train, y_train, X_test, y_test, params=None, early_stopping=False):
+    """
+    Construye y entrena una red con `params` (etiquetas en one-hot).
+
+    Returns:
+        tuple: (modelo, historial de Keras)
+    """
+    from keras.callbacks import EarlyStopping
+
+    params = dict(DEFAULT_PARAMS, **(params or {}))
+    model = build_model(X_train.shape[1], y_train.shape[1], params)
+
+    callbacks = []
+    if early_stopping:
+        callbacks.append(EarlyStopping(monitor='val_loss', patience=EARLY_STOPPING_PATIENCE,
+                                       restore_best_weights=True))
 
     history = model.fit(
         X_train, y_train,
-        epochs=60,
-        batch_size=16,
+        epochs=params["epochs"],
+        batch_size=params["batch_size"],
         validation_data=(X_test, y_test),
+        callbacks=callbacks,
         verbose=0 # Silencioso
     )
-    
+    return model, history
+
+def train_model(file_path=TRAINING_FILE, save=True, params=None, early_stopping=False, seed=None, backend=None):
+    """
+    Entrena el modelo con el archivo de entrenamiento y lo deja cargado.
+
+    El Excel ya limpio se lee desde el cache de `dataset.load_dataset`, así
+    que reentrenar con el mismo archivo no vuelve a pasar por openpyxl.
+
+    Args:
+        file_path (str): Excel de entrenamiento.
+        save (bool): Publicar el modelo como artefacto.
+        params (dict): Hiperparámetros; para "mlp" reemplazan a DEFAULT_PARAMS.
+        early_stopping (bool): Detener cuando la validación deja de mejorar.
+        seed (int): Semilla de Keras, para repetir un entrenamiento de la búsqueda.
+        backend (str): "mlp", "logreg" o "hgb" (ver backends.py); por defecto MODEL_BACKEND.
+    """
+    global _model, _scaler, _encoder, _training_columns, _feature_encoder, _model_version, _classes, _train_info, _backend
+
+    if not os.path.exists(file_path):
+        print(f"Advertencia: No se encontró el archivo {file_path}. El modelo no se entrenará.")
+        return None
+
+    model_backend = backends.get_backend(backend or MODEL_BACKEND)
+
+    print(f"Entrenando modelo ({model_backend.name}) con {file_path}...")
+    X, y_labels, training_columns = dataset.load_dataset(file_path)
+
+    # Guardar las columnas de entrenamiento para alinear en predicción
+    _training_columns = training_columns
+
+    X_train, X_test, y_train, y_test, scaler, encoder = split_and_scale(X, y_labels)
+    _encoder = encoder # Store the encoder globally
+    _classes = encoder.classes_
+    _scaler = scaler # Store the scaler globally
+
+    if seed is not None and model_backend.requires_keras:
+        from keras.utils import set_random_seed
+        set_random_seed(seed)
+
+    if model_backend.name == "mlp":
+        params = dict(DEFAULT_PARAMS, **(params or {}))
+    model, info = model_backend.fit(X_train, y_train, X_test, y_test, len(_classes), params, early_stopping)
+
     _model = model # Store the trained model globally
+    _backend = model_backend.name
+    _feature_encoder = FeatureEncoder.from_scaler(_training_columns, scaler)
+    _model_version = artifacts.new_model_version(artifacts.artifact_key(file_path, _backend))
+    _train_info = dict(
+        info,
+        backend=_backend,
+        params=params,
+        val_accuracy=float(np.mean(np.argmax(model.predict(X_test, verbose=0), axis=1) == y_test)),
+    )
+    _prediction_cache.clear()
     
     print("Modelo entrenado exitosamente.")
+
+    if save:
+        try:
+            save_artifacts(file_path)
+        except Exception as e:
+            print(f"Error guardando artefactos del modelo: {e}")
+
+    return model
+
+def save_artifacts(file_path=TRAINING_FILE):
+    """
+    Guarda el modelo entrenado, `_scaler`, `_encoder` y `_training_columns`
+    en un directorio versionado por el hash del archivo de entrenamiento.
+
+    Returns:
+        str: Ruta del directorio del artefacto publicado.
+    """
+    key = artifacts.artifact_key(file_path, _backend)
+    staging_dir = artifacts.staging_path(key)
+    os.makedirs(staging_dir, exist_ok=True)
+
+    # Archivos propios del backend (model.keras / inference.npz / model.pkl)
+    backends.get_backend(_backend).save(_model, staging_dir)
+    with open(os.path.join(staging_dir, "scaler.pkl"), "wb") as f:
+        pickle.dump(_scaler, f)
+    with open(os.path.join(staging_dir, "label_encoder.pkl"), "wb") as f:
+        pickle.dump(_encoder, f)
+
+    # Metadatos del codificador para servir sin scikit-learn
+    with open(os.path.join(staging_dir, ENCODER_FILE), "w", encoding="utf-8") as f:
+        json.dump({
+            "training_columns": _training_columns,
+            "scaler_mean": _scaler.mean_.tolist(),
+            "scaler_scale": _scaler.scale_.tolist(),
+            "classes": [str(c) for c in _encoder.classes_],
+        }, f, ensure_ascii=False)
+
+    metadata = {
+        "source_file": os.path.basename(file_path),
+        "source_sha256": artifacts.file_hash(file_path),
+        "backend": _backend,
+        "model_version": _model_version,
+        "training_columns": _training_columns,
+        "classes": [str(c) for c in _encoder.classes_],
+        "training": _train_info,
+    }
+    path = artifacts.publish(staging_dir, key, metadata)
+    print(f"Artefactos del modelo guardados en {path}")
+    return path
+
+def load_artifacts(key, runtime=None):
+    """
+    Carga un artefacto guardado por `save_artifacts`.
+
+    Args:
+        key (str): Clave del artefacto.
+        runtime (str): "numpy" (por defecto, sin TensorFlow) o "keras". Solo
+                       cambia algo para el backend "mlp"; el resto se sirve igual.
+
+    Returns:
+        bool: True si el artefacto existía y se cargó.
+    """
+    global _model, _scaler, _encoder, _training_columns, _feature_encoder, _model_version, _classes, _backend
+
+    metadata = artifacts.read_metadata(key)
+    if metadata is None:
+        return False
+
+    path = artifacts.artifact_path(key)
+    runtime = runtime or MODEL_RUNTIME
+    backend_name = metadata.get("backend", "mlp")
+    model = backends.get_backend(backend_name).load(path, runtime)
+
+    if runtime == "numpy":
+        with open(os.path.join(path, ENCODER_FILE), "r", encoding="utf-8") as f:
+            encoder_meta = json.load(f)
+        scaler = None
+        encoder = None
+        training_columns = encoder_meta["training_columns"]
+        feature_encoder = FeatureEncoder(training_columns, encoder_meta["scaler_mean"], encoder_meta["scaler_scale"])
+        classes = np.array(encoder_meta["classes"])
+    else:
+        with open(os.path.join(path, "scaler.pkl"), "rb") as f:
+            scaler = pickle.load(f)
+        with open(os.path.join(path, "label_encoder.pkl"), "rb") as f:
+            encoder = pickle.load(f)
+        training_columns = metadata["training_columns"]
+        feature_encoder = FeatureEncoder.from_scaler(training_columns, scaler)
+        classes = encoder.classes_
+
+    _model = model
+    _scaler = scaler
+    _encoder = encoder
+    _training_columns = training_columns
+    _feature_encoder = feature_encoder
+    _classes = classes
+    # Los artefactos anteriores a model_version se identifican por su clave
+    _model_version = metadata.get("model_version", key)
+    _backend = backend_name
+    _prediction_cache.clear()
+
+    print(f"Modelo cargado desde {path} (backend {backend_name}, runtime {runtime})")
+    return True
+
+def load_or_train_model(file_path=TRAINING_FILE, force_retrain=False, backend=None):
+    """
+    Carga el artefacto que corresponde al archivo de entrenamiento actual y
+    solo reentrena si no existe (o si `force_retrain` es True).
+
+    Si el archivo de entrenamiento no está disponible se usa el último
+    artefacto publicado, para poder desplegar solo con los artefactos.
+    """
+    if not os.path.exists(file_path):
+        key = artifacts.latest_key()
+        if key and load_artifacts(key):
+            return _model
+        print(f"Advertencia: No se encontró el archivo {file_path} ni un modelo guardado.")
+        return None
+
+    if not force_retrain:
+        try:
+            if load_artifacts(artifacts.artifact_key(file_path, backend or MODEL_BACKEND)):
+                return _model
+        except Exception as e:
+            print(f"Error cargando artefactos, se reentrenará el modelo: {e}")
+
+    return train_model(file_path, backend=backend)
+
+def publish_best_trial(file_path, best):
+    """
+    Reentrena (con early stopping y la semilla de la búsqueda) la mejor prueba
+    de `hyperparam_search.search` y la publica como el modelo servido.
+
+    Se publica bajo la misma clave de artefacto que el modelo por defecto,
+    pero con una versión nueva: las predicciones guardadas quedan
+    desactualizadas y el cache se vacía, igual que tras cualquier reentrenamiento.
+    """
+    import hyperparam_search
+
+    model = train_model(file_path, params=best["params"], early_stopping=True,
+                        seed=hyperparam_search.TRIAL_SEED, backend="mlp")
+    if model is not None:
+        print(f"Modelo de la búsqueda publicado como versión {_model_version}")
     return model
 
+def set_timing_observer(observer):
+    """
+    Registra `observer(etapa, segundos)`, llamado con el tiempo de las etapas
+    "feature_encoding" y "model_inference" de cada predicción. None lo quita.
+    """
+    global _timing_observer
+    _timing_observer = observer
+
+def model_version():
+    """Versión del modelo cargado (cambia con cada entrenamiento), o None si no hay modelo."""
+    return _model_version
+
+def prediction_cache_stats():
+    """Contadores de aciertos/fallos y tamaño del cache de predicciones."""
+    return _prediction_cache.stats()
+
+def prediction_signature(candidate_data):
+    """
+    Firma corta de la versión del modelo y de las características del candidato.
+
+    Se guarda junto a `Prediccion_IA`: si la firma actual de un registro no
+    coincide con la guardada, su predicción está desactualizada.
+    """
+    raw = json.dumps([_model_version, *feature_key(candidate_data)], ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
 def predict_candidate(candidate_data):
     """
     Realiza una predicción para un candidato dado.
@@ -138,57 +382,170 @@ def predict_candidate(candidate_data):
         str: El nivel predicho para el candidato.
         str: "Modelo no cargado" si el modelo no ha sido entrenado.
     """
-    global _model, _scaler, _encoder, _training_columns
+    global _model, _classes, _feature_encoder
     
-    if _model is None or _scaler is None or _encoder is None or _training_columns is None:
+    if _model is None or _classes is None or _feature_encoder is None:
         return "Modelo no cargado. Por favor, entrena el modelo primero."
 
-    # Mapeo de claves del JSON a las esperadas por el modelo (normalizadas)
-    # JSON: "Experiencia (años)", "Nivel Educativo", "Campo Estudio"
-    # Modelo espera normalizado: "Experiencia_años", "Nivel_Educativo", "Campo_Estudio"
-    
-    # Crear un DF de una sola fila
-    data = {
-        "Experiencia_años": [float(candidate_data.get("Experiencia (años)", 0))],
-        "Nivel_Educativo": [str(candidate_data.get("Nivel Educativo", "Desconocido"))],
-        "Campo_Estudio": [str(candidate_data.get("Campo Estudio", "Desconocido"))]
-    }
-    
-    df_input = pd.DataFrame(data)
-    
-    # One-Hot Encoding para categóricas
-    df_cat = pd.get_dummies(
-        df_input[["Nivel_Educativo", "Campo_Estudio"]],
-        prefix=["NivelEd", "Campo"]
-    )
-    
-    X_input_df = pd.concat(
-        [df_input[["Experiencia_años"]].reset_index(drop=True),
-         df_cat.reset_index(drop=True)],
-        axis=1
-    )
-    
-    # Alinear columnas con las del entrenamiento
-    # Agregar columnas faltantes con 0
-    for col in _training_columns:
-        if col not in X_input_df.columns:
-            X_input_df[col] = 0
-            
-    # Reordenar y seleccionar solo las columnas de entrenamiento
-    X_input_df = X_input_df[_training_columns]
-    
-    X_input = X_input_df.values
-    X_input = _scaler.transform(X_input)
+    # Los perfiles repetidos se responden desde el cache sin pasar por el modelo
+    cache_key = (_model_version, *feature_key(candidate_data))
+    cached = _prediction_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Mapeo de claves del JSON a las columnas del modelo:
+    # "Experiencia (años)", "Nivel Educativo", "Campo Estudio" -> fila one-hot ya escalada
+    start = time.perf_counter()
+    X_input = _feature_encoder.transform_one(candidate_data)
+    encoded = time.perf_counter()
     
     prediction = _model.predict(X_input, verbose=0)
+    if _timing_observer is not None:
+        _timing_observer("feature_encoding", encoded - start)
+        _timing_observer("model_inference", time.perf_counter() - encoded)
     predicted_class_idx = np.argmax(prediction, axis=1)[0]
-    predicted_label = _encoder.inverse_transform([predicted_class_idx])[0]
+    predicted_label = str(_classes[predicted_class_idx])
+
+    _prediction_cache.put(cache_key, predicted_label)
     
     return predicted_label
 
+def predict_candidate_batched(candidate_data, timeout=None):
+    """
+    Como `predict_candidate`, pero pensada para muchos hilos a la vez (/register).
+
+    Los aciertos del cache se responden de inmediato; el resto se envía al
+    `InferenceBroker`, que junta las peticiones concurrentes en un solo
+    `predict_batch`. Sin broker (EDU_INFERENCE_BROKER=0, o "auto" con un
+    modelo del runtime NumPy) equivale a `predict_candidate`.
+    """
+    if INFERENCE_BROKER == "0" or (INFERENCE_BROKER == "auto" and isinstance(_model, NumpyMLP)):
+        return predict_candidate(candidate_data)
+    if _model is None or _classes is None or _feature_encoder is None:
+        return "Modelo no cargado. Por favor, entrena el modelo primero."
+
+    cached = _prediction_cache.get((_model_version, *feature_key(candidate_data)))
+    if cached is not None:
+        return cached
+    return _broker.predict(candidate_data, timeout)
+
+def inference_broker_stats():
+    """Número de lotes y tamaño medio de lote del broker de inferencia."""
+    return _broker.stats()
+
+def predict_batch(candidates, batch_size=PREDICT_BATCH_SIZE, lookup_cache=True):
+    """
+    Realiza predicciones para muchos candidatos con una sola pasada del modelo.
+
+    Los perfiles que ya están en el cache de predicciones no se recalculan y
+    los repetidos dentro del lote se calculan una sola vez. El resto se
+    codifica en una sola matriz NumPy alineada con `_training_columns` (ya
+    escalada por `_feature_encoder`) y se envía a un único `model.predict`
+    dividido en lotes de `batch_size` filas.
+
+    Args:
+        candidates (list[dict]): Registros con las mismas claves que acepta `predict_candidate`.
+        batch_size (int): Número de filas por lote en la inferencia.
+        lookup_cache (bool): False si el llamador ya consultó el cache para estos
+                             candidatos (el broker); las predicciones se guardan igual.
+
+    Returns:
+        list[str]: El nivel predicho para cada candidato, en el mismo orden.
+                   "Error" para los registros que no se pudieron codificar.
+    """
+    global _model, _classes, _feature_encoder
+
+    if _model is None or _classes is None or _feature_encoder is None:
+        return ["Modelo no cargado. Por favor, entrena el modelo primero."] * len(candidates)
+
+    if not candidates:
+        return []
+
+    results = ["Error"] * len(candidates)
+
+    # Filas pendientes agrupadas por clave: cada perfil distinto se predice una vez
+    pending = {}
+    for row, candidate_data in enumerate(candidates):
+        cache_key = (_model_version, *feature_key(candidate_data))
+        rows = pending.get(cache_key)
+        if rows is not None:
+            rows.append(row)
+            continue
+        cached = _prediction_cache.get(cache_key) if lookup_cache else None
+        if cached is not None:
+            results[row] = cached
+        else:
+            pending[cache_key] = [row]
+
+    if not pending:
+        return results
+    if lookup_cache:
+        # Las filas repetidas se responden con la predicción de la primera, como un acierto.
+        # Por el broker cada fila ya contó su consulta en predict_candidate_batched.
+        _prediction_cache.record_hits(sum(len(rows) - 1 for rows in pending.values()))
+
+    keys = list(pending)
+    start = time.perf_counter()
+    X_input, valid = _feature_encoder.transform([candidates[pending[k][0]] for k in keys])
+    encoded = time.perf_counter()
+    if not valid.any():
+        return results
+
+    prediction = _model.predict(X_input, batch_size=batch_size, verbose=0)
+    if _timing_observer is not None:
+        _timing_observer("feature_encoding", encoded - start)
+        _timing_observer("model_inference", time.perf_counter() - encoded)
+    predicted_labels = _classes[np.argmax(prediction, axis=1)]
+
+    for idx, label in zip(np.flatnonzero(valid), predicted_labels):
+        label = str(label)
+        _prediction_cache.put(keys[idx], label)
+        for row in pending[keys[idx]]:
+            results[row] = label
+
+    return results
+
 if __name__ == "__main__":
-    # Test local
-    trained_model = train_model()
+    parser = argparse.ArgumentParser(description="Entrena o carga el modelo de predicción de nivel.")
+    parser.add_argument("--file", default=TRAINING_FILE, help="Archivo Excel de entrenamiento")
+    parser.add_argument("--retrain", action="store_true", help="Reentrenar aunque exista un artefacto guardado")
+    parser.add_argument("--search", choices=["grid", "random"],
+                        help="Buscar hiperparámetros y publicar el mejor modelo")
+    parser.add_argument("--trials", type=int, default=20, help="Pruebas de la búsqueda aleatoria")
+    parser.add_argument("--jobs", type=int, default=None, help="Procesos en paralelo (por defecto, uno por núcleo)")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla de la búsqueda aleatoria")
+    parser.add_argument("--backend", choices=sorted(backends.BACKENDS), default=None,
+                        help="Backend del modelo (por defecto EDU_MODEL_BACKEND o mlp)")
+    parser.add_argument("--compare", action="store_true",
+                        help="Comparar los backends (precisión, entrenamiento, latencia y memoria) sin publicar")
+    parser.add_argument("--report", default=None, help="Guardar el reporte de --compare en este JSON")
+    args = parser.parse_args()
+
+    if args.compare:
+        import model_compare
+
+        results = model_compare.compare(args.file, [args.backend] if args.backend else None)
+        print(model_compare.format_report(results))
+        if args.report:
+            model_compare.write_report(results, args.report)
+        raise SystemExit(0)
+
+    if args.search:
+        import hyperparam_search
+
+        if args.search == "grid":
+            trials = hyperparam_search.grid_trials()
+        else:
+            trials = hyperparam_search.random_trials(args.trials, seed=args.seed)
+        print(f"Búsqueda {args.search}: {len(trials)} pruebas")
+        results = hyperparam_search.search(args.file, trials, jobs=args.jobs)
+        if not results:
+            raise SystemExit("Ninguna prueba terminó correctamente.")
+        best = results[0]
+        print(f"Mejor: val_accuracy={best['val_accuracy']:.4f} {best['params']}")
+        trained_model = publish_best_trial(args.file, best)
+    else:
+        trained_model = load_or_train_model(args.file, force_retrain=args.retrain, backend=args.backend)
 
     if trained_model:
         print("\nRealizando una predicción de prueba:")
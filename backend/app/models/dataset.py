@@ -0,0 +1,105 @@
+import os
+
+import numpy as np
+
+import artifacts
+
+# Conjunto de entrenamiento ya limpio y codificado, guardado como .npz junto a los
+# artefactos y versionado por el hash del Excel: leerlo evita openpyxl y pandas.
+DATASET_DIR = os.path.join(artifacts.ARTIFACTS_DIR, "datasets")
+
+# Se incrementa si cambia la limpieza o la codificación de abajo
+DATASET_FORMAT = 1
+
+FEATURES = ["Experiencia_años", "Nivel_Educativo", "Campo_Estudio"]
+TARGET = "Nivel"
+
+
+def dataset_path(file_path, root=None):
+    digest = artifacts.file_hash(file_path)[:16]
+    return os.path.join(root or DATASET_DIR, f"d{DATASET_FORMAT}-{digest}.npz")
+
+
+def _normalize_columns(columns):
+    # Limpiar los nombres de las columnas para que coincidan con las características esperadas
+    columns = columns.str.replace(' ', '_').str.replace('(', '').str.replace(')', '')
+    # Normalizar nombres de columna (quitar espacios y acentos para evitar errores)
+    return columns.str.strip().str.replace(" ", "_").str.replace("á", "a").str.replace("é", "e") \
+        .str.replace("í", "i").str.replace("ó", "o").str.replace("ú", "u")
+
+
+def parse_excel(file_path):
+    """
+    Lee el Excel de entrenamiento y devuelve `(X, y, columnas)`.
+
+    X es la matriz sin escalar (experiencia + one-hot de nivel educativo y
+    campo de estudio, en el orden de `pd.get_dummies`), y son las etiquetas
+    de `Nivel` como texto y columnas los nombres de las columnas de X.
+    """
+    import pandas as pd
+
+    df = pd.read_excel(file_path, header=1)
+    df.columns = _normalize_columns(df.columns)
+
+    # Aplica la misma normalizacion a los nombres esperados para comparación robusta
+    features = [c.strip().replace(" ", "_").replace("á", "a").replace("é", "e").replace("í", "i")
+                .replace("ó", "o").replace("ú", "u") for c in FEATURES]
+    target = TARGET.strip().replace(" ", "_")
+
+    # Verificar existencia de columnas
+    missing = [c for c in features + [target] if c not in df.columns]
+    if missing:
+        raise ValueError(f"Faltan columnas en el Excel: {missing}")
+
+    df = df[features + [target]].copy()
+
+    df["Experiencia_años"] = pd.to_numeric(df["Experiencia_años"], errors='coerce')
+
+    # Categorías a texto seguro
+    df["Nivel_Educativo"] = df["Nivel_Educativo"].fillna("Desconocido").astype(str)
+    df["Campo_Estudio"] = df["Campo_Estudio"].fillna("Desconocido").astype(str)
+
+    df[target] = df[target].astype(str)
+
+    # Eliminar filas con datos faltantes
+    df = df.dropna(subset=["Experiencia_años", "Nivel_Educativo", "Campo_Estudio", target])
+
+    df_cat = pd.get_dummies(
+        df[["Nivel_Educativo", "Campo_Estudio"]],
+        prefix=["NivelEd", "Campo"]
+    )
+
+    # Dataset final de entrada X
+    X_df = pd.concat(
+        [df[["Experiencia_años"]].reset_index(drop=True),
+         df_cat.reset_index(drop=True)],
+        axis=1
+    )
+
+    X = X_df.to_numpy(dtype=np.float64)
+    y = df[target].to_numpy(dtype=str)
+    return X, y, X_df.columns.tolist()
+
+
+def load_dataset(file_path, use_cache=True, root=None):
+    """
+    Devuelve `(X, y, columnas)` del archivo de entrenamiento, desde el cache
+    .npz si existe uno para el contenido actual del archivo.
+    """
+    path = dataset_path(file_path, root)
+    if use_cache and os.path.exists(path):
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                return data["X"], data["y"], data["columns"].tolist()
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Cache del dataset ilegible, se volverá a leer el Excel: {e}")
+
+    X, y, columns = parse_excel(file_path)
+
+    if use_cache:
+        # Escritura atómica: otro proceso nunca lee un .npz a medias
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, X=X, y=y, columns=np.array(columns, dtype=str))
+        os.replace(tmp_path, path)
+    return X, y, columns
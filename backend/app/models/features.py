@@ -0,0 +1,116 @@
+import numpy as np
+
+# Prefijos que usa pd.get_dummies en train_model para las columnas categóricas
+NIVEL_PREFIX = "NivelEd_"
+CAMPO_PREFIX = "Campo_"
+EXPERIENCE_COLUMN = "Experiencia_años"
+
+
+def feature_key(candidate_data):
+    """
+    Tupla normalizada (experiencia, nivel educativo, campo de estudio) con la
+    que el modelo ve a un candidato: dos registros con la misma clave reciben
+    la misma predicción.
+    """
+    experience = candidate_data.get("Experiencia (años)", 0)
+    try:
+        experience = float(experience)
+    except (TypeError, ValueError):
+        experience = str(experience)
+    return (
+        experience,
+        str(candidate_data.get("Nivel Educativo", "Desconocido")),
+        str(candidate_data.get("Campo Estudio", "Desconocido")),
+    )
+
+
+class FeatureEncoder:
+    """
+    Codificador precompilado de las características del modelo.
+
+    Reemplaza la cadena DataFrame -> get_dummies -> concat -> alineación de
+    columnas -> StandardScaler en la ruta de predicción. Cada valor de
+    `Nivel_Educativo` y `Campo_Estudio` visto en el entrenamiento se mapea a su
+    índice de columna, y la media y escala del scaler se aplican de antemano:
+    una columna one-hot solo puede valer 0 o 1, así que ambos valores escalados
+    se calculan una vez al construir el codificador.
+
+    El resultado es idéntico bit a bit al de `_scaler.transform` sobre la
+    matriz que construía el pipeline de pandas.
+    """
+
+    def __init__(self, training_columns, mean, scale):
+        self.columns = list(training_columns)
+        self.n_features = len(self.columns)
+        self.exp_index = self.columns.index(EXPERIENCE_COLUMN)
+
+        self.nivel_index = {}
+        self.campo_index = {}
+        for i, col in enumerate(self.columns):
+            if col.startswith(NIVEL_PREFIX):
+                self.nivel_index[col[len(NIVEL_PREFIX):]] = i
+            elif col.startswith(CAMPO_PREFIX):
+                self.campo_index[col[len(CAMPO_PREFIX):]] = i
+
+        mean = np.asarray(mean, dtype=np.float64)
+        scale = np.asarray(scale, dtype=np.float64)
+
+        # Mismas operaciones que StandardScaler.transform: (x - mean) / scale
+        self._zero_row = (np.zeros(self.n_features) - mean) / scale
+        self._one_row = (np.ones(self.n_features) - mean) / scale
+        self._exp_mean = mean[self.exp_index]
+        self._exp_scale = scale[self.exp_index]
+
+    @classmethod
+    def from_scaler(cls, training_columns, scaler):
+        return cls(training_columns, scaler.mean_, scaler.scale_)
+
+    def _column_indices(self, candidate_data):
+        nivel = str(candidate_data.get("Nivel Educativo", "Desconocido"))
+        campo = str(candidate_data.get("Campo Estudio", "Desconocido"))
+        # Las categorías no vistas en el entrenamiento se descartan, igual que al alinear columnas
+        return self.nivel_index.get(nivel), self.campo_index.get(campo)
+
+    def _fill_row(self, row, candidate_data):
+        experience = float(candidate_data.get("Experiencia (años)", 0))
+        row[:] = self._zero_row
+        row[self.exp_index] = (experience - self._exp_mean) / self._exp_scale
+        for idx in self._column_indices(candidate_data):
+            if idx is not None:
+                row[idx] = self._one_row[idx]
+
+    def transform_one(self, candidate_data, out=None):
+        """
+        Codifica un candidato en una matriz de una fila ya escalada.
+
+        Args:
+            candidate_data (dict): Datos del candidato con las claves del JSON.
+            out (np.ndarray, opcional): Matriz (1, n_features) preasignada a reutilizar.
+
+        Returns:
+            np.ndarray: Matriz (1, n_features) lista para `model.predict`.
+        """
+        if out is None:
+            out = np.empty((1, self.n_features), dtype=np.float64)
+        self._fill_row(out[0], candidate_data)
+        return out
+
+    def transform(self, candidates):
+        """
+        Codifica muchos candidatos en una sola matriz ya escalada.
+
+        Returns:
+            tuple: (X, valid) donde `X` solo contiene las filas válidas y `valid`
+                   es una máscara booleana sobre `candidates` que vale False para
+                   los registros cuya experiencia no se pudo convertir a número.
+        """
+        X = np.empty((len(candidates), self.n_features), dtype=np.float64)
+        valid = np.ones(len(candidates), dtype=bool)
+        for row, candidate_data in enumerate(candidates):
+            try:
+                self._fill_row(X[row], candidate_data)
+            except (TypeError, ValueError):
+                valid[row] = False
+        if not valid.all():
+            X = X[valid]
+        return X, valid
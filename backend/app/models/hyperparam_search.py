@@ -0,0 +1,96 @@
+import itertools
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Espacio de búsqueda de `python codigoia.py --search grid|random`
+SEARCH_SPACE = {
+    "layers": [[32, 16], [64, 32, 16], [128, 64, 32]],
+    "dropout": [0.0, 0.2, 0.4],
+    "learning_rate": [0.0003, 0.001, 0.003],
+    "epochs": [30, 60, 120],
+    "batch_size": [16, 32],
+}
+
+# Semilla de Keras de cada prueba; el mejor modelo se reentrena con la misma
+TRIAL_SEED = 42
+
+
+def grid_trials(space=SEARCH_SPACE):
+    """Todas las combinaciones del espacio de búsqueda."""
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[n] for n in names))]
+
+
+def random_trials(n_trials, space=SEARCH_SPACE, seed=0):
+    """`n_trials` combinaciones distintas elegidas al azar (reproducible con `seed`)."""
+    trials = grid_trials(space)
+    random.Random(seed).shuffle(trials)
+    return trials[:n_trials]
+
+
+def _init_worker():
+    # Un hilo de TensorFlow por proceso: el paralelismo viene del pool
+    os.environ.setdefault("TF_NUM_INTRAOP_THREADS", "1")
+    os.environ.setdefault("TF_NUM_INTEROP_THREADS", "1")
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+
+
+def run_trial(file_path, params, seed=TRIAL_SEED):
+    """
+    Entrena una red con `params` (con early stopping) y devuelve sus métricas.
+
+    Se ejecuta en un proceso del pool; el dataset sale del cache .npz, así
+    que cada prueba solo paga el entrenamiento.
+    """
+    import codigoia
+    import dataset
+    from keras.utils import set_random_seed, to_categorical
+
+    set_random_seed(seed)
+    start = time.perf_counter()
+    X, y_labels, _ = dataset.load_dataset(file_path)
+    X_train, X_test, y_train, y_test, _, encoder = codigoia.split_and_scale(X, y_labels)
+    n_classes = len(encoder.classes_)
+    y_train, y_test = to_categorical(y_train, n_classes), to_categorical(y_test, n_classes)
+    _, history = codigoia.fit_model(X_train, y_train, X_test, y_test, params, early_stopping=True)
+    return {
+        "params": params,
+        "val_accuracy": float(max(history.history["val_accuracy"])),
+        "val_loss": float(min(history.history["val_loss"])),
+        "epochs_run": len(history.history["loss"]),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def search(file_path, trials, jobs=None):
+    """
+    Evalúa `trials` en paralelo y devuelve los resultados ordenados del mejor
+    al peor (mayor val_accuracy, luego menor val_loss).
+
+    Los procesos se crean con "spawn": TensorFlow no es seguro tras un fork.
+    """
+    import dataset
+
+    # Llenar el cache antes de repartir, para que ningún worker lea el Excel
+    dataset.load_dataset(file_path)
+
+    jobs = jobs or min(len(trials), os.cpu_count() or 1)
+    results = []
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(jobs, mp_context=context, initializer=_init_worker) as pool:
+        futures = [pool.submit(run_trial, file_path, params) for params in trials]
+        for i, future in enumerate(as_completed(futures), 1):
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"[{i}/{len(trials)}] prueba fallida: {e}")
+                continue
+            results.append(result)
+            print(f"[{i}/{len(trials)}] val_accuracy={result['val_accuracy']:.4f} "
+                  f"épocas={result['epochs_run']} {result['seconds']:.1f}s {result['params']}")
+
+    results.sort(key=lambda r: (-r["val_accuracy"], r["val_loss"]))
+    return results
@@ -0,0 +1,89 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class InferenceBroker:
+    """
+    Agrupa predicciones individuales de varios hilos en micro-lotes.
+
+    Cada llamada a `submit` encola un candidato y devuelve un Future. Un hilo
+    de fondo junta los pendientes hasta `max_batch_size` o hasta que el más
+    antiguo lleva `max_wait` segundos esperando, llama una sola vez a
+    `predict_fn(candidatos)` (que devuelve una lista en el mismo orden) y
+    resuelve los Future de cada llamador.
+
+    El hilo se crea en el primer uso y de nuevo tras un fork, así que cada
+    proceso worker tiene el suyo.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=64, max_wait=0.002):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self.batches = 0
+        self.items = 0
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._queue = queue.SimpleQueue()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, args=(self._queue,),
+                                                name='inference-broker', daemon=True)
+                self._thread.start()
+            return self._queue
+
+    def submit(self, candidate):
+        """Encola un candidato y devuelve un Future con su predicción."""
+        future = Future()
+        self._ensure_worker().put((candidate, future))
+        return future
+
+    def predict(self, candidate, timeout=None):
+        return self.submit(candidate).result(timeout)
+
+    def _collect(self, pending):
+        # Bloquea hasta el primer pedido y luego junta los que lleguen antes del plazo
+        batch = [pending.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(pending.get(timeout=remaining) if remaining > 0 else pending.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self, pending):
+        while True:
+            batch = self._collect(pending)
+            futures = [future for _, future in batch if future.set_running_or_notify_cancel()]
+            candidates = [candidate for candidate, future in batch if future.running()]
+            if not futures:
+                continue
+            try:
+                results = self.predict_fn(candidates)
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.items += len(futures)
+            for future, result in zip(futures, results):
+                future.set_result(result)
+
+    def stats(self):
+        return {
+            'batches': self.batches,
+            'items': self.items,
+            'avg_batch_size': self.items / self.batches if self.batches else 0.0,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000,
+        }
@@ -0,0 +1,111 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+import backends
+import dataset
+from features import FeatureEncoder
+
+# Filas de validación usadas para medir la latencia por lote, y repeticiones por medida
+BATCH_ROWS = 1000
+SINGLE_ROW_CALLS = 500
+
+
+def _percentiles(samples):
+    samples = np.asarray(samples) * 1000  # ms
+    return {"p50_ms": float(np.percentile(samples, 50)), "p95_ms": float(np.percentile(samples, 95)),
+            "p99_ms": float(np.percentile(samples, 99))}
+
+
+def _directory_size(path):
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, files in os.walk(path) for name in files)
+
+
+def compare_backend(name, X, y_labels, columns, runtime="numpy"):
+    """
+    Entrena un backend, lo guarda y lo vuelve a cargar como se sirve en
+    producción, y mide precisión, tiempo de entrenamiento, latencia y memoria.
+    """
+    import codigoia
+
+    backend = backends.get_backend(name)
+    X_train, X_test, y_train, y_test, scaler, encoder = codigoia.split_and_scale(X, y_labels)
+
+    start = time.perf_counter()
+    model, _ = backend.fit(X_train, y_train, X_test, y_test, len(encoder.classes_),
+                           dict(codigoia.DEFAULT_PARAMS) if name == "mlp" else None)
+    train_seconds = time.perf_counter() - start
+
+    directory = tempfile.mkdtemp(prefix=f"compare-{name}-")
+    try:
+        backend.save(model, directory)
+        artifact_bytes = _directory_size(directory)
+
+        # Memoria asignada en Python al cargar el modelo servido (pico de tracemalloc)
+        tracemalloc.start()
+        served = backend.load(directory, runtime)
+        _, load_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    accuracy = float(np.mean(np.argmax(served.predict(X_test, verbose=0), axis=1) == y_test))
+
+    # Una fila por llamada, desde el diccionario del candidato como en /register
+    feature_encoder = FeatureEncoder.from_scaler(columns, scaler)
+    candidates = [{
+        "Experiencia (años)": float(row[0]),
+        "Nivel Educativo": "Licenciatura",
+        "Campo Estudio": "Informática",
+    } for row in X[:SINGLE_ROW_CALLS]]
+    single = []
+    for candidate in candidates:
+        start = time.perf_counter()
+        np.argmax(served.predict(feature_encoder.transform_one(candidate), verbose=0), axis=1)
+        single.append(time.perf_counter() - start)
+
+    rows = np.resize(X_test, (BATCH_ROWS, X_test.shape[1])) if len(X_test) else X_test
+    batch = []
+    for _ in range(20):
+        start = time.perf_counter()
+        np.argmax(served.predict(rows, verbose=0), axis=1)
+        batch.append(time.perf_counter() - start)
+
+    return {
+        "backend": name,
+        "accuracy": accuracy,
+        "train_seconds": train_seconds,
+        "single_row": _percentiles(single),
+        "batch": dict(_percentiles(batch), rows=BATCH_ROWS,
+                      us_per_row=float(np.median(batch)) / BATCH_ROWS * 1e6),
+        "artifact_bytes": artifact_bytes,
+        "load_peak_bytes": load_peak,
+    }
+
+
+def compare(file_path, names=None, runtime="numpy"):
+    """Compara los backends `names` (por defecto todos) sobre el mismo dataset y split."""
+    X, y_labels, columns = dataset.load_dataset(file_path)
+    return [compare_backend(name, X, y_labels, columns, runtime) for name in (names or list(backends.BACKENDS))]
+
+
+def format_report(results):
+    lines = [f"{'backend':<8} {'accuracy':>8} {'train s':>8} {'1 fila p50 ms':>14} {'1 fila p99 ms':>14} "
+             f"{'lote µs/fila':>13} {'artefacto KB':>13} {'carga KB':>9}"]
+    for r in results:
+        lines.append(f"{r['backend']:<8} {r['accuracy']:>8.4f} {r['train_seconds']:>8.2f} "
+                     f"{r['single_row']['p50_ms']:>14.3f} {r['single_row']['p99_ms']:>14.3f} "
+                     f"{r['batch']['us_per_row']:>13.2f} {r['artifact_bytes'] / 1024:>13.1f} "
+                     f"{r['load_peak_bytes'] / 1024:>9.1f}")
+    return "\n".join(lines)
+
+
+def write_report(results, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=4, ensure_ascii=False)
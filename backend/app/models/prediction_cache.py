@@ -0,0 +1,58 @@
+import threading
+from collections import OrderedDict
+
+
+class PredictionCache:
+    """
+    Cache LRU acotado de predicciones.
+
+    La clave es la versión del modelo más `features.feature_key` del
+    candidato: el modelo solo mira esas tres características, así que los
+    perfiles repetidos no necesitan volver a pasar por la red.
+    """
+
+    def __init__(self, max_size=4096):
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def record_hits(self, count):
+        """Suma aciertos resueltos fuera de `get` (filas repetidas dentro de un mismo lote)."""
+        with self._lock:
+            self.hits += count
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,87 @@
+import numpy as np
+
+# Formato de inferencia exportado: pesos de las capas densas en un .npz, sin TensorFlow
+WEIGHTS_FILE = "inference.npz"
+
+
+def _relu(x):
+    return np.maximum(x, 0, out=x)
+
+
+def _softmax(x):
+    x = x - x.max(axis=1, keepdims=True)
+    np.exp(x, out=x)
+    x /= x.sum(axis=1, keepdims=True)
+    return x
+
+
+def _linear(x):
+    return x
+
+
+ACTIVATIONS = {
+    "relu": _relu,
+    "softmax": _softmax,
+    "linear": _linear,
+}
+
+
+def export_mlp(model, path):
+    """
+    Exporta las capas densas de un modelo Keras Sequential a un .npz.
+
+    Las capas sin pesos (Dropout) se omiten porque en inferencia son la
+    identidad. No importa Keras: solo usa `get_weights` y `get_config`.
+    """
+    arrays = {}
+    activations = []
+    for layer in model.layers:
+        weights = layer.get_weights()
+        if not weights:
+            continue
+        activation = layer.get_config().get("activation", "linear")
+        if activation not in ACTIVATIONS:
+            raise ValueError(f"Activación no soportada en el runtime NumPy: {activation}")
+        kernel, bias = weights
+        idx = len(activations)
+        arrays[f"W{idx}"] = kernel.astype(np.float32)
+        arrays[f"b{idx}"] = bias.astype(np.float32)
+        activations.append(activation)
+    arrays["activations"] = np.array(activations)
+    np.savez(path, **arrays)
+
+
+class NumpyMLP:
+    """
+    Forward pass de la red densa exportada por `export_mlp`, solo con NumPy.
+
+    Expone `predict(X, ...)` con la misma firma que usa codigoia sobre el
+    modelo Keras, así que puede sustituirlo directamente en `_model`.
+    """
+
+    def __init__(self, weights, biases, activations):
+        self.weights = weights
+        self.biases = biases
+        self.activations = [ACTIVATIONS[a] for a in activations]
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            activations = [str(a) for a in data["activations"]]
+            weights = [data[f"W{i}"] for i in range(len(activations))]
+            biases = [data[f"b{i}"] for i in range(len(activations))]
+        return cls(weights, biases, activations)
+
+    def _forward(self, X):
+        out = np.asarray(X, dtype=np.float32)
+        for W, b, activation in zip(self.weights, self.biases, self.activations):
+            out = activation(out @ W + b)
+        return out
+
+    def predict(self, X, batch_size=None, verbose=0):
+        if batch_size is None or len(X) <= batch_size:
+            return self._forward(X)
+        return np.concatenate([
+            self._forward(X[start:start + batch_size])
+            for start in range(0, len(X), batch_size)
+        ])
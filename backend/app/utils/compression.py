@@ -0,0 +1,107 @@
+import gzip
+import os
+import threading
+from collections import OrderedDict
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip is offered
+    brotli = None
+
+# Response compression negotiated from Accept-Encoding (br preferred over gzip)
+ENABLED = os.environ.get('EDU_COMPRESSION', '1') == '1'
+# Smaller bodies are sent as they are; the headers would eat most of the gain
+MIN_SIZE = int(os.environ.get('EDU_COMPRESSION_MIN_SIZE', '1024'))
+GZIP_LEVEL = int(os.environ.get('EDU_GZIP_LEVEL', '6'))
+BROTLI_QUALITY = int(os.environ.get('EDU_BROTLI_QUALITY', '5'))
+# Compressed bodies of responses with an ETag (GET /api/records) kept per encoding
+CACHE_SIZE = 8
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'application/javascript', 'text/')
+
+
+def _gzip(body):
+    # mtime=0: the same body always compresses to the same bytes
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _brotli(body):
+    return brotli.compress(body, quality=BROTLI_QUALITY)
+
+
+ENCODERS = {'gzip': _gzip}
+if brotli is not None:
+    ENCODERS = {'br': _brotli, **ENCODERS}
+
+
+def choose_encoding(accept_encodings):
+    """The encoding to use for a werkzeug Accept-Encoding header, or None."""
+    best, best_quality = None, 0
+    for name in ENCODERS:  # in order of preference
+        quality = accept_encodings[name]
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+class Compressor:
+    """
+    after_request hook compressing buffered responses (JSON, NDJSON, text).
+
+    Streamed responses (record exports) and bodies under MIN_SIZE are left
+    alone. A response with an ETag is compressed once per encoding and
+    reused while the ETag is the same, so polling GET /api/records does not
+    recompress an unchanged table. Its ETag becomes weak, as the encoded
+    bytes differ from the identity body; If-None-Match still matches it.
+    """
+
+    def __init__(self, min_size=MIN_SIZE, cache_size=CACHE_SIZE):
+        self.min_size = min_size
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _encode(self, encoding, body, etag):
+        if etag is None:
+            return ENCODERS[encoding](body)
+        key = (etag, encoding)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+        encoded = ENCODERS[encoding](body)
+        with self._lock:
+            self._cache[key] = encoded
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return encoded
+
+    def __call__(self, response):
+        response.vary.add('Accept-Encoding')
+        if (response.direct_passthrough or response.is_streamed
+                or not 200 <= response.status_code < 300 or response.status_code == 204
+                or 'Content-Encoding' in response.headers
+                or not (response.mimetype or '').startswith(COMPRESSIBLE_TYPES)):
+            return response
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+        body = response.get_data()
+        if len(body) < self.min_size:
+            return response
+
+        etag, weak = response.get_etag()
+        response.set_data(self._encode(encoding, body, None if weak else etag))
+        response.headers['Content-Encoding'] = encoding
+        if etag is not None and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+
+def instrument_app(app, compressor=None):
+    """Compress the app's responses when ENABLED (EDU_COMPRESSION=0 turns it off)."""
+    if ENABLED:
+        app.after_request(compressor or Compressor())
@@ -0,0 +1,244 @@
+import base64
+import hashlib
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+from Crypto.Cipher import AES, PKCS1_v1_5
+from Crypto.PublicKey import RSA
+from Crypto.Random import get_random_bytes
+
+import metrics
+from storage import FileLock
+
+# The RSA key pair lives on disk so every worker process (and every restart)
+# serves the same public key. It is generated once, under a file lock, if missing.
+KEYS_DIR = os.environ.get('EDU_KEYS_DIR', 'keys')
+PRIVATE_KEY_FILE = os.path.join(KEYS_DIR, 'private.pem')
+RSA_BITS = 2048
+
+# Session mode: lifetime of a session key and how many decoded sessions each process keeps
+SESSION_TTL = int(os.environ.get('EDU_SESSION_TTL', '900'))
+SESSION_CACHE_SIZE = int(os.environ.get('EDU_SESSION_CACHE_SIZE', '10000'))
+# Expired sessions are dropped on lookup and by a sweep at most this often (seconds)
+SESSION_SWEEP_INTERVAL = 60
+
+GCM_TAG_SIZE = 16
+GCM_NONCE_SIZE = 12
+
+
+class DecryptionError(ValueError):
+    pass
+
+
+class SessionExpired(DecryptionError):
+    pass
+
+
+def load_or_create_private_key(path=PRIVATE_KEY_FILE, bits=RSA_BITS):
+    """Read the RSA private key at `path`, generating and saving it first if it does not exist."""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    with FileLock(f"{path}.lock"):
+        if not os.path.exists(path):
+            key = RSA.generate(bits)
+            tmp_path = f"{path}.tmp"
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(key.export_key())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+            return key
+    with open(path, 'rb') as f:
+        return RSA.import_key(f.read())
+
+
+@metrics.timed('aes_decrypt')
+def aes_gcm_decrypt(aes_key, iv, data):
+    """Decrypt WebCrypto AES-GCM output (ciphertext with the 16-byte tag appended)."""
+    if len(data) < GCM_TAG_SIZE:
+        raise DecryptionError("Ciphertext too short")
+    cipher = AES.new(aes_key, AES.MODE_GCM, nonce=iv)
+    try:
+        return cipher.decrypt_and_verify(data[:-GCM_TAG_SIZE], data[-GCM_TAG_SIZE:])
+    except ValueError:
+        raise DecryptionError("Authentication failed")
+
+
+def _b64decode(value, what):
+    if not isinstance(value, str) or not value:
+        raise DecryptionError(f"Missing {what}")
+    try:
+        return base64.b64decode(value, validate=True)
+    except (ValueError, TypeError):
+        raise DecryptionError(f"Invalid base64 in {what}")
+
+
+class DecryptionContext:
+    """
+    RSA + AES-GCM state built once per process and reused by every request.
+
+    Besides the per-request hybrid envelope ({key, iv, data}), it supports a
+    session mode: the client sends one RSA-wrapped AES key to `open_session`
+    and gets back a session ID, then sends {session, iv, data} envelopes that
+    skip the RSA decrypt entirely.
+
+    Session IDs are the AES key and its expiry sealed with AES-GCM under a
+    secret derived from the private key, so any worker sharing the key file
+    can open them. Opened sessions are kept in a per-process LRU until they
+    expire, which makes a cache hit a dictionary lookup.
+    """
+
+    def __init__(self, private_key, session_ttl=SESSION_TTL, cache_size=SESSION_CACHE_SIZE):
+        self.private_key = private_key
+        self.public_key_pem = private_key.publickey().export_key().decode('utf-8')
+        self.session_ttl = session_ttl
+        self.cache_size = cache_size
+        self._rsa = PKCS1_v1_5.new(private_key)
+        self._session_secret = hashlib.sha256(
+            b'edu-select-session\0' + private_key.export_key(format='DER')
+        ).digest()
+        self._sessions = OrderedDict()
+        self._swept_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path=PRIVATE_KEY_FILE, **kwargs):
+        return cls(load_or_create_private_key(path), **kwargs)
+
+    @metrics.timed('rsa_decrypt')
+    def unwrap_key(self, encrypted_key_b64):
+        """RSA-decrypt a wrapped AES key. The client wraps the key's base64 text, not its raw bytes."""
+        encrypted_key = _b64decode(encrypted_key_b64, 'key')
+        try:
+            key_b64 = self._rsa.decrypt(encrypted_key, None)
+        except ValueError:  # ciphertext of the wrong length for the RSA key
+            raise DecryptionError("Key decryption failed")
+        if key_b64 is None:
+            raise DecryptionError("Key decryption failed")
+        try:
+            aes_key = base64.b64decode(key_b64, validate=True)
+        except (ValueError, TypeError):
+            raise DecryptionError("Key decryption failed")
+        if len(aes_key) not in (16, 24, 32):
+            raise DecryptionError("Invalid AES key size")
+        return aes_key
+
+    def open_session(self, encrypted_key_b64, now=None):
+        """Exchange an RSA-wrapped AES key for `(session_id, expires_at)`."""
+        aes_key = self.unwrap_key(encrypted_key_b64)
+        expires_at = int((now if now is not None else time.time()) + self.session_ttl)
+        nonce = get_random_bytes(GCM_NONCE_SIZE)
+        cipher = AES.new(self._session_secret, AES.MODE_GCM, nonce=nonce)
+        sealed, tag = cipher.encrypt_and_digest(struct.pack('>Q', expires_at) + aes_key)
+        session_id = base64.urlsafe_b64encode(nonce + sealed + tag).decode('ascii')
+        self._remember(session_id, aes_key, expires_at)
+        return session_id, expires_at
+
+    def session_key(self, session_id, now=None):
+        """Return the AES key of a live session. Raises SessionExpired for unknown or expired IDs."""
+        now = now if now is not None else time.time()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None:
+                aes_key, expires_at = entry
+                if expires_at > now:
+                    self._sessions.move_to_end(session_id)
+                    return aes_key
+                del self._sessions[session_id]
+                raise SessionExpired("Session expired")
+
+        # Opened by another worker (or evicted here): unseal it instead of asking for a new exchange
+        try:
+            raw = base64.urlsafe_b64decode(session_id)
+        except (ValueError, TypeError):
+            raise SessionExpired("Unknown session")
+        if len(raw) < GCM_NONCE_SIZE + 8 + 16 + GCM_TAG_SIZE:
+            raise SessionExpired("Unknown session")
+        nonce, sealed, tag = raw[:GCM_NONCE_SIZE], raw[GCM_NONCE_SIZE:-GCM_TAG_SIZE], raw[-GCM_TAG_SIZE:]
+        cipher = AES.new(self._session_secret, AES.MODE_GCM, nonce=nonce)
+        try:
+            plain = cipher.decrypt_and_verify(sealed, tag)
+        except ValueError:
+            raise SessionExpired("Unknown session")
+        expires_at = struct.unpack('>Q', plain[:8])[0]
+        if expires_at <= now:
+            raise SessionExpired("Session expired")
+        aes_key = plain[8:]
+        self._remember(session_id, aes_key, expires_at)
+        return aes_key
+
+    def _remember(self, session_id, aes_key, expires_at):
+        if self.cache_size <= 0:
+            return
+        if time.monotonic() - self._swept_at > SESSION_SWEEP_INTERVAL:
+            self._swept_at = time.monotonic()
+            self.evict_expired()
+        with self._lock:
+            self._sessions[session_id] = (aes_key, expires_at)
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.cache_size:
+                self._sessions.popitem(last=False)
+
+    def evict_expired(self, now=None):
+        """Drop expired sessions from this process's cache. Returns how many were removed."""
+        now = now if now is not None else time.time()
+        with self._lock:
+            expired = [sid for sid, (_, expires_at) in self._sessions.items() if expires_at <= now]
+            for sid in expired:
+                del self._sessions[sid]
+            return len(expired)
+
+    def envelope_key(self, envelope):
+        """The AES key of an envelope: its session's key, or its RSA-wrapped `key` unwrapped."""
+        if not isinstance(envelope, dict):
+            raise DecryptionError("Envelope must be a JSON object")
+        session_id = envelope.get('session')
+        if session_id:
+            if not isinstance(session_id, str):
+                raise SessionExpired("Unknown session")
+            return self.session_key(session_id)
+        return self.unwrap_key(envelope.get('key'))
+
+    def decrypt_envelope(self, envelope):
+        """
+        Decrypt a /register envelope and return the plaintext bytes.
+
+        Accepts {key, iv, data} (one RSA decrypt) or {session, iv, data} (no RSA).
+        """
+        aes_key = self.envelope_key(envelope)
+        iv = _b64decode(envelope.get('iv'), 'iv')
+        data = _b64decode(envelope.get('data'), 'data')
+        return aes_gcm_decrypt(aes_key, iv, data)
+
+    def decrypt_chunks(self, envelope):
+        """
+        Decrypt a /register/batch envelope and return the plaintext of each chunk.
+
+        Accepts {key or session, chunks: [{iv, data}, ...]}, or a single
+        {key or session, iv, data}. The key is unwrapped once for all chunks;
+        every chunk must use its own IV, since repeating a GCM nonce under one
+        key breaks its confidentiality.
+        """
+        aes_key = self.envelope_key(envelope)
+        chunks = envelope.get('chunks')
+        if chunks is None:
+            chunks = [envelope]
+        if not isinstance(chunks, list) or not chunks or not all(isinstance(c, dict) for c in chunks):
+            raise DecryptionError("chunks must be a non-empty list of {iv, data}")
+        plaintexts = []
+        seen_ivs = set()
+        for chunk in chunks:
+            iv = _b64decode(chunk.get('iv'), 'iv')
+            if iv in seen_ivs:
+                raise DecryptionError("IV reused across chunks")
+            seen_ivs.add(iv)
+            plaintexts.append(aes_gcm_decrypt(aes_key, iv, _b64decode(chunk.get('data'), 'data')))
+        return plaintexts
+
+    def cache_stats(self):
+        with self._lock:
+            return {'sessions': len(self._sessions), 'max_size': self.cache_size}
@@ -0,0 +1,213 @@
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from storage import FileLock, atomic_write_json
+
+# Job state lives in small JSON files so any worker process can report progress or cancel a job
+JOBS_DIR = os.environ.get('EDU_JOBS_DIR', 'jobs')
+JOB_WORKERS = int(os.environ.get('EDU_JOB_WORKERS', '1'))
+MAX_JOB_FILES = 100
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    """
+    Handle passed to a running job function to report progress.
+
+    `progress()` persists the state and raises JobCancelled once a cancel has
+    been requested, so jobs stop at their next checkpoint.
+    """
+
+    def __init__(self, manager, job_id, kind):
+        self.manager = manager
+        self.id = job_id
+        self.state = {
+            'id': job_id,
+            'kind': kind,
+            'status': 'queued',
+            'total': None,
+            'processed': 0,
+            'result': None,
+            'error': None,
+            'pid': os.getpid(),
+            'created_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+        }
+
+    def cancelled(self):
+        return os.path.exists(self.manager._cancel_path(self.id))
+
+    def progress(self, processed=None, total=None):
+        if processed is not None:
+            self.state['processed'] = processed
+        if total is not None:
+            self.state['total'] = total
+        self.manager._save(self.state)
+        if self.cancelled():
+            raise JobCancelled()
+
+
+class JobManager:
+    """
+    Runs long jobs (e.g. rescoring every record) on a small local thread pool.
+
+    The pool is created on first use, after any fork, so each worker process
+    owns its own threads.
+    """
+
+    def __init__(self, jobs_dir=JOBS_DIR, max_workers=JOB_WORKERS):
+        self.jobs_dir = jobs_dir
+        self.max_workers = max_workers
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+        self._active = {}
+
+    def _path(self, job_id):
+        return os.path.join(self.jobs_dir, f'{job_id}.json')
+
+    def _cancel_path(self, job_id):
+        return os.path.join(self.jobs_dir, f'{job_id}.cancel')
+
+    def _save(self, state):
+        atomic_write_json(self._path(state['id']), state)
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix='job')
+                self._executor_pid = os.getpid()
+                self._active = {}
+            return self._executor
+
+    def _prune(self):
+        files = [f for f in os.listdir(self.jobs_dir) if f.endswith('.json')]
+        if len(files) <= MAX_JOB_FILES:
+            return
+        files.sort(key=lambda f: os.path.getmtime(os.path.join(self.jobs_dir, f)))
+        for name in files[:len(files) - MAX_JOB_FILES]:
+            job_id = name[:-len('.json')]
+            if job_id in self._active:
+                continue
+            for path in (self._path(job_id), self._cancel_path(job_id)):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass  # another worker pruned it first
+
+    def active(self, kind):
+        """Return the state of a queued or running job of `kind` in any worker process, if any."""
+        with self._lock:
+            for job in self._active.values():
+                if job.state['kind'] == kind:
+                    return dict(job.state)
+        # Jobs started by other workers: trust the state file only while its process is alive
+        if not os.path.isdir(self.jobs_dir):
+            return None
+        for name in os.listdir(self.jobs_dir):
+            if not name.endswith('.json'):
+                continue
+            try:
+                state = self.get(name[:-len('.json')])
+            except (OSError, ValueError):
+                continue  # being written or pruned by another worker
+            if state and state['kind'] == kind and state['status'] in ('queued', 'running') \
+                    and state.get('pid') != os.getpid() and _pid_alive(state.get('pid')):
+                return state
+        return None
+
+    def submit(self, kind, fn, *args, **kwargs):
+        """Queue `fn(job, *args, **kwargs)` and return the new job's state."""
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        pool = self._pool()
+        job = Job(self, uuid.uuid4().hex, kind)
+        self._save(job.state)
+        with self._lock:
+            self._active[job.id] = job
+            self._prune()
+        pool.submit(self._run, job, fn, args, kwargs)
+        return dict(job.state)
+
+    def submit_exclusive(self, kind, fn, *args, **kwargs):
+        """
+        Like `submit`, unless a job of `kind` is already queued or running in any
+        worker process. Returns `(state, started)`: the new job's state, or the
+        active job's state with started=False.
+
+        The check and the submit happen under a file lock per kind, so two
+        concurrent requests (in one worker or several) cannot both start a job.
+        """
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        with FileLock(os.path.join(self.jobs_dir, f'{kind}.lock')):
+            running = self.active(kind)
+            if running:
+                return running, False
+            # The queued state file is written before the lock is released, so other workers see it
+            return self.submit(kind, fn, *args, **kwargs), True
+
+    def _run(self, job, fn, args, kwargs):
+        job.state['status'] = 'running'
+        job.state['started_at'] = time.time()
+        try:
+            if job.cancelled():
+                raise JobCancelled()
+            job.progress()
+            job.state['result'] = fn(job, *args, **kwargs)
+            job.state['status'] = 'done'
+        except JobCancelled:
+            job.state['status'] = 'cancelled'
+        except Exception as e:
+            print(f"Job {job.id} failed: {e}")
+            job.state['status'] = 'failed'
+            job.state['error'] = str(e)
+        finally:
+            job.state['finished_at'] = time.time()
+            self._save(job.state)
+            with self._lock:
+                self._active.pop(job.id, None)
+
+    def get(self, job_id):
+        """Return a job's last saved state, or None."""
+        path = self._path(job_id)
+        if not _valid_id(job_id) or not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def cancel(self, job_id):
+        """Request cancellation. Returns the job state, or None if unknown."""
+        state = self.get(job_id)
+        if state is None:
+            return None
+        if state['status'] in ('queued', 'running'):
+            with open(self._cancel_path(job_id), 'w', encoding='utf-8'):
+                pass
+            state['cancel_requested'] = True
+        return state
+
+
+def _pid_alive(pid):
+    # Windows has no signal 0 (os.kill would terminate the process) and runs a
+    # single server process, so jobs owned by other pids there are leftovers
+    if not pid or os.name == 'nt':
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True  # exists, but owned by someone else (or no signal support)
+    return True
+
+
+def _valid_id(job_id):
+    # Job IDs are uuid4 hex strings; anything else must not reach the filesystem
+    return len(job_id) == 32 and all(c in '0123456789abcdef' for c in job_id)
@@ -0,0 +1,104 @@
+import json
+import math
+import os
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional: everything falls back to the standard library
+    orjson = None
+
+# JSON encoder for responses and storage: 'orjson' (default when installed) or 'json'
+ENCODER = os.environ.get('EDU_JSON_ENCODER', 'orjson')
+_orjson = orjson if ENCODER == 'orjson' else None
+
+if _orjson is not None:
+    _OPTIONS = _orjson.OPT_SERIALIZE_NUMPY
+    # With a `default`, dates and dataclasses reach it as they would with json.dumps
+    _DEFAULT_OPTIONS = _OPTIONS | _orjson.OPT_PASSTHROUGH_DATETIME | _orjson.OPT_PASSTHROUGH_DATACLASS
+
+
+def dumps(obj, sort_keys=False, default=None):
+    """
+    Compact UTF-8 JSON as bytes (no spaces, non-ASCII characters kept as-is).
+
+    Uses orjson when available. What it refuses (non-string keys, integers
+    over 64 bits) is encoded by the json module instead. Both write NaN and
+    infinities as null, as orjson does, so the output is valid JSON and the
+    same either way.
+    """
+    if _orjson is not None:
+        option = _DEFAULT_OPTIONS if default is not None else _OPTIONS
+        if sort_keys:
+            option |= _orjson.OPT_SORT_KEYS
+        try:
+            return _orjson.dumps(obj, default=default, option=option)
+        except TypeError:
+            pass
+    try:
+        return _json_dumps(obj, sort_keys, default)
+    except ValueError:
+        # Out-of-range floats somewhere in obj: rare, so only then pay for a copy
+        finite_default = None if default is None else (lambda o: _finite(default(o)))
+        return _json_dumps(_finite(obj), sort_keys, finite_default)
+
+
+def _json_dumps(obj, sort_keys, default):
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), allow_nan=False,
+                      sort_keys=sort_keys, default=default).encode('utf-8')
+
+
+def _finite(obj):
+    """Copy of obj with NaN and infinities replaced by None."""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {k: _finite(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(v) for v in obj]
+    return obj
+
+
+def dumps_str(obj, sort_keys=False, default=None):
+    return dumps(obj, sort_keys, default).decode('utf-8')
+
+
+def loads(data):
+    """Parse JSON text or UTF-8 bytes."""
+    if _orjson is not None:
+        try:
+            return _orjson.loads(data)
+        except _orjson.JSONDecodeError:
+            pass  # e.g. NaN written by json.dump, which orjson does not accept
+    return json.loads(data)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider (jsonify, request.json) backed by `dumps`/`loads`.
+
+    Keeps Flask's `default` hook, but responses are UTF-8 rather than
+    ASCII-escaped and keys stay in insertion order (records come out as
+    stored; sorting nearly doubled the encoding time). Calls with extra
+    json.dumps arguments (e.g. indent) use Flask's own encoder.
+    """
+
+    ensure_ascii = False
+    sort_keys = False
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return dumps_str(obj, self.sort_keys, self.default)
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj, self.sort_keys, self.default) + b'\n', mimetype=self.mimetype)
@@ -0,0 +1,349 @@
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Prometheus-format metrics without external dependencies. Each observation is
+# a perf_counter() pair plus a locked dict update, so it is cheap enough for
+# the request hot path.
+
+# With several worker processes, set EDU_METRICS_DIR: each process writes a
+# snapshot there every EDU_METRICS_FLUSH_INTERVAL seconds (and on every scrape),
+# and /metrics sums the snapshots of all live workers.
+METRICS_DIR = os.environ.get('EDU_METRICS_DIR')
+FLUSH_INTERVAL = float(os.environ.get('EDU_METRICS_FLUSH_INTERVAL', '5'))
+
+# Seconds; covers sub-millisecond stages (AES, encoding) up to slow full scans
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _label_key(labelnames, labels):
+    return tuple(str(labels.get(name, '')) for name in labelnames)
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+               for k, v in pairs)
+    return '{' + ','.join(escaped) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def snapshot(self):
+        with self._lock:
+            return {json.dumps(key): value for key, value in self._values.items()}
+
+    @staticmethod
+    def merge(into, values):
+        for key, value in values.items():
+            into[key] = into.get(key, 0) + value
+
+    def render(self, values):
+        lines = []
+        for key in sorted(values):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, json.loads(key))} "
+                         f"{_format_value(values[key])}")
+        return lines
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}  # label key -> [count per bucket..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[idx] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self):
+        with self._lock:
+            return {json.dumps(key): list(series) for key, series in self._values.items()}
+
+    @staticmethod
+    def merge(into, values):
+        for key, series in values.items():
+            current = into.get(key)
+            if current is None or len(current) != len(series):
+                into[key] = list(series)
+            else:
+                into[key] = [a + b for a, b in zip(current, series)]
+
+    def render(self, values):
+        lines = []
+        for key in sorted(values):
+            label_values = json.loads(key)
+            series = values[key]
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series[:-1]):
+                cumulative += count
+                labels = _format_labels(self.labelnames, label_values, [('le', _format_value(float(bound)))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, label_values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """Value computed at scrape time by `fn`, in the process answering the scrape."""
+
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, fn, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.fn = fn
+        self.labelnames = tuple(labelnames)
+
+    def render(self):
+        try:
+            value = self.fn()
+        except Exception as e:
+            print(f"Metric {self.name} failed: {e}")
+            return []
+        if not isinstance(value, dict):
+            return [f"{self.name} {_format_value(value)}"]
+        return [f"{self.name}{_format_labels(self.labelnames, key if isinstance(key, tuple) else (key,))} "
+                f"{_format_value(v)}" for key, v in sorted(value.items())]
+
+
+class Registry:
+    def __init__(self, directory=METRICS_DIR, flush_interval=FLUSH_INTERVAL):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._metrics = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+        self._flusher_pid = None
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name, documentation, fn, labelnames=()):
+        """Register (or replace) a scrape-time gauge."""
+        gauge = Gauge(name, documentation, fn, labelnames)
+        with self._lock:
+            self._gauges[name] = gauge
+        return gauge
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def snapshot(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: metric.snapshot() for metric in metrics}
+
+    # --- multi-process sharing ---
+
+    def _snapshot_path(self, pid):
+        return os.path.join(self.directory, f'{pid}.json')
+
+    def write_snapshot(self):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._snapshot_path(os.getpid())
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp_path, path)
+
+    def start_flusher(self):
+        """Start (once per process) the thread that writes this process's snapshot periodically."""
+        if not self.directory or self._flusher_pid == os.getpid():
+            return
+        self._flusher_pid = os.getpid()
+
+        def flush():
+            while True:
+                time.sleep(self.flush_interval)
+                try:
+                    self.write_snapshot()
+                except OSError as e:
+                    print(f"Error writing metrics snapshot: {e}")
+
+        threading.Thread(target=flush, name='metrics-flush', daemon=True).start()
+
+    def _collect(self):
+        if not self.directory:
+            return self.snapshot()
+        self.start_flusher()
+        self.write_snapshot()
+        merged = {}
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            try:
+                pid = int(name[:-len('.json')])
+            except ValueError:
+                continue
+            path = os.path.join(self.directory, name)
+            if pid != os.getpid() and not _pid_alive(pid):
+                try:
+                    os.remove(path)  # the worker exited; its counters restart from zero
+                except OSError:
+                    pass
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for metric_name, values in snapshot.items():
+                metric = self._metrics.get(metric_name)
+                if metric is not None:
+                    metric.merge(merged.setdefault(metric_name, {}), values)
+        return merged
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        collected = self._collect()
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+            gauges = list(self._gauges.values())
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render(collected.get(metric.name, {})))
+        for gauge in gauges:
+            lines.append(f"# HELP {gauge.name} {gauge.documentation}")
+            lines.append(f"# TYPE {gauge.name} gauge")
+            lines.extend(gauge.render())
+        return '\n'.join(lines) + '\n'
+
+
+def _pid_alive(pid):
+    # Same rule as jobs._pid_alive: Windows runs a single server process
+    if os.name == 'nt':
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+REGISTRY = Registry()
+
+REQUEST_LATENCY = REGISTRY.histogram(
+    'edu_http_request_duration_seconds', 'HTTP request latency by route', ('method', 'route'))
+REQUESTS = REGISTRY.counter(
+    'edu_http_requests_total', 'HTTP requests by route and status', ('method', 'route', 'status'))
+STAGE_LATENCY = REGISTRY.histogram(
+    'edu_stage_duration_seconds',
+    'Time spent in each hot-path stage (store_read, store_write, rsa_decrypt, aes_decrypt, '
+    'feature_encoding, model_inference)', ('stage',))
+ERRORS = REGISTRY.counter('edu_errors_total', 'Handled errors by kind', ('kind',))
+PREDICTIONS = REGISTRY.counter('edu_predictions_total', 'Predictions stored, by predicted level', ('label',))
+
+
+def observe_stage(stage, seconds):
+    STAGE_LATENCY.observe(seconds, stage=stage)
+
+
+@contextmanager
+def stage(name):
+    """Time a block as hot-path stage `name`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_LATENCY.observe(time.perf_counter() - start, stage=name)
+
+
+def timed(name):
+    """Decorator form of `stage`."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                STAGE_LATENCY.observe(time.perf_counter() - start, stage=name)
+        return wrapper
+    return decorator
+
+
+def count_error(kind):
+    ERRORS.inc(kind=kind)
+
+
+def instrument_app(app):
+    """Record latency and status of every request handled by `app`."""
+    from flask import g, request
+
+    @app.before_request
+    def _start_timer():
+        g._metrics_start = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        start = g.pop('_metrics_start', None)
+        if start is not None:
+            route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+            REQUEST_LATENCY.observe(time.perf_counter() - start, method=request.method, route=route)
+            REQUESTS.inc(method=request.method, route=route, status=response.status_code)
+        # Each worker process starts its own flusher on its first request
+        REGISTRY.start_flusher()
+        return response
+
+    return app
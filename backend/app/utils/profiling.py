@@ -0,0 +1,218 @@
+import cProfile
+import functools
+import io
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import tracemalloc
+
+# Opt-in profiling of slow requests and jobs. Off by default; with EDU_PROFILE=1
+# a fraction EDU_PROFILE_SAMPLE_RATE of requests runs under cProfile (plus
+# tracemalloc) and the ones slower than EDU_PROFILE_THRESHOLD_MS are written to
+# EDU_PROFILE_DIR as <name>.prof (load with `python -m pstats`) and a <name>.txt
+# summary of the top functions and allocations. Only the newest
+# EDU_PROFILE_KEEP dumps are kept.
+#
+# A request can also ask for a profile with the header
+#   X-Edu-Profile: <EDU_PROFILE_TOKEN>
+# which is only honoured when EDU_PROFILE_TOKEN is set, and always writes a dump.
+#
+# At most one profile runs per process at a time (tracemalloc is process-wide,
+# and so is cProfile on Python 3.12+), so concurrent sampled requests simply run
+# unprofiled. The profiler is enabled from the thread handling the request.
+# Before Python 3.12 it records only that thread, so time spent waiting on the
+# inference broker shows up as a wait. From 3.12 cProfile hooks sys.monitoring,
+# which covers every thread, so the dump also holds whatever other threads (the
+# broker, other requests) ran in the meantime.
+ENABLED = os.environ.get('EDU_PROFILE', '0') == '1'
+SAMPLE_RATE = float(os.environ.get('EDU_PROFILE_SAMPLE_RATE', '0.01'))
+THRESHOLD_MS = float(os.environ.get('EDU_PROFILE_THRESHOLD_MS', '500'))
+PROFILE_DIR = os.environ.get('EDU_PROFILE_DIR', 'profiles')
+MAX_PROFILES = int(os.environ.get('EDU_PROFILE_KEEP', '50'))
+TRACE_MEMORY = os.environ.get('EDU_PROFILE_TRACEMALLOC', '1') == '1'
+TOKEN = os.environ.get('EDU_PROFILE_TOKEN')
+
+PROFILE_HEADER = 'X-Edu-Profile'
+TOP_FUNCTIONS = 30
+TOP_ALLOCATIONS = 15
+TRACEMALLOC_FRAMES = 5
+FORCED_WAIT = 5  # seconds
+
+
+class ProfileSession:
+    """One cProfile (+ tracemalloc) capture around a request or job."""
+
+    def __init__(self, name, trace_memory=TRACE_MEMORY):
+        self.name = name
+        self.profile = cProfile.Profile()
+        # Leave tracemalloc alone if something else (e.g. a test) is already tracing
+        self.trace_memory = trace_memory and not tracemalloc.is_tracing()
+        self.elapsed = None
+        self.peak_memory = None
+        self.allocations = None
+
+    def start(self):
+        if self.trace_memory:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        self.started = time.perf_counter()
+        self.profile.enable()
+
+    def stop(self, keep):
+        """Stop capturing; the (costly) allocation snapshot is only taken if `keep`."""
+        self.profile.disable()
+        self.elapsed = time.perf_counter() - self.started
+        if self.trace_memory:
+            if keep:
+                self.peak_memory = tracemalloc.get_traced_memory()[1]
+                self.allocations = tracemalloc.take_snapshot().filter_traces((
+                    tracemalloc.Filter(False, tracemalloc.__file__),
+                    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+                ))
+            tracemalloc.stop()
+
+    def summary(self):
+        lines = [
+            f"{self.name}: {self.elapsed * 1000:.1f} ms (pid {os.getpid()}, "
+            f"{time.strftime('%Y-%m-%d %H:%M:%S')})",
+        ]
+        if self.peak_memory is not None:
+            lines.append(f"Peak traced memory: {self.peak_memory / 1024:.1f} KiB")
+        lines.append('')
+        lines.append(f"Top {TOP_FUNCTIONS} functions by cumulative time:")
+        stream = io.StringIO()
+        pstats.Stats(self.profile, stream=stream).sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+        lines.append(stream.getvalue().strip())
+        if self.allocations is not None:
+            lines.append('')
+            lines.append(f"Top {TOP_ALLOCATIONS} allocation sites still alive at the end:")
+            for stat in self.allocations.statistics('lineno')[:TOP_ALLOCATIONS]:
+                lines.append(f"  {stat}")
+        return '\n'.join(lines) + '\n'
+
+
+class Profiler:
+    def __init__(self, directory=PROFILE_DIR, threshold_ms=THRESHOLD_MS, max_profiles=MAX_PROFILES,
+                 sample_rate=SAMPLE_RATE, enabled=ENABLED, token=TOKEN):
+        self.directory = directory
+        self.threshold = threshold_ms / 1000
+        self.max_profiles = max_profiles
+        self.sample_rate = sample_rate
+        self.enabled = enabled
+        self.token = token
+        self._busy = threading.Lock()
+
+    def sampled(self, forced=False):
+        return forced or (self.enabled and random.random() < self.sample_rate)
+
+    def start(self, name, forced=False):
+        """A started ProfileSession, or None if not sampled or another profile is running."""
+        if not self.sampled(forced):
+            return None
+        # A forced profile waits for the running one (e.g. the request that submitted this job)
+        if not (self._busy.acquire(timeout=FORCED_WAIT) if forced else self._busy.acquire(blocking=False)):
+            return None
+        session = ProfileSession(name)
+        try:
+            session.start()
+        except Exception as e:
+            # Another profiler (a debugger, coverage) owns the hook: run unprofiled
+            print(f"Profiling unavailable: {e}")
+            if session.trace_memory and tracemalloc.is_tracing():
+                tracemalloc.stop()
+            self._busy.release()
+            return None
+        return session
+
+    def finish(self, session, forced=False):
+        """Stop `session` and write it if it was forced or over the latency threshold; returns the dump path."""
+        try:
+            keep = forced or time.perf_counter() - session.started >= self.threshold
+            session.stop(keep)
+        finally:
+            self._busy.release()
+        if not keep:
+            return None
+        try:
+            return self.write(session)
+        except OSError as e:
+            print(f"Error writing profile: {e}")
+            return None
+
+    def write(self, session):
+        os.makedirs(self.directory, exist_ok=True)
+        slug = re.sub(r'[^A-Za-z0-9]+', '_', session.name).strip('_') or 'root'
+        base = os.path.join(self.directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-"
+                                            f"{slug}-{session.elapsed * 1000:.0f}ms")
+        session.profile.dump_stats(f"{base}.prof")
+        with open(f"{base}.txt", 'w', encoding='utf-8') as f:
+            f.write(session.summary())
+        self._rotate()
+        return f"{base}.prof"
+
+    def _rotate(self):
+        dumps = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.prof'):
+                path = os.path.join(self.directory, name)
+                try:
+                    dumps.append((os.path.getmtime(path), path))
+                except OSError:
+                    continue
+        dumps.sort()
+        for _, path in dumps[:max(0, len(dumps) - self.max_profiles)]:
+            for stale in (path, f"{path[:-len('.prof')]}.txt"):
+                try:
+                    os.remove(stale)
+                except OSError:
+                    pass
+
+    def requested(self, headers):
+        """True if `headers` carry the profiling token."""
+        return bool(self.token) and headers.get(PROFILE_HEADER) == self.token
+
+    def wrap(self, name, fn, forced=False):
+        """`fn` (e.g. a job body) profiled with the same sampling and threshold as requests."""
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            session = self.start(name, forced)
+            if session is None:
+                return fn(*args, **kwargs)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.finish(session, forced)
+        return wrapper
+
+
+PROFILER = Profiler()
+
+
+def requested():
+    """True if the current Flask request asked for a profile with the token header."""
+    from flask import request
+
+    return PROFILER.requested(request.headers)
+
+
+def instrument_app(app, profiler=PROFILER):
+    """Profile sampled (or explicitly requested) requests handled by `app`."""
+    from flask import g, request
+
+    @app.before_request
+    def _start_profile():
+        forced = profiler.requested(request.headers)
+        route = request.url_rule.rule if request.url_rule is not None else request.path
+        session = profiler.start(f"{request.method} {route}", forced)
+        if session is not None:
+            g._profile = (session, forced)
+
+    @app.teardown_request
+    def _finish_profile(exc):
+        profile = g.pop('_profile', None)
+        if profile is not None:
+            profiler.finish(*profile)
+
+    return app
@@ -0,0 +1,80 @@
+import hashlib
+import threading
+import time
+
+from record_table import RecordTable
+
+# How often (seconds) to stat the store for edits made outside this process,
+# e.g. by migrations/migrate_data.py or another worker. Writes made through
+# this process's store invalidate the cache immediately.
+EXTERNAL_CHECK_INTERVAL = 1.0
+
+
+class RecordCache:
+    """
+    Process-level cache of the records, as a compact RecordTable, and of the
+    serialized GET /api/records body, with its ETag.
+
+    An entry stays valid while the store's `generation` (bumped by our own
+    writes) and `disk_fingerprint()` (mtime/size of the files, for external
+    edits) are unchanged. Between external checks a hit costs no disk I/O and
+    no JSON encoding.
+    """
+
+    def __init__(self, store, dumps, check_interval=EXTERNAL_CHECK_INTERVAL):
+        self.store = store
+        self.dumps = dumps
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._table = None
+        self._body = None
+        self._etag = None
+        self._generation = None
+        self._fingerprint = None
+        self._checked_at = 0.0
+
+    def invalidate(self):
+        with self._lock:
+            self._table = None
+            self._body = None
+            self._etag = None
+
+    def _is_fresh(self):
+        if self._table is None or self._generation != self.store.generation:
+            return False
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return True
+        self._checked_at = now
+        return self.store.disk_fingerprint() == self._fingerprint
+
+    def _refresh(self):
+        # Take the version tokens before reading, so a write that races with
+        # the read makes the next call reload instead of keeping stale data
+        self._generation = self.store.generation
+        self._fingerprint = self.store.disk_fingerprint()
+        self._checked_at = time.monotonic()
+        # Streamed into the table: the full list of dicts never exists at once
+        self._table = RecordTable(self.store.iter_records())
+        self._body = None
+        self._etag = None
+
+    def table(self):
+        """The cached records as a read-only RecordTable."""
+        with self._lock:
+            if not self._is_fresh():
+                self._refresh()
+            return self._table
+
+    def response(self):
+        """Return `(body, etag)` for the full record list, serializing at most once per change."""
+        with self._lock:
+            if not self._is_fresh():
+                self._refresh()
+            if self._body is None:
+                body = self.dumps(self._table.to_records())
+                if isinstance(body, str):
+                    body = body.encode('utf-8')
+                self._body = body
+                self._etag = hashlib.sha1(body).hexdigest()
+            return self._body, self._etag
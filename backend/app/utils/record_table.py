@@ -0,0 +1,295 @@
+from array import array
+
+import numpy as np
+
+from storage import CONFUSION_FIELDS, STATS_FIELDS, _check_query, decode_cursor, encode_cursor, stat_value
+
+# Rows decoded per step when a table is turned back into dicts
+ITER_BLOCK = 4096
+
+# Code 0 of every column: the field is absent from the record
+_ABSENT = object()
+
+
+def _dictionary_key(value):
+    # 1, 1.0 and True are equal dict keys but must come back as written
+    return (type(value), value)
+
+
+class _Column:
+    """One field: its distinct values and, per row, the index of the row's value."""
+
+    __slots__ = ('values', 'index', 'codes', '_str_cache')
+
+    def __init__(self, rows=0):
+        self.values = [_ABSENT]
+        self.index = {}
+        self.codes = array('I', bytes(4 * rows))
+        self._str_cache = None
+
+    def encode(self, value):
+        key = _dictionary_key(value)
+        code = self.index.get(key)
+        if code is None:
+            code = self.index[key] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def freeze(self):
+        # Narrowest unsigned type that holds every code
+        dtype = np.uint8 if len(self.values) <= 1 << 8 else np.uint16 if len(self.values) <= 1 << 16 else np.uint32
+        self.codes = np.frombuffer(self.codes, dtype=np.uint32).astype(dtype)
+
+    def strings(self):
+        """Per code: the value as RecordStore.query compares it in filters and sorts ('' when missing or null)."""
+        if self._str_cache is None:
+            self._str_cache = [''] + [stat_value(v) for v in self.values[1:]]
+        return self._str_cache
+
+
+class RecordTable:
+    """
+    Read-only, column-oriented copy of the applicant records.
+
+    Every field is dictionary-encoded: a column keeps each distinct value once
+    and one small integer code per row (uint8 for fields like 'Nivel', wider
+    only when a field has more distinct values). Field names are stored once
+    per distinct key order instead of once per row, and the IDs live in an
+    int64 array. Hundreds of thousands of applicants take a few MB instead of
+    one dict (and its key strings) per record.
+
+    Rows convert back to the exact dicts they were built from, including key
+    order and value types, so the API keeps returning the same JSON. Values
+    that cannot be dictionary keys (nested lists or objects) are kept as-is
+    on the side.
+    """
+
+    def __init__(self, records=()):
+        self._columns = {}
+        self._layouts = []
+        self._layout_index = {}
+        layout_codes = array('I')
+        ids = array('q')
+        self._extras = {}
+        rows = 0
+
+        for record in records:
+            layout = tuple(record)
+            layout_code = self._layout_index.get(layout)
+            if layout_code is None:
+                layout_code = self._layout_index[layout] = len(self._layouts)
+                self._layouts.append(layout)
+            layout_codes.append(layout_code)
+
+            record_id = record.get('ID')
+            ids.append(record_id if type(record_id) is int else 0)
+            for field, value in record.items():
+                if field == 'ID' and type(value) is int:
+                    continue
+                column = self._columns.get(field)
+                if column is None:
+                    column = self._columns[field] = _Column(rows)
+                try:
+                    column.codes.append(column.encode(value))
+                except TypeError:
+                    # Unhashable (nested) value: absent from the column, kept on the side
+                    column.codes.append(0)
+                    self._extras.setdefault(rows, {})[field] = value
+            rows += 1
+            for column in self._columns.values():
+                if len(column.codes) < rows:
+                    column.codes.append(0)
+
+        self._rows = rows
+        self._stats = None
+        self.ids = np.frombuffer(ids, dtype=np.int64).copy()
+        self._layout_codes = np.frombuffer(layout_codes, dtype=np.uint32).copy()
+        for column in self._columns.values():
+            column.freeze()
+
+    def __len__(self):
+        return self._rows
+
+    @property
+    def fields(self):
+        return list(self._columns)
+
+    def codes(self, field):
+        """Per-row codes of `field` (0 where the record does not have it)."""
+        column = self._columns.get(field)
+        return column.codes if column is not None else np.zeros(self._rows, dtype=np.uint8)
+
+    def code(self, field, value):
+        """Code of `value` in `field`, or None if no row has it."""
+        column = self._columns.get(field)
+        if column is None:
+            return None
+        try:
+            return column.index.get(_dictionary_key(value))
+        except TypeError:
+            return None
+
+    def value(self, field, code):
+        """The value behind `code`; None for code 0 (absent)."""
+        value = self._columns[field].values[code]
+        return None if value is _ABSENT else value
+
+    def row(self, i):
+        return self._decode(i, self._layout_codes[i], {f: c.codes[i] for f, c in self._columns.items()})
+
+    def _decode(self, i, layout_code, codes):
+        extras = self._extras.get(i)
+        record = {}
+        for field in self._layouts[layout_code]:
+            if extras is not None and field in extras:
+                record[field] = extras[field]
+            elif field == 'ID' and not codes.get('ID', 0):
+                record['ID'] = int(self.ids[i])
+            else:
+                record[field] = self._columns[field].values[codes[field]]
+        return record
+
+    def __iter__(self):
+        """Decoded record dicts in row order, decoding ITER_BLOCK rows at a time."""
+        for start in range(0, self._rows, ITER_BLOCK):
+            stop = min(start + ITER_BLOCK, self._rows)
+            ids = self.ids[start:stop].tolist()
+            layout_codes = self._layout_codes[start:stop].tolist()
+            block = {f: c.codes[start:stop].tolist() for f, c in self._columns.items()}
+            id_codes = block.get('ID')
+            id_values = self._columns['ID'].values if 'ID' in self._columns else None
+            plans = {}
+            for offset, layout_code in enumerate(layout_codes):
+                i = start + offset
+                if i in self._extras:
+                    yield self.row(i)
+                    continue
+                plan = plans.get(layout_code)
+                if plan is None:
+                    plan = plans[layout_code] = [
+                        (None, None) if field == 'ID' else (self._columns[field].values, block[field])
+                        for field in self._layouts[layout_code]
+                    ]
+                record = {}
+                for field, (values, codes) in zip(self._layouts[layout_code], plan):
+                    if codes is None:
+                        # Integer IDs live in self.ids; any other ID value was dictionary-encoded
+                        code = id_codes[offset] if id_codes is not None else 0
+                        record[field] = id_values[code] if code else ids[offset]
+                    else:
+                        record[field] = values[codes[offset]]
+                yield record
+
+    def to_records(self):
+        return list(self)
+
+    def group_by(self, fields):
+        """
+        Distinct combinations of `fields` and, per row, the index of its combination.
+
+        Returns `(groups, inverse)`: `groups[k]` is a dict with the fields the
+        combination has (absent fields are left out) and `inverse[i]` is the
+        group of row i.
+        """
+        if not self._rows:
+            return [], np.zeros(0, dtype=np.intp)
+        stacked = np.stack([self.codes(f).astype(np.uint32) for f in fields], axis=1)
+        unique, inverse = np.unique(stacked, axis=0, return_inverse=True)
+        groups = [{f: self.value(f, int(c)) for f, c in zip(fields, combo) if c}
+                  for combo in unique.tolist()]
+        return groups, inverse.reshape(-1)
+
+    def mask(self, filters):
+        """Rows whose fields equal `filters` as strings (the RecordStore.query filter rule)."""
+        keep = np.ones(self._rows, dtype=bool)
+        for field, wanted in (filters or {}).items():
+            column = self._columns.get(field)
+            wanted = stat_value(wanted)
+            if column is None:
+                keep &= wanted == ''
+                continue
+            strs = column.strings()
+            hits = np.fromiter((s == wanted for s in strs), dtype=bool, count=len(strs))
+            keep &= hits[column.codes]
+        return keep
+
+    def query(self, filters=None, sort='ID', descending=False, limit=50, cursor=None):
+        """Same results as `RecordStore.query` over these records, from the encoded columns."""
+        _check_query(filters, sort)
+        rows = np.flatnonzero(self.mask(filters))
+        ids = self.ids[rows]
+
+        if sort == 'ID':
+            sort_strs = None
+            order = np.argsort(ids, kind='stable')
+        else:
+            column = self._columns.get(sort)
+            sort_strs = column.strings() if column is not None else ['']
+            codes = column.codes[rows] if column is not None else np.zeros(len(rows), dtype=np.uint8)
+            # Rank of each code's string, so the sort compares strings as the scan does
+            by_string = sorted(range(len(sort_strs)), key=sort_strs.__getitem__)
+            rank = np.empty(len(sort_strs), dtype=np.int64)
+            rank[by_string] = np.arange(len(sort_strs))
+            # Equal strings share the lowest rank
+            for prev, cur in zip(by_string, by_string[1:]):
+                if sort_strs[cur] == sort_strs[prev]:
+                    rank[cur] = rank[prev]
+            order = np.lexsort((ids, rank[codes]))
+        if descending:
+            order = order[::-1]
+        rows, ids = rows[order], ids[order]
+
+        if cursor:
+            after_value, after_id = decode_cursor(cursor)
+            if sort == 'ID':
+                keep = ids < after_id if descending else ids > after_id
+            else:
+                strs = np.array([sort_strs[c] for c in codes[order].tolist()], dtype=object)
+                after_value = str(after_value)
+                if descending:
+                    keep = (strs < after_value) | ((strs == after_value) & (ids < after_id))
+                else:
+                    keep = (strs > after_value) | ((strs == after_value) & (ids > after_id))
+            rows, ids = rows[keep], ids[keep]
+
+        page = [self.row(int(i)) for i in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = page[-1]
+            sort_value = last.get('ID', 0) if sort == 'ID' else ('' if last.get(sort) is None else str(last.get(sort)))
+            next_cursor = encode_cursor(sort_value, last.get('ID', 0))
+        return page, next_cursor
+
+    def stat_counts(self):
+        """Same aggregates as `RecordStore.stat_counts`, counted from the codes once per table."""
+        if self._stats is None:
+            def labels(field):
+                # Per code, the value as counted (code 0, absent, counts as '')
+                column = self._columns.get(field)
+                return [stat_value(None if v is _ABSENT else v) for v in column.values] if column else ['']
+
+            fields = {}
+            for field in STATS_FIELDS:
+                names = labels(field)
+                totals = fields[field] = {}
+                for name, n in zip(names, np.bincount(self.codes(field), minlength=len(names)).tolist()):
+                    if n:
+                        # Different values can count as the same string (1 and '1')
+                        totals[name] = totals.get(name, 0) + n
+
+            declared_field, predicted_field = CONFUSION_FIELDS
+            declared_labels, predicted_labels = labels(declared_field), labels(predicted_field)
+            width = len(predicted_labels)
+            pairs = np.bincount(self.codes(declared_field).astype(np.int64) * width + self.codes(predicted_field),
+                                minlength=len(declared_labels) * width)
+            confusion = {}
+            for pair in np.flatnonzero(pairs).tolist():
+                key = (declared_labels[pair // width], predicted_labels[pair % width])
+                confusion[key] = confusion.get(key, 0) + int(pairs[pair])
+            self._stats = {'total': self._rows, 'fields': fields, 'confusion': confusion}
+        return self._stats
+
+    def nbytes(self):
+        """Bytes held by the code arrays (the dictionaries are shared across rows and not counted)."""
+        return (self.ids.nbytes + self._layout_codes.nbytes
+                + sum(column.codes.nbytes for column in self._columns.values()))
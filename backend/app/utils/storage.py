@@ -0,0 +1,815 @@
+import argparse
+import base64
+import contextlib
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import weakref
+
+import jsonio
+import metrics
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Legacy whole-file JSON database and its SQLite replacement (paths relative to the working directory)
+DB_FILE = 'base_del_proto.json'
+SQLITE_FILE = 'base_del_proto.db'
+
+# store_meta key set once the legacy JSON file has been imported into SQLite
+LEGACY_IMPORT_KEY = 'legacy_json_imported'
+
+# 'sqlite' (default) or 'json' for the legacy whole-file store
+DB_BACKEND = os.environ.get('EDU_DB_BACKEND', 'sqlite')
+
+# Fields that can be filtered on and sorted by in `query` (SQLite keeps an index for each)
+INDEXED_FIELDS = ('Nivel', 'Nivel Educativo', 'Campo Estudio', 'Prediccion_IA', 'Entidad Federativa')
+
+# Fields counted for GET /api/stats, and the (declared, predicted) pair behind its confusion matrix
+STATS_FIELDS = ('Nivel', 'Prediccion_IA', 'Nivel Educativo', 'Campo Estudio', 'Entidad Federativa')
+CONFUSION_FIELDS = ('Nivel', 'Prediccion_IA')
+
+
+class QueryError(ValueError):
+    """Invalid filter, sort key or cursor passed to `RecordStore.query`."""
+
+
+def encode_cursor(sort_value, record_id):
+    raw = json.dumps([sort_value, record_id], ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor):
+    try:
+        sort_value, record_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except Exception:
+        raise QueryError("Invalid cursor")
+    if not isinstance(record_id, int):
+        raise QueryError("Invalid cursor")
+    return sort_value, record_id
+
+
+def stat_value(value):
+    """How a field value is counted in `stat_counts` (missing and null count as '')."""
+    return '' if value is None else str(value)
+
+
+def _check_query(filters, sort):
+    unknown = [f for f in (filters or {}) if f not in INDEXED_FIELDS]
+    if unknown:
+        raise QueryError(f"Cannot filter on: {', '.join(unknown)}")
+    if sort != 'ID' and sort not in INDEXED_FIELDS:
+        raise QueryError(f"Cannot sort by: {sort}")
+
+
+class RecordStore:
+    """
+    Small repository interface over the applicant records.
+
+    Records are plain dicts identified by their numeric 'ID'. The store owns
+    ID allocation: `insert` ignores any 'ID' in the record and returns the
+    one it assigned, and `update` never changes a record's ID.
+
+    `generation` changes after every write made through this object, and
+    `disk_fingerprint()` changes when the data on disk changes (including
+    edits by other processes), so callers can cache what they read.
+    """
+
+    # True if `query` is answered from indexes; otherwise callers may query a cached RecordTable instead
+    indexed = False
+
+    def __init__(self):
+        self.generation = 0
+        self._generation_lock = threading.Lock()
+
+    def _bump_generation(self):
+        with self._generation_lock:
+            self.generation += 1
+
+    def disk_fingerprint(self):
+        """Cheap token (file stats) that changes when the stored data changes."""
+        raise NotImplementedError
+
+    def all(self):
+        """Return every record, ordered by ID."""
+        raise NotImplementedError
+
+    def get(self, record_id):
+        """Return one record or None."""
+        raise NotImplementedError
+
+    def count(self):
+        raise NotImplementedError
+
+    def insert(self, record):
+        """Store a new record and return its assigned ID."""
+        return self.insert_many([record])[0]
+
+    def insert_many(self, records):
+        """Store new records and return their assigned IDs, in order."""
+        raise NotImplementedError
+
+    def update(self, record_id, fields):
+        """Merge `fields` into a record. Returns False if it does not exist."""
+        return bool(self.update_many({record_id: fields}))
+
+    def update_many(self, updates):
+        """Merge `{ID: fields}` into existing records. Returns the number updated."""
+        raise NotImplementedError
+
+    def delete(self, record_id):
+        """Delete a record. Returns False if it does not exist."""
+        raise NotImplementedError
+
+    def iter_records(self, batch_size=1000):
+        """Yield every record in ID order. SQLiteStore reads one batch at a time."""
+        yield from self.all()
+
+    def query(self, filters=None, sort='ID', descending=False, limit=50, cursor=None):
+        """
+        Return one page of records and the cursor for the next page.
+
+        Args:
+            filters (dict): Exact-match `{field: value}` on INDEXED_FIELDS, compared
+                as strings; '' matches records where the field is missing or null.
+            sort (str): 'ID' or one of INDEXED_FIELDS; ties are broken by ID.
+            descending (bool): Sort direction.
+            limit (int): Page size.
+            cursor (str): `next_cursor` from the previous page (keyset pagination).
+
+        Returns:
+            tuple: (records, next_cursor), next_cursor is None on the last page.
+
+        This default scans every record; SQLiteStore answers from its indexes.
+        """
+        _check_query(filters, sort)
+        after = decode_cursor(cursor) if cursor else None
+
+        def key(record):
+            if sort == 'ID':
+                return (record.get('ID', 0), record.get('ID', 0))
+            value = record.get(sort)
+            return ('' if value is None else str(value), record.get('ID', 0))
+
+        wanted = {f: stat_value(v) for f, v in (filters or {}).items()}
+        rows = [r for r in self.all() if all(stat_value(r.get(f)) == v for f, v in wanted.items())]
+        rows.sort(key=key, reverse=descending)
+        if after is not None:
+            after = tuple(after)
+            rows = [r for r in rows if (key(r) < after if descending else key(r) > after)]
+
+        page = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = encode_cursor(*key(page[-1]))
+        return page, next_cursor
+
+    def stat_counts(self):
+        """
+        Aggregates for GET /api/stats.
+
+        Returns:
+            dict: {'total': N, 'fields': {field: {value: count}} for STATS_FIELDS,
+                   'confusion': {(declared, predicted): count}} with values as
+                   given by `stat_value`.
+
+        This default scans every record; SQLiteStore keeps them materialized.
+        """
+        total = 0
+        fields = {field: {} for field in STATS_FIELDS}
+        confusion = {}
+        for record in self.iter_records():
+            total += 1
+            for field, counts in fields.items():
+                value = stat_value(record.get(field))
+                counts[value] = counts.get(value, 0) + 1
+            pair = tuple(stat_value(record.get(field)) for field in CONFUSION_FIELDS)
+            confusion[pair] = confusion.get(pair, 0) + 1
+        return {'total': total, 'fields': fields, 'confusion': confusion}
+
+    def import_records(self, records):
+        """Insert or replace records keeping their existing IDs (used for imports)."""
+        raise NotImplementedError
+
+    def reserve_ids(self, count):
+        """Allocate `count` new IDs without storing anything; they are never handed out again."""
+        raise NotImplementedError
+
+    def insert_with_ids(self, records):
+        """
+        Insert records that carry IDs from `reserve_ids`, skipping IDs already stored. Returns the number inserted.
+
+        The records are on disk (fsynced) when this returns: the write-behind
+        log that held them is deleted right after.
+        """
+        raise NotImplementedError
+
+    def import_json(self, path):
+        """Import the legacy JSON database file. Returns the number of records."""
+        with open(path, 'r', encoding='utf-8') as f:
+            records = json.load(f)
+        with_id = [r for r in records if isinstance(r.get('ID'), int)]
+        self.import_records(with_id)
+        # Records without a usable ID get a fresh one
+        self.insert_many([r for r in records if not isinstance(r.get('ID'), int)])
+        return len(records)
+
+    def export_json(self, path):
+        """Write all records in the legacy JSON format."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.all(), f, indent=4, ensure_ascii=False)
+
+
+def _without_id(fields):
+    return {k: v for k, v in fields.items() if k != 'ID'}
+
+
+def atomic_write_json(path, data, **dump_kwargs):
+    """
+    Write JSON to `path` so readers only ever see the old or the new file.
+
+    The data goes to a temporary file in the same directory, is fsynced and
+    then renamed over the target (and the directory fsynced); a crash or power
+    failure mid-write leaves the old file intact.
+    Without `dump_kwargs` (e.g. indent) the file is compact, encoded by jsonio.
+    """
+    tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    try:
+        with open(tmp_path, 'wb') as f:
+            if dump_kwargs:
+                f.write(json.dumps(data, ensure_ascii=False, **dump_kwargs).encode('utf-8'))
+            else:
+                f.write(jsonio.dumps(data))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        _fsync_dir(os.path.dirname(path) or '.')
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _fsync_dir(path):
+    # Makes the rename itself durable; not possible (nor needed) on Windows
+    if os.name != 'posix':
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class FileLock:
+    """
+    Exclusive lock shared by threads and processes, held on a sidecar file.
+
+    Uses flock on POSIX and msvcrt.locking on Windows. Not reentrant.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.Lock()
+        self._file = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        try:
+            self._file = open(self.path, 'a+')
+            if fcntl:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            else:
+                while True:
+                    try:
+                        msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        time.sleep(0.05)
+        except BaseException:
+            if self._file:
+                self._file.close()
+                self._file = None
+            self._thread_lock.release()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if fcntl:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+            self._file = None
+            self._thread_lock.release()
+        return False
+
+
+class JsonFileStore(RecordStore):
+    """
+    The legacy store: the whole database is one JSON array on disk.
+
+    Every operation re-reads the file and every write rewrites it, so it is
+    only meant for small tables and for tools that edit the file directly.
+
+    Writes are safe under concurrent threads and processes: each
+    read-modify-write runs under a cross-process lock (`<path>.lock`), the
+    file is replaced atomically, and new IDs come from a monotonic sequence
+    kept in `<path>.seq`, so deleted IDs are never reused.
+    """
+
+    def __init__(self, path=DB_FILE):
+        super().__init__()
+        self.path = path
+        self.seq_path = f"{path}.seq"
+        self._lock = FileLock(f"{path}.lock")
+
+    @metrics.timed('store_read')
+    def _read(self):
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, 'rb') as f:
+            return jsonio.loads(f.read())
+
+    def load(self):
+        try:
+            return self._read()
+        except Exception as e:
+            print(f"Error loading DB: {e}")
+            return []
+
+    @metrics.timed('store_write')
+    def save(self, data):
+        # Errors propagate: a write that did not reach the disk must not be acknowledged.
+        # Compact: indent=4 roughly doubled the file (files written that way still load)
+        atomic_write_json(self.path, data)
+        self._bump_generation()
+
+    def disk_fingerprint(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _allocate_ids(self, count, db=None):
+        """Reserve `count` consecutive IDs. Must be called with the lock held."""
+        last_id = None
+        if os.path.exists(self.seq_path):
+            with open(self.seq_path, 'r', encoding='utf-8') as f:
+                last_id = int(f.read().strip() or 0)
+        if last_id is None:
+            # First allocation for this file: start after the highest existing ID
+            db = self._read() if db is None else db
+            last_id = max((item.get('ID', 0) for item in db), default=0)
+        atomic_write_json(self.seq_path, last_id + count)
+        return list(range(last_id + 1, last_id + count + 1))
+
+    def all(self):
+        return self.load()
+
+    def get(self, record_id):
+        return next((r for r in self.load() if r.get('ID') == record_id), None)
+
+    def count(self):
+        return len(self.load())
+
+    def insert_many(self, records):
+        if not records:
+            return []
+        with self._lock:
+            db = self._read()
+            ids = self._allocate_ids(len(records), db)
+            for new_id, record in zip(ids, records):
+                db.append({'ID': new_id, **_without_id(record)})
+            self.save(db)
+        return ids
+
+    def update_many(self, updates):
+        with self._lock:
+            db = self._read()
+            updated = 0
+            for record in db:
+                fields = updates.get(record.get('ID'))
+                if fields is not None:
+                    record.update(_without_id(fields))
+                    updated += 1
+            if updated:
+                self.save(db)
+        return updated
+
+    def delete(self, record_id):
+        with self._lock:
+            db = self._read()
+            new_db = [r for r in db if r.get('ID') != record_id]
+            if len(new_db) == len(db):
+                return False
+            self.save(new_db)
+        return True
+
+    def reserve_ids(self, count):
+        with self._lock:
+            return self._allocate_ids(count)
+
+    def insert_with_ids(self, records):
+        with self._lock:
+            db = self._read()
+            existing = {r.get('ID') for r in db}
+            new = [r for r in records if r['ID'] not in existing]
+            if new:
+                self.save(sorted(db + new, key=lambda r: r.get('ID', 0)))
+        return len(new)
+
+    def import_records(self, records):
+        with self._lock:
+            by_id = {r.get('ID'): r for r in self._read()}
+            for record in records:
+                by_id[record['ID']] = record
+            self.save(sorted(by_id.values(), key=lambda r: r.get('ID', 0)))
+            # Keep the sequence ahead of every imported ID
+            if os.path.exists(self.seq_path):
+                with open(self.seq_path, 'r', encoding='utf-8') as f:
+                    last_id = int(f.read().strip() or 0)
+                highest = max((r.get('ID', 0) for r in records), default=0)
+                if highest > last_id:
+                    atomic_write_json(self.seq_path, highest)
+
+
+def _close_connections(connections):
+    for conn in list(connections):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+    del connections[:]
+
+
+class SQLiteStore(RecordStore):
+    """
+    Records in a SQLite table with 'ID' as the INTEGER PRIMARY KEY.
+
+    Point reads, updates and deletes go through the primary-key B-tree, so
+    they cost O(log N) instead of a full parse and rewrite. The record body
+    is stored as a JSON document, so the API keeps returning the same shape.
+
+    Every write is a BEGIN IMMEDIATE transaction, which SQLite serializes
+    across threads and processes, and AUTOINCREMENT hands out monotonic IDs
+    that are never reused.
+
+    The `record_stats` table holds the counts behind `stat_counts`. Triggers
+    update it inside the same transaction as every insert, update and
+    delete, whoever makes it (any worker, the migration runner), so reading
+    the aggregates costs O(distinct values) instead of a scan.
+    """
+
+    indexed = True
+
+    def __init__(self, path=SQLITE_FILE):
+        super().__init__()
+        self.path = path
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        # A dropped store must close its connections right away: sqlite3 connections
+        # sit in a reference cycle and would otherwise stay open until the next GC
+        # pass, possibly across a fork()
+        weakref.finalize(self, _close_connections, self._connections)
+        # SQLite connections must not be carried across fork(); see close()
+        if hasattr(os, 'register_at_fork'):
+            store_ref = weakref.ref(self)
+            os.register_at_fork(before=lambda: store_ref() and store_ref().close())
+        with self._transaction() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS records ("
+                " ID INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " data TEXT NOT NULL)"
+            )
+            # Expression indexes on (field, ID) serve both the filters and keyset pagination
+            for i, field in enumerate(INDEXED_FIELDS):
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_records_field{i} "
+                    f"ON records({self._field_expr(field)}, ID)"
+                )
+            self._create_stats(conn)
+            # Small key/value facts about the store itself (e.g. the legacy JSON import)
+            conn.execute("CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+    def get_meta(self, key):
+        row = self._conn().execute("SELECT value FROM store_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        with self._transaction() as conn:
+            conn.execute("INSERT OR REPLACE INTO store_meta (key, value) VALUES (?, ?)", (key, value))
+
+    def ever_had_records(self):
+        """True once any ID has been handed out, even if every record was deleted since."""
+        row = self._conn().execute("SELECT seq FROM sqlite_sequence WHERE name = 'records'").fetchone()
+        return bool(row and row[0])
+
+    @staticmethod
+    def _field_expr(field):
+        # Only ever called with names from INDEXED_FIELDS; must match the index expression exactly
+        return f"IFNULL(json_extract(data, '$.\"{field}\"'), '')"
+
+    @staticmethod
+    def _stat_dimensions():
+        """(dimension name, SQL expression over `row`.data) for each aggregate kept in record_stats."""
+        def field(row, name):
+            return f"IFNULL(json_extract({row}.data, '$.\"{name}\"'), '')"
+
+        dimensions = [('#total', lambda row: "''")]
+        dimensions += [(name, lambda row, name=name: field(row, name)) for name in STATS_FIELDS]
+        dimensions.append(('#confusion', lambda row: "json_array(" + ", ".join(
+            f"CAST({field(row, name)} AS TEXT)" for name in CONFUSION_FIELDS) + ")"))
+        return dimensions
+
+    def _create_stats(self, conn):
+        """Create the record_stats table and its triggers, rebuilding the counts if the definitions changed."""
+        dimensions = self._stat_dimensions()
+        version = hashlib.sha1(repr([(n, e('r')) for n, e in dimensions]).encode()).hexdigest()[:8]
+        adds, removes = [], []
+        triggers = {}
+        for i, (name, expr) in enumerate(dimensions):
+            add = (f"INSERT INTO record_stats (dimension, value, count) VALUES ('{name}', {expr('NEW')}, 1) "
+                   f"ON CONFLICT (dimension, value) DO UPDATE SET count = count + 1;")
+            remove = f"UPDATE record_stats SET count = count - 1 WHERE dimension = '{name}' AND value = {expr('OLD')};"
+            adds.append(add)
+            removes.append(remove)
+            if name != '#total':
+                # Only the dimensions whose value changed
+                triggers[f"record_stats_{version}_upd{i}"] = (
+                    f"AFTER UPDATE OF data ON records WHEN {expr('OLD')} IS NOT {expr('NEW')} "
+                    f"BEGIN {remove} {add} END")
+        triggers[f"record_stats_{version}_ins"] = f"AFTER INSERT ON records BEGIN {' '.join(adds)} END"
+        triggers[f"record_stats_{version}_del"] = f"AFTER DELETE ON records BEGIN {' '.join(removes)} END"
+
+        existing = {row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'record_stats_%'")}
+        if existing == set(triggers):
+            return
+        for name in existing:
+            conn.execute(f"DROP TRIGGER {name}")
+        conn.execute("CREATE TABLE IF NOT EXISTS record_stats ("
+                     " dimension TEXT NOT NULL, value TEXT NOT NULL, count INTEGER NOT NULL,"
+                     " PRIMARY KEY (dimension, value))")
+        conn.execute("DELETE FROM record_stats")
+        for name, expr in dimensions:
+            conn.execute(f"INSERT INTO record_stats (dimension, value, count) "
+                         f"SELECT '{name}', {expr('records')}, COUNT(*) FROM records GROUP BY 2")
+        for name, body in triggers.items():
+            conn.execute(f"CREATE TRIGGER {name} {body}")
+
+    def _conn(self):
+        # One connection per thread; they are only shared with close()
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            # INSERT OR REPLACE (import_records) only fires the record_stats delete triggers with this on
+            conn.execute("PRAGMA recursive_triggers=ON")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self):
+        """
+        Close every connection; threads reconnect on their next query.
+
+        Runs automatically before fork(): a child process that inherits an
+        open connection to the same file gets "disk I/O error" from SQLite.
+        """
+        with self._connections_lock:
+            connections = list(self._connections)
+            self._connections.clear()
+            self._local = threading.local()
+        _close_connections(connections)
+
+    @contextlib.contextmanager
+    def _transaction(self, durable=False):
+        """
+        Write transaction that takes the SQLite write lock up front (BEGIN IMMEDIATE).
+
+        With synchronous=NORMAL a WAL commit survives a crash of the process
+        but not a power failure; `durable` commits with synchronous=FULL, so
+        the WAL is fsynced before COMMIT returns.
+        """
+        conn = self._conn()
+        if durable:
+            conn.execute("PRAGMA synchronous=FULL")
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            if durable:
+                conn.execute("PRAGMA synchronous=NORMAL")
+        self._bump_generation()
+
+    def disk_fingerprint(self):
+        # In WAL mode commits land in the -wal file; checkpoints rewrite the main file
+        fingerprint = []
+        for path in (self.path, f"{self.path}-wal"):
+            try:
+                st = os.stat(path)
+                fingerprint.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                fingerprint.append(None)
+        return tuple(fingerprint)
+
+    @staticmethod
+    def _row_to_record(row):
+        record_id, data = row
+        return {'ID': record_id, **jsonio.loads(data)}
+
+    @staticmethod
+    def _dumps(record):
+        return jsonio.dumps_str(_without_id(record))
+
+    @metrics.timed('store_read')
+    def all(self):
+        rows = self._conn().execute("SELECT ID, data FROM records ORDER BY ID")
+        return [self._row_to_record(row) for row in rows]
+
+    @metrics.timed('store_read')
+    def get(self, record_id):
+        row = self._conn().execute("SELECT ID, data FROM records WHERE ID = ?", (record_id,)).fetchone()
+        return self._row_to_record(row) if row else None
+
+    @metrics.timed('store_read')
+    def count(self):
+        return self._conn().execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    @metrics.timed('store_write')
+    def insert_many(self, records):
+        ids = []
+        with self._transaction() as conn:
+            for record in records:
+                cur = conn.execute("INSERT INTO records (data) VALUES (?)", (self._dumps(record),))
+                ids.append(cur.lastrowid)
+        return ids
+
+    @metrics.timed('store_write')
+    def update_many(self, updates):
+        updated = 0
+        with self._transaction() as conn:
+            for record_id, fields in updates.items():
+                row = conn.execute("SELECT data FROM records WHERE ID = ?", (record_id,)).fetchone()
+                if row is None:
+                    continue
+                data = jsonio.loads(row[0])
+                data.update(_without_id(fields))
+                conn.execute("UPDATE records SET data = ? WHERE ID = ?", (self._dumps(data), record_id))
+                updated += 1
+        return updated
+
+    @metrics.timed('store_write')
+    def delete(self, record_id):
+        with self._transaction() as conn:
+            cur = conn.execute("DELETE FROM records WHERE ID = ?", (record_id,))
+        return cur.rowcount > 0
+
+    def iter_records(self, batch_size=1000):
+        # Keyset batches: memory stays constant and no read transaction is held between batches
+        last_id = 0
+        while True:
+            rows = self._conn().execute(
+                "SELECT ID, data FROM records WHERE ID > ? ORDER BY ID LIMIT ?", (last_id, batch_size)
+            ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield self._row_to_record(row)
+            last_id = rows[-1][0]
+
+    @metrics.timed('store_read')
+    def query(self, filters=None, sort='ID', descending=False, limit=50, cursor=None):
+        _check_query(filters, sort)
+        sort_expr = 'ID' if sort == 'ID' else self._field_expr(sort)
+        where, params = [], []
+        for field, value in (filters or {}).items():
+            where.append(f"{self._field_expr(field)} = ?")
+            params.append(stat_value(value))
+        if cursor:
+            sort_value, record_id = decode_cursor(cursor)
+            op = '<' if descending else '>'
+            if sort == 'ID':
+                where.append(f"ID {op} ?")
+                params.append(record_id)
+            else:
+                # The plain range term lets SQLite seek the expression index;
+                # the row-value term alone would scan it from the start
+                where.append(f"{sort_expr} {op}= ? AND ({sort_expr}, ID) {op} (?, ?)")
+                params.extend([sort_value, sort_value, record_id])
+
+        direction = 'DESC' if descending else 'ASC'
+        sql = (
+            f"SELECT ID, data, {sort_expr} FROM records"
+            f"{' WHERE ' + ' AND '.join(where) if where else ''}"
+            f" ORDER BY {sort_expr} {direction}, ID {direction} LIMIT ?"
+        )
+        rows = self._conn().execute(sql, params + [limit + 1]).fetchall()
+
+        page = [self._row_to_record(row[:2]) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = encode_cursor(last[2], last[0])
+        return page, next_cursor
+
+    @metrics.timed('store_write')
+    def import_records(self, records):
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO records (ID, data) VALUES (?, ?)",
+                [(record['ID'], self._dumps(record)) for record in records],
+            )
+
+    def reserve_ids(self, count):
+        with self._transaction() as conn:
+            # AUTOINCREMENT keeps its high-water mark in sqlite_sequence; moving it reserves the IDs
+            row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'records'").fetchone()
+            if row is None:
+                last_id = conn.execute("SELECT IFNULL(MAX(ID), 0) FROM records").fetchone()[0]
+                conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('records', ?)", (last_id + count,))
+            else:
+                last_id = row[0]
+                conn.execute("UPDATE sqlite_sequence SET seq = ? WHERE name = 'records'", (last_id + count,))
+        return list(range(last_id + 1, last_id + count + 1))
+
+    @metrics.timed('store_write')
+    def insert_with_ids(self, records):
+        # The write-behind log is deleted once this returns, so the commit must reach the disk
+        with self._transaction(durable=True) as conn:
+            cur = conn.executemany(
+                "INSERT OR IGNORE INTO records (ID, data) VALUES (?, ?)",
+                [(record['ID'], self._dumps(record)) for record in records],
+            )
+        return cur.rowcount
+
+    def stat_counts(self):
+        total = 0
+        fields = {field: {} for field in STATS_FIELDS}
+        confusion = {}
+        for dimension, value, count in self._conn().execute(
+                "SELECT dimension, value, count FROM record_stats WHERE count > 0"):
+            if dimension == '#total':
+                total = count
+            elif dimension == '#confusion':
+                confusion[tuple(json.loads(value))] = count
+            elif dimension in fields:
+                fields[dimension][value] = count
+        return {'total': total, 'fields': fields, 'confusion': confusion}
+
+
+def open_store(backend=None, json_path=DB_FILE, sqlite_path=SQLITE_FILE):
+    """
+    Open the configured record store.
+
+    The legacy JSON database (if any) is imported into a new SQLite store
+    once. The import is recorded in store_meta, so a store emptied later
+    (every record deleted) does not get the old records back on restart.
+    """
+    backend = backend or DB_BACKEND
+    if backend == 'json':
+        return JsonFileStore(json_path)
+    if backend != 'sqlite':
+        raise ValueError(f"Unknown DB backend: {backend}")
+
+    store = SQLiteStore(sqlite_path)
+    if os.path.exists(json_path) and store.get_meta(LEGACY_IMPORT_KEY) is None:
+        # Stores created before the flag existed count as imported once they have held records
+        if not store.ever_had_records():
+            count = store.import_json(json_path)
+            print(f"Imported {count} records from {json_path} into {sqlite_path}")
+        store.set_meta(LEGACY_IMPORT_KEY, os.path.abspath(json_path))
+    return store
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Import or export the applicant records.")
+    parser.add_argument('command', choices=['import', 'export'])
+    parser.add_argument('json_file', nargs='?', default=DB_FILE)
+    parser.add_argument('--sqlite', default=SQLITE_FILE, help="SQLite database file")
+    args = parser.parse_args()
+
+    sqlite_store = SQLiteStore(args.sqlite)
+    if args.command == 'import':
+        print(f"Imported {sqlite_store.import_json(args.json_file)} records into {args.sqlite}")
+    else:
+        sqlite_store.export_json(args.json_file)
+        print(f"Exported {sqlite_store.count()} records to {args.json_file}")
@@ -0,0 +1,60 @@
+import numbers
+
+# Applicant fields, in the order the registration form and the admin page use them
+RECORD_FIELDS = [
+    'Nombre', 'Apellidos', 'Edad', 'Procedencia', 'Entidad Federativa', 'Zona Geográfica',
+    'Nivel Educativo', 'Campo Estudio', 'Tipo Institución', 'Institución', 'Rango Ingreso',
+    'Experiencia (años)', 'Jornada', 'Nivel',
+]
+
+# Fields that must be numbers (or numeric strings, as the form sends them) when present
+NUMERIC_FIELDS = ('Edad', 'Rango Ingreso', 'Experiencia (años)')
+
+# Signature of the model version and features behind the stored Prediccion_IA
+# (see codigoia.prediction_signature); a mismatch means the prediction is stale
+PREDICTION_SIGNATURE_FIELD = 'Prediccion_IA_Firma'
+
+# Fields computed by the server; any value sent by a client is dropped
+SERVER_FIELDS = ('ID', 'Prediccion_IA', PREDICTION_SIGNATURE_FIELD)
+
+_KNOWN_FIELDS = frozenset(RECORD_FIELDS)
+
+
+class ValidationError(ValueError):
+    pass
+
+
+def validate_record(data):
+    """
+    Check one applicant record received from a client and return a clean copy.
+
+    Raises ValidationError if the record is not a flat JSON object, has a
+    field outside RECORD_FIELDS or if a numeric field cannot be read as a
+    number. Server-computed fields are removed.
+    """
+    if not isinstance(data, dict):
+        raise ValidationError("Record must be a JSON object")
+
+    record = {}
+    for key, value in data.items():
+        if key in SERVER_FIELDS:
+            continue
+        if key not in _KNOWN_FIELDS:
+            raise ValidationError(f"Unknown field '{key}'")
+        if value is not None and not isinstance(value, (str, numbers.Number)):
+            raise ValidationError(f"Field '{key}' must be a string or a number")
+        record[key] = value
+
+    if not record:
+        raise ValidationError("Record is empty")
+
+    for field in NUMERIC_FIELDS:
+        value = record.get(field)
+        if value is None or value == '':
+            continue
+        try:
+            float(value)
+        except (TypeError, ValueError):
+            raise ValidationError(f"Field '{field}' must be a number")
+
+    return record
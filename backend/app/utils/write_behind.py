@@ -0,0 +1,272 @@
+import os
+import threading
+import time
+
+import jsonio
+from storage import FileLock, RecordStore, _without_id
+
+# Write-behind buffering for registration bursts (EDU_WRITE_BEHIND=1).
+#
+# An insert takes its IDs from a block reserved in the store, is appended to
+# this process's log in EDU_WAL_DIR and fsynced, and is acknowledged right
+# away. A background thread then writes the buffered records to the store in
+# groups: every EDU_WAL_FLUSH_INTERVAL seconds, or as soon as
+# EDU_WAL_BATCH_SIZE records are waiting. One transaction (or one rewrite of
+# the JSON file) covers the whole group.
+#
+# Logs left behind by a process that died are replayed into the store at
+# startup and by the other workers' flushers.
+ENABLED = os.environ.get('EDU_WRITE_BEHIND', '0') == '1'
+WAL_DIR = os.environ.get('EDU_WAL_DIR', 'wal')
+FLUSH_INTERVAL = float(os.environ.get('EDU_WAL_FLUSH_INTERVAL', '0.05'))
+BATCH_SIZE = int(os.environ.get('EDU_WAL_BATCH_SIZE', '500'))
+FSYNC = os.environ.get('EDU_WAL_FSYNC', '1') == '1'
+# IDs reserved per round trip to the store
+ID_BLOCK = int(os.environ.get('EDU_WAL_ID_BLOCK', '100'))
+# How often (seconds) a flusher looks for logs of dead processes
+REPLAY_INTERVAL = 5.0
+
+
+def _pid_alive(pid):
+    # Same rule as jobs._pid_alive
+    if os.name == 'nt':
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+def read_log(path):
+    """Records in a log segment; a torn last line (crash mid-append, never acknowledged) is skipped."""
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                records.append(jsonio.loads(line))
+            except ValueError:
+                break
+    return records
+
+
+class WriteBehindStore(RecordStore):
+    """
+    Wraps a RecordStore so inserts are logged and acknowledged immediately
+    and written to the store in groups.
+
+    Reads made through this object first flush its buffer, so a process
+    always sees its own writes. Records buffered by other worker processes
+    become visible once their flusher runs (within the flush interval).
+    Updates, deletes and imports also flush first and then go straight to
+    the store.
+    """
+
+    def __init__(self, store, wal_dir=WAL_DIR, flush_interval=FLUSH_INTERVAL, batch_size=BATCH_SIZE,
+                 fsync=FSYNC, id_block=ID_BLOCK):
+        # No RecordStore.__init__: `generation` is derived from the wrapped store
+        self.store = store
+        self.path = getattr(store, 'path', None)
+        self.wal_dir = wal_dir
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.fsync = fsync
+        self.id_block = id_block
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._replay_lock = FileLock(os.path.join(wal_dir, 'replay.lock'))
+        os.makedirs(wal_dir, exist_ok=True)
+        self._reset()
+        self.replay()
+
+    def _reset(self):
+        # Per-process state; a forked worker starts with its own log and ID block
+        self._pid = os.getpid()
+        self._file = None
+        self._segment = 0
+        self._segment_path = None
+        self._pending = []
+        self._unflushed = []  # (segment path, records) logged but not yet in the store
+        self._free_ids = []
+        self._buffered = 0
+        self._flusher = None
+        self._last_replay = time.monotonic()
+
+    def _check_process(self):
+        if self._pid != os.getpid():
+            self._reset()
+
+    @property
+    def indexed(self):
+        return self.store.indexed
+
+    @property
+    def generation(self):
+        # Changes on every buffered insert too, so caches reload and flush
+        return self.store.generation + self._buffered
+
+    def disk_fingerprint(self):
+        return self.store.disk_fingerprint()
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending) + sum(len(batch) for _, batch in self._unflushed)
+
+    # --- writes ---
+
+    def _take_ids(self, count):
+        if len(self._free_ids) < count:
+            self._free_ids.extend(self.store.reserve_ids(max(count - len(self._free_ids), self.id_block)))
+        ids, self._free_ids = self._free_ids[:count], self._free_ids[count:]
+        return ids
+
+    def _open_segment(self):
+        self._segment += 1
+        self._segment_path = os.path.join(self.wal_dir, f"{self._pid}-{self._segment}.log")
+        self._file = open(self._segment_path, 'a', encoding='utf-8')
+
+    def insert_many(self, records):
+        if not records:
+            return []
+        with self._lock:
+            self._check_process()
+            ids = self._take_ids(len(records))
+            rows = [{'ID': new_id, **_without_id(record)} for new_id, record in zip(ids, records)]
+            if self._file is None:
+                self._open_segment()
+            self._file.write(''.join(jsonio.dumps_str(row) + '\n' for row in rows))
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self._pending.extend(rows)
+            self._buffered += 1
+            if len(self._pending) >= self.batch_size:
+                self._wake.set()
+            self._start_flusher()
+        return ids
+
+    def flush(self):
+        """Write every buffered record to the store now. Returns the number written."""
+        with self._flush_lock:
+            with self._lock:
+                self._check_process()
+                if self._pending:
+                    # The records go with their log segment; later inserts start a new one
+                    self._file.close()
+                    self._unflushed.append((self._segment_path, self._pending))
+                    self._file = None
+                    self._pending = []
+                batches = list(self._unflushed)
+            written = 0
+            for path, batch in batches:
+                # On error the batch stays queued (and logged) and is retried on the next flush
+                self.store.insert_with_ids(batch)
+                with self._lock:
+                    self._unflushed.pop(0)
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                written += len(batch)
+            return written
+
+    def _start_flusher(self):
+        # Called with self._lock held
+        if self._flusher is not None:
+            return
+        self._flusher = threading.Thread(target=self._flush_loop, name='write-behind-flush', daemon=True)
+        self._flusher.start()
+
+    def _flush_loop(self):
+        pid = os.getpid()
+        while self._pid == pid:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+                if time.monotonic() - self._last_replay >= REPLAY_INTERVAL:
+                    self._last_replay = time.monotonic()
+                    self.replay()
+            except Exception as e:
+                print(f"Error flushing write-behind log: {e}")
+
+    def replay(self):
+        """Write the logs of processes that are no longer running into the store. Returns the number of records."""
+        replayed = 0
+        with self._replay_lock:
+            for name in sorted(os.listdir(self.wal_dir)):
+                if not name.endswith('.log'):
+                    continue
+                try:
+                    pid = int(name.split('-', 1)[0])
+                except ValueError:
+                    continue
+                # Our own pid only matters before we opened a log (a previous process with the same pid)
+                if (pid == os.getpid() and self._segment) or (pid != os.getpid() and _pid_alive(pid)):
+                    continue
+                path = os.path.join(self.wal_dir, name)
+                records = read_log(path)
+                if records:
+                    # IDs already in the store were flushed before the crash and are left as they are
+                    replayed += self.store.insert_with_ids(records)
+                os.remove(path)
+        if replayed:
+            print(f"Replayed {replayed} records from the write-behind log")
+        return replayed
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        if hasattr(self.store, 'close'):
+            self.store.close()
+
+    # --- reads and other writes: flush, then use the store ---
+
+    def all(self):
+        self.flush()
+        return self.store.all()
+
+    def get(self, record_id):
+        self.flush()
+        return self.store.get(record_id)
+
+    def count(self):
+        self.flush()
+        return self.store.count()
+
+    def iter_records(self, batch_size=1000):
+        self.flush()
+        return self.store.iter_records(batch_size)
+
+    def query(self, filters=None, sort='ID', descending=False, limit=50, cursor=None):
+        self.flush()
+        return self.store.query(filters, sort, descending, limit, cursor)
+
+    def stat_counts(self):
+        self.flush()
+        return self.store.stat_counts()
+
+    def update_many(self, updates):
+        self.flush()
+        return self.store.update_many(updates)
+
+    def delete(self, record_id):
+        self.flush()
+        return self.store.delete(record_id)
+
+    def import_records(self, records):
+        self.flush()
+        return self.store.import_records(records)
+
+    def reserve_ids(self, count):
+        return self.store.reserve_ids(count)
+
+    def insert_with_ids(self, records):
+        self.flush()
+        return self.store.insert_with_ids(records)
@@ -0,0 +1,283 @@
+"""
+Benchmarks for the HTTP endpoints and the inference layer.
+
+Runs the Flask app in-process (test client, no network) against a fresh
+store in a temporary directory, seeded with 1k/10k/100k synthetic
+applicants, and writes a JSON report with p50/p95/p99 latency and
+throughput per operation.
+
+    cd backend
+    python benchmarks/run_benchmarks.py --sizes 1000,10000 --output bench.json
+    python benchmarks/run_benchmarks.py --baseline bench.json   # exit 1 on regressions
+
+The model is loaded from ./artifacts (EDU_ARTIFACTS_DIR), as the server does.
+"""
+import argparse
+import base64
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'benchmarks'))
+
+from synthetic import generate_applicants
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+DEFAULT_REQUESTS = 200
+
+# A metric regresses when its p50 grows (or its throughput drops) by more than this factor
+REGRESSION_FACTOR = 1.25
+
+
+def summarize(name, size, samples, items_per_sample=1):
+    """Latency percentiles (ms) and throughput (items/s) for a list of durations in seconds."""
+    samples = np.asarray(samples, dtype=float)
+    return {
+        'name': name,
+        'size': size,
+        'samples': int(len(samples)),
+        'p50_ms': float(np.percentile(samples, 50) * 1000),
+        'p95_ms': float(np.percentile(samples, 95) * 1000),
+        'p99_ms': float(np.percentile(samples, 99) * 1000),
+        'mean_ms': float(samples.mean() * 1000),
+        'throughput_per_s': float(len(samples) * items_per_sample / samples.sum()) if samples.sum() else 0.0,
+    }
+
+
+def timed(fn, count):
+    durations = []
+    for i in range(count):
+        start = time.perf_counter()
+        fn(i)
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+class Envelope:
+    """Client side of the /register hybrid encryption (what index.html does with JSEncrypt + WebCrypto)."""
+
+    def __init__(self, public_pem):
+        from Crypto.Cipher import PKCS1_v1_5
+        from Crypto.PublicKey import RSA
+
+        self.rsa = PKCS1_v1_5.new(RSA.import_key(public_pem))
+
+    def wrap_key(self, aes_key):
+        return base64.b64encode(self.rsa.encrypt(base64.b64encode(aes_key))).decode()
+
+    @staticmethod
+    def seal(obj, aes_key):
+        from Crypto.Cipher import AES
+        from Crypto.Random import get_random_bytes
+
+        iv = get_random_bytes(12)
+        ciphertext, tag = AES.new(aes_key, AES.MODE_GCM, nonce=iv).encrypt_and_digest(json.dumps(obj).encode())
+        return {'iv': base64.b64encode(iv).decode(), 'data': base64.b64encode(ciphertext + tag).decode()}
+
+    def encrypt(self, obj):
+        from Crypto.Random import get_random_bytes
+
+        aes_key = get_random_bytes(32)
+        return dict(self.seal(obj, aes_key), key=self.wrap_key(aes_key))
+
+
+def bench_http(app_module, client, size, requests, applicants):
+    results = []
+    ids = [r['ID'] for r in app_module.store.query(limit=size)[0]]
+    rng = random.Random(size)
+
+    envelope = Envelope(client.get('/public-key').get_json()['publicKey'])
+
+    def register(i):
+        res = client.post('/register', json=envelope.encrypt(applicants[i % len(applicants)]))
+        assert res.status_code == 200, res.get_data(as_text=True)
+    results.append(summarize('register', size, timed(register, requests)))
+
+    # Client encryption done up front: server-side cost only
+    envelopes = [envelope.encrypt(applicants[i % len(applicants)]) for i in range(requests)]
+    results.append(summarize('register_server', size, timed(
+        lambda i: client.post('/register', json=envelopes[i]), requests)))
+
+    from Crypto.Random import get_random_bytes
+    aes_key = get_random_bytes(32)
+    session = client.post('/session', json={'key': envelope.wrap_key(aes_key)}).get_json()['session']
+    sealed = [dict(Envelope.seal(applicants[i % len(applicants)], aes_key), session=session) for i in range(requests)]
+    results.append(summarize('register_session', size, timed(
+        lambda i: client.post('/register', json=sealed[i]), requests)))
+
+    targets = [rng.choice(ids) for _ in range(requests)]
+    results.append(summarize('get_record', size, timed(
+        lambda i: client.get(f'/api/records/{targets[i]}'), requests)))
+    results.append(summarize('put_record', size, timed(
+        lambda i: client.put(f'/api/records/{targets[i]}', json={'Nombre': f'bench-{i}'}), requests)))
+    results.append(summarize('list_page', size, timed(
+        lambda i: client.get('/api/records?limit=50&Nivel=A'), requests)))
+
+    victims = rng.sample(ids, min(requests, len(ids)))
+    results.append(summarize('delete_record', size, timed(
+        lambda i: client.delete(f'/api/records/{victims[i]}'), len(victims))))
+
+    # predict_all rescoring every record, as a background job polled to completion
+    total = app_module.store.count()
+    start = time.perf_counter()
+    job = client.post('/api/predict_all?force=1').get_json()['job']
+    while True:
+        state = client.get(f"/api/jobs/{job['id']}").get_json()
+        if state['status'] not in ('queued', 'running'):
+            break
+        time.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    assert state['status'] == 'done', state
+    results.append(summarize('predict_all', total, [elapsed], items_per_sample=total))
+    return results
+
+
+def bench_inference(codigoia, size, requests, applicants):
+    results = []
+    candidates = applicants[:size]
+
+    # Model cost without the prediction cache, then the cached path /register usually takes
+    cache_size = codigoia._prediction_cache.max_size
+    codigoia._prediction_cache.clear()
+    codigoia._prediction_cache.max_size = 0
+    try:
+        results.append(summarize('predict_candidate', size, timed(
+            lambda i: codigoia.predict_candidate(candidates[i % size]), requests)))
+        results.append(summarize('predict_batch', size, timed(
+            lambda i: codigoia.predict_batch(candidates), 3), items_per_sample=size))
+    finally:
+        codigoia._prediction_cache.max_size = cache_size
+
+    codigoia.predict_batch(candidates)
+    results.append(summarize('predict_candidate_cached', size, timed(
+        lambda i: codigoia.predict_candidate(candidates[i % size]), requests)))
+    results.append(summarize('predict_batch_cached', size, timed(
+        lambda i: codigoia.predict_batch(candidates), 3), items_per_sample=size))
+    return results
+
+
+def load_app(workdir):
+    """Build the app with its store, keys and jobs in `workdir` and the model from EDU_ARTIFACTS_DIR."""
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)
+    import app as app_module
+
+    flask_app = app_module.create_app()
+    return app_module, flask_app.test_client()
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes, requests, seed=0):
+    applicants = generate_applicants(max(sizes) + requests, seed)
+    results = []
+    # Resolve the artifacts directory before leaving the current directory
+    os.environ.setdefault('EDU_ARTIFACTS_DIR', os.path.abspath('artifacts'))
+    sys.path.insert(0, BACKEND_DIR)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='edu-bench-') as workdir:
+        try:
+            for size in sizes:
+                # A fresh app and store per size
+                app_module, client = load_app(os.path.join(workdir, str(size)))
+                import codigoia
+
+                app_module.store.insert_many(applicants[:size])
+                print(f"[{size}] store seeded", file=sys.stderr)
+
+                results.extend(bench_inference(codigoia, size, requests, applicants))
+                results.extend(bench_http(app_module, client, size, requests, applicants[size:]))
+                app_module.store.close()
+                print(f"[{size}] done", file=sys.stderr)
+            model = {'version': codigoia.model_version(), 'backend': codigoia._backend,
+                     'runtime': codigoia.MODEL_RUNTIME}
+        finally:
+            os.chdir(cwd)
+
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'requests_per_endpoint': requests,
+            'seed': seed,
+            'model': model,
+            'created_at': time.time(),
+        },
+        'results': results,
+    }
+
+
+def find_regressions(report, baseline, factor=REGRESSION_FACTOR):
+    """Metrics whose p50 grew, or whose throughput fell, by more than `factor` against `baseline`."""
+    previous = {(r['name'], r['size']): r for r in baseline['results']}
+    regressions = []
+    for r in report['results']:
+        old = previous.get((r['name'], r['size']))
+        if old is None:
+            continue
+        if r['p50_ms'] > old['p50_ms'] * factor or r['throughput_per_s'] * factor < old['throughput_per_s']:
+            regressions.append({'name': r['name'], 'size': r['size'],
+                                'p50_ms': [old['p50_ms'], r['p50_ms']],
+                                'throughput_per_s': [old['throughput_per_s'], r['throughput_per_s']]})
+    return regressions
+
+
+def format_table(report):
+    lines = [f"{'benchmark':<26} {'size':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'items/s':>11}"]
+    for r in report['results']:
+        lines.append(f"{r['name']:<26} {r['size']:>7} {r['p50_ms']:>9.3f} {r['p95_ms']:>9.3f} "
+                     f"{r['p99_ms']:>9.3f} {r['throughput_per_s']:>11.1f}")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the EDU-SELECT API and inference layer.")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="Comma-separated store sizes (records)")
+    parser.add_argument('--requests', type=int, default=DEFAULT_REQUESTS, help="Requests per endpoint and size")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write the JSON report here (default: stdout)")
+    parser.add_argument('--baseline', help="Previous JSON report; exit 1 if any metric regressed")
+    parser.add_argument('--factor', type=float, default=REGRESSION_FACTOR,
+                        help="Allowed slowdown factor against the baseline")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(',') if s]
+    report = run(sizes, args.requests, args.seed)
+
+    print(format_table(report), file=sys.stderr)
+    body = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(body)
+    else:
+        print(body)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = find_regressions(report, json.load(f), args.factor)
+        for r in regressions:
+            print(f"REGRESSION {r['name']} @ {r['size']}: p50 {r['p50_ms'][0]:.3f} -> {r['p50_ms'][1]:.3f} ms, "
+                  f"throughput {r['throughput_per_s'][0]:.1f} -> {r['throughput_per_s'][1]:.1f}/s", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+import random
+
+# Value pools shaped like the applicant record in app/utils/verify_size.py
+NOMBRES = ['Miguel', 'Ana', 'Luis', 'María', 'José', 'Fernanda', 'Carlos', 'Sofía', 'Jorge', 'Valeria']
+APELLIDOS = ['Lopez', 'García', 'Hernández', 'Martínez', 'González', 'Pérez', 'Rodríguez', 'Sánchez']
+ENTIDADES = ['CDMX', 'Nuevo León', 'Jalisco', 'Puebla', 'Yucatán', 'Querétaro', 'Veracruz', 'Sonora']
+ZONAS = ['Norte', 'Centro', 'Sur', 'Occidente', 'Sureste']
+NIVELES_EDUCATIVOS = ['Preparatoria', 'Técnico', 'Licenciatura', 'Maestría', 'Doctorado']
+CAMPOS = ['Tecnologías de la Información', 'Informática', 'Ingeniería', 'Administración',
+          'Contabilidad', 'Derecho', 'Medicina', 'Educación']
+TIPOS_INSTITUCION = ['Pública', 'Privada']
+INSTITUCIONES = ['Universidad Nacional Autonoma de Mexico', 'Instituto Politécnico Nacional',
+                 'Tecnológico de Monterrey', 'Universidad de Guadalajara', 'Universidad Autónoma de Nuevo León']
+JORNADAS = ['Tiempo Completo', 'Medio Tiempo', 'Por Horas']
+NIVELES = ['A', 'B', 'C']
+
+
+def generate_applicant(rng):
+    """One synthetic applicant with the same fields and value types as the registration form."""
+    entidad = rng.choice(ENTIDADES)
+    return {
+        "Nombre": rng.choice(NOMBRES),
+        "Apellidos": f"{rng.choice(APELLIDOS)} {rng.choice(APELLIDOS)}",
+        "Edad": rng.randint(18, 65),
+        "Procedencia": entidad,
+        "Entidad Federativa": entidad,
+        "Zona Geográfica": rng.choice(ZONAS),
+        "Nivel Educativo": rng.choice(NIVELES_EDUCATIVOS),
+        "Campo Estudio": rng.choice(CAMPOS),
+        "Tipo Institución": rng.choice(TIPOS_INSTITUCION),
+        "Institución": rng.choice(INSTITUCIONES),
+        "Rango Ingreso": rng.randint(5000, 90000),
+        "Experiencia (años)": rng.randint(0, 35),
+        "Jornada": rng.choice(JORNADAS),
+        "Nivel": rng.choice(NIVELES),
+    }
+
+
+def generate_applicants(count, seed=0):
+    """`count` applicants; the same seed always yields the same list."""
+    rng = random.Random(seed)
+    return [generate_applicant(rng) for _ in range(count)]
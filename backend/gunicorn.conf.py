@@ -0,0 +1,33 @@
+# gunicorn settings for EDU-SELECT: gunicorn -c gunicorn.conf.py wsgi:app
+# Every value can be overridden with an EDU_* environment variable.
+import gc
+import multiprocessing
+import os
+
+# One numeric thread per worker: the workers already use every core, and
+# per-process BLAS pools would oversubscribe them. Must be set before the
+# app (and numpy) is imported by preload_app.
+for _var in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+    os.environ.setdefault(_var, '1')
+
+# Workers share their /metrics counters through snapshot files (see utils/metrics.py)
+os.environ.setdefault('EDU_METRICS_DIR', 'metrics')
+
+bind = os.environ.get('EDU_BIND', '127.0.0.1:5000')
+workers = int(os.environ.get('EDU_WORKERS', multiprocessing.cpu_count()))
+threads = int(os.environ.get('EDU_THREADS', '4'))
+worker_class = 'gthread'
+timeout = int(os.environ.get('EDU_TIMEOUT', '60'))
+
+# Import the app (and load the model artifacts) once in the master, then fork.
+# Requires the NumPy runtime (EDU_MODEL_RUNTIME=numpy, the default): TensorFlow
+# is not safe to use across fork.
+preload_app = True
+
+accesslog = os.environ.get('EDU_ACCESS_LOG')  # e.g. '-' for stdout
+
+
+def when_ready(server):
+    # Move the preloaded objects out of the GC's generations so collections in
+    # the workers do not touch (and copy) the pages they share with the master
+    gc.freeze()
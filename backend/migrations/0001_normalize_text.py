@@ -0,0 +1,30 @@
+"""Title-case the text fields, map the old Jornada values to 'Asignatura' and keep 'CDMX' upper case."""
+
+TEXT_FIELDS = ['Nombre', 'Apellidos', 'Procedencia', 'Entidad Federativa', 'Zona Geográfica', 'Nivel Educativo',
+               'Campo Estudio', 'Tipo Institución', 'Institución', 'Jornada', 'Nivel']
+
+# Jornada values that became 'Asignatura'
+OLD_JORNADAS = ['Tiempo Completo', 'Medio Tiempo']
+
+
+def normalize_text(text):
+    if isinstance(text, str):
+        # Title Case and strip
+        return text.strip().title()
+    return text
+
+
+def transform(record):
+    for key in TEXT_FIELDS:
+        if key in record:
+            record[key] = normalize_text(record[key])
+
+    # Checked after normalizing so ' tiempo completo' is caught on the first run too
+    # (the original script checked first, so a second run changed more records)
+    if record.get('Jornada') in OLD_JORNADAS:
+        record['Jornada'] = 'Asignatura'
+
+    # normalize_text("CDMX") -> "Cdmx"; keep the usual abbreviation
+    if record.get('Entidad Federativa') == 'Cdmx':
+        record['Entidad Federativa'] = 'CDMX'
+    return record
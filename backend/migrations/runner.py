@@ -0,0 +1,408 @@
+"""
+Numbered, resumable data migrations for the applicant records.
+
+Each migration is a file NNNN_<name>.py in this directory defining
+`transform(record) -> record`. Transforms must be idempotent: a record that
+was already migrated comes back unchanged. Migrations run in order, records
+stream through them in chunks (constant memory), and the schema version is
+recorded once a migration has covered every record.
+
+    cd backend
+    python migrations/runner.py --status
+    python migrations/runner.py                 # apply everything pending
+    python migrations/runner.py --backend json --db base_del_proto.json
+
+SQLite (the default store) is migrated in place while the server keeps
+running: every chunk is one short write transaction that also stores the
+checkpoint, and triggers log the IDs the server writes meanwhile so they are
+migrated again before the version is recorded. The legacy JSON file is
+rewritten to a new file that replaces the original atomically at the end;
+its store lock is held for the whole run.
+
+An interrupted run resumes from its last checkpoint when started again.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'app', 'utils'))
+
+import jsonio
+import storage
+from storage import FileLock, atomic_write_json
+
+MIGRATIONS_DIR = os.path.dirname(os.path.abspath(__file__))
+MIGRATION_FILE = re.compile(r'^(\d{4})_(\w+)\.py$')
+CHUNK_SIZE = int(os.environ.get('EDU_MIGRATION_CHUNK_SIZE', '1000'))
+
+
+class MigrationError(Exception):
+    pass
+
+
+class Migration:
+    def __init__(self, version, name, transform, description=''):
+        self.version = version
+        self.name = name
+        self.transform = transform
+        self.description = description
+
+    def __repr__(self):
+        return f"Migration({self.version}, {self.name!r})"
+
+
+def discover(directory=MIGRATIONS_DIR):
+    """The migrations in `directory`, ordered by version (1, 2, 3... with no gaps)."""
+    migrations = []
+    for filename in sorted(os.listdir(directory)):
+        match = MIGRATION_FILE.match(filename)
+        if not match:
+            continue
+        version, name = int(match.group(1)), match.group(2)
+        spec = importlib.util.spec_from_file_location(f"migration_{version:04d}", os.path.join(directory, filename))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        if not callable(getattr(module, 'transform', None)):
+            raise MigrationError(f"{filename} does not define transform(record)")
+        migrations.append(Migration(version, name, module.transform, (module.__doc__ or '').strip()))
+    versions = [m.version for m in migrations]
+    if versions != list(range(1, len(migrations) + 1)):
+        raise MigrationError(f"Migration versions must be 1..N without gaps, found {versions}")
+    return migrations
+
+
+def _apply(migration, record):
+    """Run a transform on a copy; the record ID is never changed."""
+    migrated = migration.transform(dict(record))
+    if not isinstance(migrated, dict):
+        raise MigrationError(f"Migration {migration.version} returned {type(migrated).__name__} for record "
+                             f"{record.get('ID')}")
+    if 'ID' in record:
+        migrated['ID'] = record['ID']
+    return migrated
+
+
+class SQLiteTarget:
+    """Online, in-place migration of the SQLiteStore `records` table."""
+
+    TRIGGERS = {
+        'migration_dirty_insert': 'AFTER INSERT ON records',
+        'migration_dirty_update': 'AFTER UPDATE ON records',
+    }
+
+    def __init__(self, path=storage.SQLITE_FILE):
+        self.path = path
+        # Creates the records table and its indexes if the database is new
+        storage.SQLiteStore(path).close()
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        with self._transaction() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS schema_migrations ("
+                         " version INTEGER PRIMARY KEY, name TEXT NOT NULL,"
+                         " applied_at REAL NOT NULL, changed INTEGER NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS migration_progress ("
+                         " version INTEGER PRIMARY KEY, last_id INTEGER NOT NULL,"
+                         " scanned INTEGER NOT NULL, changed INTEGER NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS migration_dirty (ID INTEGER PRIMARY KEY)")
+
+    def _transaction(self):
+        return _SQLiteTransaction(self.conn)
+
+    def close(self):
+        self.conn.close()
+
+    def current_version(self):
+        return self.conn.execute("SELECT IFNULL(MAX(version), 0) FROM schema_migrations").fetchone()[0]
+
+    def history(self):
+        rows = self.conn.execute("SELECT version, name, applied_at, changed FROM schema_migrations ORDER BY version")
+        return [{'version': v, 'name': n, 'applied_at': t, 'changed': c} for v, n, t, c in rows]
+
+    def apply(self, migration, chunk_size=CHUNK_SIZE, log=print):
+        with self._transaction() as conn:
+            for name, event in self.TRIGGERS.items():
+                conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {event} BEGIN "
+                             f"INSERT OR IGNORE INTO migration_dirty (ID) VALUES (NEW.ID); END")
+            conn.execute("INSERT OR IGNORE INTO migration_progress VALUES (?, 0, 0, 0)", (migration.version,))
+            last_id, scanned, changed = conn.execute(
+                "SELECT last_id, scanned, changed FROM migration_progress WHERE version = ?",
+                (migration.version,)).fetchone()
+        if last_id:
+            log(f"  resuming after ID {last_id} ({scanned} records already scanned)")
+
+        while True:
+            # Main pass: keyset chunks, each committed together with its checkpoint
+            while True:
+                with self._transaction() as conn:
+                    rows = conn.execute("SELECT ID, data FROM records WHERE ID > ? ORDER BY ID LIMIT ?",
+                                        (last_id, chunk_size)).fetchall()
+                    if not rows:
+                        break
+                    changed += self._migrate_rows(conn, migration, rows)
+                    # These rows were read under the write lock, so earlier writes to them are covered
+                    conn.execute("DELETE FROM migration_dirty WHERE ID > ? AND ID <= ?", (last_id, rows[-1][0]))
+                    last_id = rows[-1][0]
+                    scanned += len(rows)
+                    conn.execute("UPDATE migration_progress SET last_id = ?, scanned = ?, changed = ? "
+                                 "WHERE version = ?", (last_id, scanned, changed, migration.version))
+                log(f"  {scanned} records scanned, {changed} changed")
+
+            # Catch-up: rows the server wrote behind the cursor while the main pass ran
+            while True:
+                with self._transaction() as conn:
+                    ids = [row[0] for row in conn.execute(
+                        "SELECT ID FROM migration_dirty WHERE ID <= ? ORDER BY ID LIMIT ?", (last_id, chunk_size))]
+                    if not ids:
+                        break
+                    placeholders = ','.join('?' * len(ids))
+                    rows = conn.execute(f"SELECT ID, data FROM records WHERE ID IN ({placeholders})", ids).fetchall()
+                    changed += self._migrate_rows(conn, migration, rows)
+                    conn.execute(f"DELETE FROM migration_dirty WHERE ID IN ({placeholders})", ids)
+
+            # Record the version in the same transaction that sees nothing left to migrate
+            with self._transaction() as conn:
+                if conn.execute("SELECT 1 FROM migration_dirty WHERE ID <= ? LIMIT 1", (last_id,)).fetchone() or \
+                        conn.execute("SELECT 1 FROM records WHERE ID > ? LIMIT 1", (last_id,)).fetchone():
+                    continue
+                conn.execute("INSERT INTO schema_migrations VALUES (?, ?, ?, ?)",
+                             (migration.version, migration.name, time.time(), changed))
+                conn.execute("DELETE FROM migration_progress WHERE version = ?", (migration.version,))
+                conn.execute("DELETE FROM migration_dirty")
+                for name in self.TRIGGERS:
+                    conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+            return {'version': migration.version, 'name': migration.name, 'scanned': scanned, 'changed': changed}
+
+    @staticmethod
+    def _migrate_rows(conn, migration, rows):
+        changed = 0
+        for record_id, data in rows:
+            record = {'ID': record_id, **jsonio.loads(data)}
+            migrated = _apply(migration, record)
+            if migrated != record:
+                body = {k: v for k, v in migrated.items() if k != 'ID'}
+                conn.execute("UPDATE records SET data = ? WHERE ID = ?",
+                             (jsonio.dumps_str(body), record_id))
+                changed += 1
+        return changed
+
+
+class _SQLiteTransaction:
+    """BEGIN IMMEDIATE ... COMMIT, rolled back on error (as SQLiteStore._transaction)."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+def iter_json_array(f, read_size=1 << 16):
+    """Yield the elements of the JSON array in file `f` one at a time, reading `read_size` characters at once."""
+    decoder = json.JSONDecoder()
+    buf, pos, eof, opened = '', 0, False, False
+
+    def more():
+        nonlocal buf, pos, eof
+        chunk = f.read(read_size)
+        eof = not chunk
+        buf, pos = buf[pos:] + chunk, 0
+
+    while True:
+        while pos < len(buf) and (buf[pos].isspace() or (opened and buf[pos] == ',')):
+            pos += 1
+        if pos >= len(buf):
+            if eof:
+                raise ValueError("Unexpected end of JSON array")
+            more()
+            continue
+        if not opened:
+            if buf[pos] != '[':
+                raise ValueError("Expected a JSON array")
+            opened = True
+            pos += 1
+            continue
+        if buf[pos] == ']':
+            return
+        try:
+            value, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            more()
+            continue
+        if end == len(buf) and not eof:
+            # A number or literal may continue in the next read
+            more()
+            continue
+        yield value
+        pos = end
+
+
+class JsonFileTarget:
+    """The legacy JSON array file, rewritten to `<path>.migrating` and swapped in atomically."""
+
+    def __init__(self, path=storage.DB_FILE):
+        self.path = path
+        self.schema_path = f"{path}.schema.json"
+        self.tmp_path = f"{path}.migrating"
+        self.checkpoint_path = f"{path}.migrating.checkpoint.json"
+        # The same lock JsonFileStore takes for its writes
+        self._lock = FileLock(f"{path}.lock")
+
+    def close(self):
+        pass
+
+    def _schema(self):
+        if not os.path.exists(self.schema_path):
+            return {'version': 0, 'history': []}
+        with open(self.schema_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def current_version(self):
+        return self._schema()['version']
+
+    def history(self):
+        return self._schema()['history']
+
+    def _source_fingerprint(self):
+        st = os.stat(self.path)
+        return [st.st_size, st.st_mtime_ns]
+
+    def _load_checkpoint(self, migration):
+        if not (os.path.exists(self.checkpoint_path) and os.path.exists(self.tmp_path)):
+            return None
+        with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+        if checkpoint.get('version') != migration.version or checkpoint.get('source') != self._source_fingerprint():
+            return None
+        if os.path.getsize(self.tmp_path) < checkpoint['offset']:
+            return None
+        return checkpoint
+
+    def apply(self, migration, chunk_size=CHUNK_SIZE, log=print):
+        with self._lock:
+            if not os.path.exists(self.path):
+                # Nothing stored yet: the version still applies to everything written later
+                changed = scanned = 0
+            else:
+                scanned, changed = self._rewrite(migration, chunk_size, log)
+            schema = self._schema()
+            schema['version'] = migration.version
+            schema['history'].append({'version': migration.version, 'name': migration.name,
+                                      'applied_at': time.time(), 'changed': changed})
+            atomic_write_json(self.schema_path, schema, indent=4)
+        return {'version': migration.version, 'name': migration.name, 'scanned': scanned, 'changed': changed}
+
+    def _rewrite(self, migration, chunk_size, log):
+        checkpoint = self._load_checkpoint(migration)
+        scanned = checkpoint['records'] if checkpoint else 0
+        changed = checkpoint['changed'] if checkpoint else 0
+        if checkpoint:
+            log(f"  resuming after {scanned} records")
+        source = self._source_fingerprint()
+
+        with open(self.path, 'r', encoding='utf-8') as src, \
+                open(self.tmp_path, 'r+' if checkpoint else 'w', encoding='utf-8') as out:
+            if checkpoint:
+                out.seek(checkpoint['offset'])
+                out.truncate()
+            else:
+                out.write('[')
+            records = iter_json_array(src)
+            for _ in range(scanned):
+                next(records)
+
+            pending = 0
+            for record in records:
+                migrated = _apply(migration, record)
+                changed += migrated != record
+                # Same compact layout as JsonFileStore.save
+                if scanned:
+                    out.write(',')
+                out.write(jsonio.dumps_str(migrated))
+                scanned += 1
+                pending += 1
+                if pending >= chunk_size:
+                    self._checkpoint(out, migration, source, scanned, changed)
+                    log(f"  {scanned} records scanned, {changed} changed")
+                    pending = 0
+            out.write(']')
+            out.flush()
+            os.fsync(out.fileno())
+
+        os.replace(self.tmp_path, self.path)
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+        return scanned, changed
+
+    def _checkpoint(self, out, migration, source, scanned, changed):
+        out.flush()
+        os.fsync(out.fileno())
+        atomic_write_json(self.checkpoint_path, {'version': migration.version, 'source': source,
+                                                 'records': scanned, 'changed': changed, 'offset': out.tell()})
+
+
+def open_target(backend=None, path=None):
+    backend = backend or storage.DB_BACKEND
+    if backend == 'json':
+        return JsonFileTarget(path or storage.DB_FILE)
+    if backend == 'sqlite':
+        return SQLiteTarget(path or storage.SQLITE_FILE)
+    raise ValueError(f"Unknown DB backend: {backend}")
+
+
+def migrate(target, migrations=None, target_version=None, chunk_size=CHUNK_SIZE, log=print):
+    """Apply the pending migrations (up to `target_version`) in order. Returns one summary per migration."""
+    migrations = discover() if migrations is None else migrations
+    current = target.current_version()
+    if target_version is None:
+        target_version = len(migrations)
+    if target_version < current:
+        raise MigrationError(f"Schema is at version {current}; migrations cannot be reverted")
+
+    applied = []
+    for migration in migrations:
+        if current < migration.version <= target_version:
+            log(f"Applying migration {migration.version:04d}_{migration.name}")
+            applied.append(target.apply(migration, chunk_size, log))
+    log(f"Schema version {target.current_version()}")
+    return applied
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply the numbered data migrations to the record store.")
+    parser.add_argument('--backend', choices=['sqlite', 'json'], help="Default: EDU_DB_BACKEND (sqlite)")
+    parser.add_argument('--db', help="Database file (default: the store's usual file)")
+    parser.add_argument('--to', type=int, dest='target_version', help="Stop at this version")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="Records per transaction/checkpoint")
+    parser.add_argument('--status', action='store_true', help="Show the schema version and pending migrations")
+    args = parser.parse_args(argv)
+
+    target = open_target(args.backend, args.db)
+    try:
+        if args.status:
+            migrations = discover()
+            current = target.current_version()
+            print(f"Schema version {current}")
+            for migration in migrations:
+                state = 'applied' if migration.version <= current else 'pending'
+                print(f"  {migration.version:04d}_{migration.name}: {state}")
+            return
+        migrate(target, target_version=args.target_version, chunk_size=args.chunk_size)
+    finally:
+        target.close()
+
+
+if __name__ == '__main__':
+    main()
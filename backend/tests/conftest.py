@@ -0,0 +1,104 @@
+import os
+import sys
+
+import pytest
+
+# The backend modules are imported flat (e.g. `import codigoia`), as app.py does;
+# BACKEND_DIR itself holds app.py, whatever directory pytest was started from
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+for path in (BACKEND_DIR, os.path.join(BACKEND_DIR, 'app', 'models'), os.path.join(BACKEND_DIR, 'app', 'utils')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+# Benchmark harness helpers (benchmarks/run_benchmarks.py, benchmarks/synthetic.py)
+_benchmarks = os.path.join(BACKEND_DIR, 'benchmarks')
+if _benchmarks not in sys.path:
+    sys.path.insert(0, _benchmarks)
+
+# Migration runner (migrations/runner.py)
+_migrations = os.path.join(BACKEND_DIR, 'migrations')
+if _migrations not in sys.path:
+    sys.path.insert(0, _migrations)
+
+# Module state replaced by training or loading a model; `trained_model` restores it after each test
+_MODEL_GLOBALS = ('_model', '_scaler', '_encoder', '_training_columns', '_feature_encoder',
+                  '_model_version', '_classes', '_train_info', '_backend')
+
+NIVELES_EDUCATIVOS = ['Licenciatura', 'Maestría', 'Doctorado']
+CAMPOS = ['Informática', 'Ingeniería', 'Administración']
+
+
+def write_training_file(path, rows=120, seed=0):
+    """Small training spreadsheet in the layout of the real one (title row above the header)."""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    experiencia = rng.integers(0, 20, rows)
+    df = pd.DataFrame({
+        'Experiencia (años)': experiencia,
+        'Nivel Educativo': rng.choice(NIVELES_EDUCATIVOS, rows),
+        'Campo Estudio': rng.choice(CAMPOS, rows),
+        'Nivel': np.where(experiencia >= 12, 'A', np.where(experiencia >= 5, 'B', 'C')),
+    })
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame([['Base de datos']]).to_excel(writer, index=False, header=False)
+        df.to_excel(writer, index=False, startrow=1)
+    return path
+
+
+@pytest.fixture
+def trained_model(tmp_path, monkeypatch):
+    """
+    A quick logistic-regression model trained in a temporary working directory
+    (artifacts/ and the spreadsheet live there). Returns the spreadsheet path.
+    """
+    import codigoia
+
+    monkeypatch.chdir(tmp_path)
+    for name in _MODEL_GLOBALS:
+        monkeypatch.setattr(codigoia, name, getattr(codigoia, name))
+    monkeypatch.setattr(codigoia, 'MODEL_BACKEND', 'logreg')
+    path = write_training_file(str(tmp_path / 'training.xlsx'))
+    codigoia.load_or_train_model(path)
+    yield path
+    codigoia._prediction_cache.clear()
+
+
+def envelope(payload, public_pem, chunks=False):
+    """
+    Encrypt `payload` as the frontend does: a fresh AES-GCM key wrapped with the
+    server's RSA key, giving {key, iv, data}. With `chunks`, `payload` is a list
+    of chunks sealed under that one key, giving {key, chunks} for /register/batch.
+    """
+    import base64
+    import json
+
+    from Crypto.Cipher import AES, PKCS1_v1_5
+    from Crypto.PublicKey import RSA
+    from Crypto.Random import get_random_bytes
+
+    aes_key = get_random_bytes(32)
+    sealed = []
+    for part in (payload if chunks else [payload]):
+        iv = get_random_bytes(12)
+        ciphertext, tag = AES.new(aes_key, AES.MODE_GCM, nonce=iv).encrypt_and_digest(json.dumps(part).encode())
+        sealed.append({'iv': base64.b64encode(iv).decode(), 'data': base64.b64encode(ciphertext + tag).decode()})
+    key = base64.b64encode(PKCS1_v1_5.new(RSA.import_key(public_pem)).encrypt(base64.b64encode(aes_key))).decode()
+    if chunks:
+        return {'key': key, 'chunks': sealed}
+    return {'key': key, **sealed[0]}
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """
+    The app (without loading a model) over an empty store in a temporary working
+    directory. Yields (app module, test client). Use with `trained_model` for predictions.
+    """
+    monkeypatch.chdir(tmp_path)
+    import app as app_module
+
+    client = app_module.create_app(load_model=False).test_client()
+    yield app_module, client
+    app_module.store.close()
@@ -0,0 +1,124 @@
+import json
+import os
+
+import artifacts
+import codigoia
+from conftest import write_training_file
+
+
+def _fail_training(*args, **kwargs):
+    raise AssertionError("train_model should not run")
+
+
+def test_unchanged_spreadsheet_reloads_without_training(trained_model, monkeypatch):
+    key = artifacts.artifact_key(trained_model, 'logreg')
+    assert key.startswith('v2-') and len(key.split('-')[1]) == 16
+    assert os.path.isdir(artifacts.artifact_path(key))
+    assert artifacts.latest_key() == key
+    version = codigoia.model_version()
+    assert version.startswith(key + '.')
+
+    monkeypatch.setattr(codigoia, '_model', None)
+    monkeypatch.setattr(codigoia, 'train_model', _fail_training)
+    assert codigoia.load_or_train_model(trained_model) is not None
+    assert codigoia.model_version() == version
+
+
+def test_every_training_gets_its_own_version(trained_model):
+    candidate = {'Experiencia (años)': 7, 'Nivel Educativo': 'Maestría', 'Campo Estudio': 'Ingeniería'}
+    key = artifacts.artifact_key(trained_model, 'logreg')
+    first = codigoia.model_version()
+    signature = codigoia.prediction_signature(candidate)
+
+    # Same spreadsheet, other hyperparameters: same directory, new version
+    codigoia.train_model(trained_model, params={'C': 1e-4})
+    second = codigoia.model_version()
+    assert second != first and second.startswith(key + '.')
+    assert codigoia.prediction_signature(candidate) != signature
+    assert artifacts.read_metadata(key)['model_version'] == second
+
+    assert codigoia.load_artifacts(key)
+    assert codigoia.model_version() == second
+
+
+def test_changed_spreadsheet_trains_into_a_new_directory(trained_model):
+    old_key = artifacts.artifact_key(trained_model, 'logreg')
+    write_training_file(trained_model, seed=1)
+    new_key = artifacts.artifact_key(trained_model, 'logreg')
+    assert new_key != old_key
+
+    codigoia.load_or_train_model(trained_model)
+    assert codigoia.model_version().startswith(new_key + '.')
+    assert artifacts.latest_key() == new_key
+    # The previous version stays published for rollbacks
+    assert os.path.isdir(artifacts.artifact_path(old_key))
+    assert os.path.isdir(artifacts.artifact_path(new_key))
+
+
+def test_missing_spreadsheet_falls_back_to_latest(trained_model, monkeypatch):
+    old_key = codigoia.model_version()
+    write_training_file(trained_model, seed=1)
+    codigoia.load_or_train_model(trained_model)
+    latest = codigoia.model_version()
+    os.remove(trained_model)
+
+    monkeypatch.setattr(codigoia, '_model', None)
+    monkeypatch.setattr(codigoia, 'train_model', _fail_training)
+    assert codigoia.load_or_train_model(trained_model) is not None
+    assert codigoia.model_version() == latest != old_key
+    assert codigoia.predict_candidate({'Experiencia (años)': 15}) in ('A', 'B', 'C')
+
+    # Without artifacts either there is nothing to load
+    monkeypatch.setattr(artifacts, 'ARTIFACTS_DIR', str(os.path.dirname(trained_model) + '/vacio'))
+    monkeypatch.setattr(codigoia, '_model', None)
+    assert codigoia.load_or_train_model(trained_model) is None
+
+
+def test_search_result_is_published_as_a_new_version(trained_model):
+    codigoia.train_model(trained_model, backend='mlp', params={'layers': [8], 'epochs': 1})
+    key = artifacts.artifact_key(trained_model, 'mlp')
+    default_version = codigoia.model_version()
+
+    best = {'params': {'layers': [8], 'dropout': 0.0, 'learning_rate': 0.01, 'epochs': 2, 'batch_size': 32}}
+    assert codigoia.publish_best_trial(trained_model, best) is not None
+    assert codigoia.model_version() != default_version
+    assert codigoia.model_version().startswith(key + '.')
+    metadata = artifacts.read_metadata(key)
+    assert metadata['model_version'] == codigoia.model_version()
+    assert metadata['training']['params']['layers'] == [8]
+
+
+def test_server_startup_reuses_the_published_model(trained_model, monkeypatch):
+    os.replace(trained_model, codigoia.TRAINING_FILE)
+    codigoia.load_or_train_model(codigoia.TRAINING_FILE)
+    version = codigoia.model_version()
+
+    monkeypatch.setattr(codigoia, '_model', None)
+    monkeypatch.setattr(codigoia, 'train_model', _fail_training)
+    import app as app_module
+    app_module.create_app(load_model=True)
+    app_module.store.close()
+    assert codigoia.model_version() == version
+
+
+def test_half_written_or_old_artifacts_are_not_loaded(trained_model, monkeypatch):
+    key = artifacts.artifact_key(trained_model, 'logreg')
+    # A crash while publishing leaves only the staging directory behind
+    os.replace(artifacts.artifact_path(key), artifacts.staging_path(key))
+    assert artifacts.read_metadata(key) is None
+
+    retrained = []
+    train_model = codigoia.train_model
+    monkeypatch.setattr(codigoia, 'train_model', lambda *a, **kw: retrained.append(1) or train_model(*a, **kw))
+    codigoia.load_or_train_model(trained_model)
+    assert retrained == [1]
+    assert artifacts.read_metadata(key)['format'] == artifacts.ARTIFACT_FORMAT
+
+    # An artifact written in another format is retrained rather than loaded
+    metadata_path = os.path.join(artifacts.artifact_path(key), artifacts.METADATA_FILE)
+    with open(metadata_path, encoding='utf-8') as f:
+        metadata = json.load(f)
+    with open(metadata_path, 'w', encoding='utf-8') as f:
+        json.dump(dict(metadata, format=1), f)
+    codigoia.load_or_train_model(trained_model)
+    assert retrained == [1, 1]
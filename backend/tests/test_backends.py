@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+import backends
+
+
+def _data(n_classes, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(300, 6))
+    y = np.argmax(X[:, :n_classes] + rng.normal(scale=0.3, size=(300, n_classes)), axis=1)
+    return X[:240], y[:240], X[240:], y[240:]
+
+
+@pytest.mark.parametrize('n_classes', [2, 4])
+def test_logreg_numpy_export_matches_sklearn(tmp_path, n_classes):
+    backend = backends.get_backend('logreg')
+    X_train, y_train, X_test, y_test = _data(n_classes)
+    model, info = backend.fit(X_train, y_train, X_test, y_test, n_classes)
+    backend.save(model, str(tmp_path))
+
+    served = backend.load(str(tmp_path))
+    np.testing.assert_allclose(served.predict(X_test), model.model.predict_proba(X_test), atol=1e-5)
+    assert np.array_equal(np.argmax(served.predict(X_test), axis=1), model.model.predict(X_test))
+
+
+def test_hgb_round_trip(tmp_path):
+    backend = backends.get_backend('hgb')
+    X_train, y_train, X_test, y_test = _data(3)
+    model, info = backend.fit(X_train, y_train, X_test, y_test, 3, {'max_iter': 20})
+    backend.save(model, str(tmp_path))
+    assert np.array_equal(backend.load(str(tmp_path)).predict(X_test), model.model.predict_proba(X_test))
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        backends.get_backend('svm')
@@ -0,0 +1,22 @@
+from run_benchmarks import find_regressions, summarize
+from synthetic import generate_applicants
+from validation import RECORD_FIELDS, validate_record
+
+
+def test_synthetic_applicants_match_the_form():
+    applicants = generate_applicants(50, seed=3)
+    assert applicants == generate_applicants(50, seed=3)
+    for applicant in applicants:
+        assert list(applicant) == RECORD_FIELDS
+        validate_record(applicant)
+
+
+def test_summary_and_regressions():
+    fast = summarize('get_record', 1000, [0.001] * 99 + [0.01])
+    assert round(fast['p50_ms'], 6) == 1.0 and fast['p99_ms'] > fast['p95_ms']
+    assert round(fast['throughput_per_s']) == round(100 / 0.109)
+
+    slow = summarize('get_record', 1000, [0.002] * 100)
+    baseline = {'results': [fast]}
+    assert find_regressions({'results': [fast]}, baseline) == []
+    assert [r['name'] for r in find_regressions({'results': [slow]}, baseline)] == ['get_record']
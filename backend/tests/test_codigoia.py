@@ -0,0 +1,52 @@
+import pytest
+
+import codigoia
+
+
+MIXED = [
+    {'Experiencia (años)': 15, 'Nivel Educativo': 'Doctorado', 'Campo Estudio': 'Informática'},
+    {'Experiencia (años)': '7', 'Nivel Educativo': 'Maestría', 'Campo Estudio': 'Ingeniería', 'Nombre': 'Ana'},
+    {'Experiencia (años)': 1.5, 'Nivel Educativo': 'Licenciatura', 'Campo Estudio': 'Administración'},
+    {'Nivel Educativo': 'Bachillerato', 'Campo Estudio': 'Medicina'},  # no experience, unseen categories
+    {'Experiencia (años)': 7, 'Nivel Educativo': 'Maestría', 'Campo Estudio': 'Ingeniería'},  # repeated
+    {},
+]
+
+
+def test_predict_batch_matches_predict_candidate(trained_model):
+    codigoia._prediction_cache.clear()
+    batch = codigoia.predict_batch(MIXED, batch_size=2)
+
+    expected = []
+    for candidate in MIXED:
+        codigoia._prediction_cache.clear()
+        expected.append(codigoia.predict_candidate(candidate))
+    assert batch == expected
+    assert set(batch) <= {'A', 'B', 'C'}
+
+
+def test_unreadable_experience_fails_only_its_row(trained_model):
+    codigoia._prediction_cache.clear()
+    candidates = MIXED[:3] + [{'Experiencia (años)': 'muchos', 'Nivel Educativo': 'Maestría'}] + MIXED[3:]
+    results = codigoia.predict_batch(candidates)
+
+    assert results[3] == 'Error'
+    assert results[:3] + results[4:] == codigoia.predict_batch(MIXED)
+    with pytest.raises(ValueError):
+        codigoia.predict_candidate(candidates[3])
+
+    assert codigoia.predict_batch([candidates[3]]) == ['Error']
+
+
+def test_predict_batch_runs_the_model_once_per_batch(trained_model, monkeypatch):
+    codigoia._prediction_cache.clear()
+    calls = []
+    predict = codigoia._model.predict
+    monkeypatch.setattr(codigoia._model, 'predict', lambda X, **kwargs: calls.append(len(X)) or predict(X, **kwargs))
+    monkeypatch.setattr(codigoia, 'predict_candidate', pytest.fail)
+    candidates = [{'Experiencia (años)': i, 'Nivel Educativo': 'Maestría'} for i in range(50)]
+
+    assert len(codigoia.predict_batch(candidates)) == 50
+    assert calls == [50]
+    assert codigoia.predict_batch([]) == []
+    assert calls == [50]
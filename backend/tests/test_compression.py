@@ -0,0 +1,76 @@
+import gzip
+
+from flask import Flask, Response, jsonify, request
+
+import compression
+
+
+def _app(compressor):
+    app = Flask(__name__)
+    body = [{'ID': i, 'Nombre': f'Aspirante {i}', 'Nivel': 'B'} for i in range(200)]
+
+    @app.route('/big')
+    def big():
+        return jsonify(body)
+
+    @app.route('/small')
+    def small():
+        return jsonify({'ok': True})
+
+    @app.route('/cached')
+    def cached():
+        response = jsonify(body)
+        response.set_etag('v1')
+        return response.make_conditional(request)
+
+    @app.route('/stream')
+    def stream():
+        return Response(iter(['{"a": 1}\n'] * 500), mimetype='application/x-ndjson')
+
+    app.after_request(compressor)
+    return app.test_client()
+
+
+def test_gzip_is_negotiated():
+    client = _app(compression.Compressor())
+    plain = client.get('/big')
+    assert 'Content-Encoding' not in plain.headers
+    assert plain.headers['Vary'] == 'Accept-Encoding'
+
+    res = client.get('/big', headers={'Accept-Encoding': 'gzip, deflate'})
+    assert res.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(res.get_data()) == plain.get_data()
+    assert len(res.get_data()) * 5 < len(plain.get_data())
+
+    # Refused, too small to be worth it, or streamed: sent as they are
+    assert 'Content-Encoding' not in client.get('/big', headers={'Accept-Encoding': 'gzip;q=0'}).headers
+    assert 'Content-Encoding' not in client.get('/small', headers={'Accept-Encoding': 'gzip'}).headers
+    assert 'Content-Encoding' not in client.get('/stream', headers={'Accept-Encoding': 'gzip'}).headers
+
+
+def test_choose_encoding_prefers_brotli_when_available(monkeypatch):
+    from werkzeug.datastructures import Accept
+    monkeypatch.setattr(compression, 'ENCODERS', {'br': None, 'gzip': None})
+    assert compression.choose_encoding(Accept([('gzip', 1), ('br', 1)])) == 'br'
+    assert compression.choose_encoding(Accept([('gzip', 1), ('br', 0.5)])) == 'gzip'
+    assert compression.choose_encoding(Accept([('*', 1)])) == 'br'
+    assert compression.choose_encoding(Accept([('identity', 1)])) is None
+
+
+def test_etag_responses_are_compressed_once_and_revalidate():
+    compressor = compression.Compressor()
+    client = _app(compressor)
+    calls = []
+    original = compression.ENCODERS['gzip']
+    compression.ENCODERS['gzip'] = lambda body: calls.append(1) or original(body)
+    try:
+        first = client.get('/cached', headers={'Accept-Encoding': 'gzip'})
+        second = client.get('/cached', headers={'Accept-Encoding': 'gzip'})
+    finally:
+        compression.ENCODERS['gzip'] = original
+    assert len(calls) == 1
+    assert first.get_data() == second.get_data()
+    assert first.headers['ETag'] == 'W/"v1"'
+
+    revalidated = client.get('/cached', headers={'Accept-Encoding': 'gzip', 'If-None-Match': first.headers['ETag']})
+    assert revalidated.status_code == 304
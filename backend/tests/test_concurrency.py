@@ -0,0 +1,64 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+import storage
+
+WORKERS = 4
+INSERTS_PER_WORKER = 25
+
+
+def _open(backend, directory):
+    if backend == 'sqlite':
+        return storage.SQLiteStore(os.path.join(directory, 'records.db'))
+    return storage.JsonFileStore(os.path.join(directory, 'records.json'))
+
+
+def _register_many(backend, directory, worker):
+    store = _open(backend, directory)
+    return [store.insert({'Nombre': f'w{worker}-{i}'}) for i in range(INSERTS_PER_WORKER)]
+
+
+def _check(store, ids):
+    total = WORKERS * INSERTS_PER_WORKER
+    assert len(ids) == len(set(ids)) == total
+    records = store.all()
+    assert len(records) == total
+    assert sorted(r['ID'] for r in records) == sorted(ids)
+    assert len({r['Nombre'] for r in records}) == total
+
+
+@pytest.mark.parametrize('backend', ['sqlite', 'json'])
+def test_concurrent_inserts_from_threads(backend, tmp_path):
+    store = _open(backend, tmp_path)
+    results = [[] for _ in range(WORKERS)]
+
+    def worker(n):
+        results[n] = [store.insert({'Nombre': f'w{n}-{i}'}) for i in range(INSERTS_PER_WORKER)]
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(WORKERS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    _check(store, [i for ids in results for i in ids])
+
+
+@pytest.mark.parametrize('backend', ['sqlite', 'json'])
+def test_concurrent_inserts_from_processes(backend, tmp_path):
+    _open(backend, tmp_path)  # create the schema before the workers race
+    with ProcessPoolExecutor(WORKERS) as pool:
+        futures = [pool.submit(_register_many, backend, str(tmp_path), n) for n in range(WORKERS)]
+        ids = [i for f in futures for i in f.result()]
+
+    _check(_open(backend, tmp_path), ids)
+
+
+def test_deleted_ids_are_not_reused(tmp_path):
+    store = _open('json', tmp_path)
+    first, second = store.insert_many([{'Nombre': 'a'}, {'Nombre': 'b'}])
+    store.delete(second)
+    assert store.insert({'Nombre': 'c'}) == second + 1
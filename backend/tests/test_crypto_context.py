@@ -0,0 +1,92 @@
+import base64
+import json
+import time
+
+import pytest
+from Crypto.Cipher import AES, PKCS1_v1_5
+from Crypto.PublicKey import RSA
+from Crypto.Random import get_random_bytes
+
+from crypto_context import DecryptionContext, DecryptionError, SessionExpired, load_or_create_private_key
+
+
+@pytest.fixture(scope='module')
+def key_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('keys') / 'private.pem')
+    load_or_create_private_key(path, bits=1024)
+    return path
+
+
+def _wrap(aes_key, public_pem):
+    rsa = PKCS1_v1_5.new(RSA.import_key(public_pem))
+    return base64.b64encode(rsa.encrypt(base64.b64encode(aes_key))).decode()
+
+
+def _seal(obj, aes_key):
+    iv = get_random_bytes(12)
+    ciphertext, tag = AES.new(aes_key, AES.MODE_GCM, nonce=iv).encrypt_and_digest(json.dumps(obj).encode())
+    return {'iv': base64.b64encode(iv).decode(), 'data': base64.b64encode(ciphertext + tag).decode()}
+
+
+def test_key_is_created_once_and_shared(key_path):
+    first = DecryptionContext.from_file(key_path)
+    second = DecryptionContext.from_file(key_path)
+    assert first.public_key_pem == second.public_key_pem
+
+
+def test_hybrid_envelope(key_path):
+    ctx = DecryptionContext.from_file(key_path)
+    aes_key = get_random_bytes(32)
+    envelope = dict(_seal({'Nombre': 'Ana'}, aes_key), key=_wrap(aes_key, ctx.public_key_pem))
+    assert json.loads(ctx.decrypt_envelope(envelope)) == {'Nombre': 'Ana'}
+
+    envelope['data'] = base64.b64encode(b'\0' * 40).decode()
+    with pytest.raises(DecryptionError):
+        ctx.decrypt_envelope(envelope)
+
+
+def test_session_works_across_processes_and_expires(key_path):
+    ctx = DecryptionContext.from_file(key_path, session_ttl=60)
+    aes_key = get_random_bytes(32)
+    now = time.time()
+    session_id, expires_at = ctx.open_session(_wrap(aes_key, ctx.public_key_pem), now=now)
+    assert expires_at == int(now + 60)
+
+    envelope = dict(_seal({'n': 1}, aes_key), session=session_id)
+    # A second context stands in for another worker: it has no cached entry
+    other = DecryptionContext.from_file(key_path)
+    assert json.loads(other.decrypt_envelope(envelope)) == {'n': 1}
+    assert other.cache_stats()['sessions'] == 1
+
+    assert ctx.session_key(session_id, now=expires_at - 1) == aes_key
+    with pytest.raises(SessionExpired):
+        ctx.session_key(session_id, now=expires_at)
+    with pytest.raises(SessionExpired):
+        other.session_key(session_id, now=expires_at + 1)
+    with pytest.raises(SessionExpired):
+        ctx.session_key('not-a-session')
+
+
+def test_session_cache_is_bounded(key_path):
+    ctx = DecryptionContext.from_file(key_path, cache_size=2)
+    wrapped = _wrap(get_random_bytes(16), ctx.public_key_pem)
+    sessions = [ctx.open_session(wrapped)[0] for _ in range(3)]
+    assert ctx.cache_stats()['sessions'] == 2
+    # The evicted session is still valid; it is unsealed again on use
+    assert len(ctx.session_key(sessions[0])) == 16
+
+
+def test_batch_chunks_share_one_key(key_path):
+    ctx = DecryptionContext.from_file(key_path)
+    aes_key = get_random_bytes(32)
+    chunks = [_seal([{'n': 1}, {'n': 2}], aes_key), _seal([{'n': 3}], aes_key)]
+    envelope = {'key': _wrap(aes_key, ctx.public_key_pem), 'chunks': chunks}
+    assert [json.loads(p) for p in ctx.decrypt_chunks(envelope)] == [[{'n': 1}, {'n': 2}], [{'n': 3}]]
+    # A plain {key, iv, data} envelope is one chunk
+    single = dict(chunks[0], key=envelope['key'])
+    assert [json.loads(p) for p in ctx.decrypt_chunks(single)] == [[{'n': 1}, {'n': 2}]]
+
+    with pytest.raises(DecryptionError):
+        ctx.decrypt_chunks(dict(envelope, chunks=[chunks[0], chunks[0]]))  # repeated IV
+    with pytest.raises(DecryptionError):
+        ctx.decrypt_chunks(dict(envelope, chunks=[]))
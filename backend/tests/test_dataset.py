@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+import dataset
+import hyperparam_search
+
+
+def _write_excel(path):
+    df = pd.DataFrame({
+        "Experiencia (años)": [1, 5, None, 12, "x"],
+        "Nivel Educativo": ["Licenciatura", "Maestría", "Doctorado", None, "Maestría"],
+        "Campo Estudio": ["Informática", "Ingeniería", "Informática", "Administración", "Ingeniería"],
+        "Nivel": ["C", "B", "A", "A", "B"],
+    })
+    # The training spreadsheet has a title row above the header (read with header=1)
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame([["Base de datos"]]).to_excel(writer, index=False, header=False)
+        df.to_excel(writer, index=False, startrow=1)
+
+
+def test_dataset_is_cached_by_file_hash(tmp_path, monkeypatch):
+    excel = str(tmp_path / "base.xlsx")
+    _write_excel(excel)
+    root = str(tmp_path / "datasets")
+
+    X, y, columns = dataset.load_dataset(excel, root=root)
+    assert columns[0] == "Experiencia_años"
+    assert "NivelEd_Desconocido" in columns
+    assert list(y) == ["C", "B", "A"]  # rows without a numeric experience are dropped
+
+    def fail(_):
+        raise AssertionError("the Excel file should not be parsed again")
+
+    monkeypatch.setattr(dataset, "parse_excel", fail)
+    X2, y2, columns2 = dataset.load_dataset(excel, root=root)
+    assert np.array_equal(X, X2) and list(y) == list(y2) and columns == columns2
+
+
+def test_search_trials():
+    grid = hyperparam_search.grid_trials()
+    assert len(grid) == np.prod([len(v) for v in hyperparam_search.SEARCH_SPACE.values()])
+    sample = hyperparam_search.random_trials(5, seed=1)
+    assert len(sample) == 5 and all(t in grid for t in sample)
+    assert sample == hyperparam_search.random_trials(5, seed=1)
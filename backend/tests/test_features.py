@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+from features import FeatureEncoder
+
+NIVELES = ["Licenciatura", "Maestría", "Doctorado"]
+CAMPOS = ["Informática", "Administración", "Ingeniería"]
+
+
+def _fit_scaler():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "Experiencia_años": rng.integers(0, 30, 200).astype(float),
+        "Nivel_Educativo": rng.choice(NIVELES, 200),
+        "Campo_Estudio": rng.choice(CAMPOS, 200),
+    })
+    df_cat = pd.get_dummies(df[["Nivel_Educativo", "Campo_Estudio"]], prefix=["NivelEd", "Campo"])
+    X_df = pd.concat([df[["Experiencia_años"]], df_cat], axis=1)
+    scaler = StandardScaler().fit(X_df.values)
+    return X_df.columns.tolist(), scaler
+
+
+def _pandas_pipeline(candidate, columns, scaler):
+    # Reference: the DataFrame/get_dummies path predict_candidate used before FeatureEncoder
+    df_input = pd.DataFrame({
+        "Experiencia_años": [float(candidate.get("Experiencia (años)", 0))],
+        "Nivel_Educativo": [str(candidate.get("Nivel Educativo", "Desconocido"))],
+        "Campo_Estudio": [str(candidate.get("Campo Estudio", "Desconocido"))],
+    })
+    df_cat = pd.get_dummies(df_input[["Nivel_Educativo", "Campo_Estudio"]], prefix=["NivelEd", "Campo"])
+    X_input_df = pd.concat([df_input[["Experiencia_años"]], df_cat], axis=1)
+    for col in columns:
+        if col not in X_input_df.columns:
+            X_input_df[col] = 0
+    return scaler.transform(X_input_df[columns].values)
+
+
+def test_encoder_matches_pandas_pipeline_bit_for_bit():
+    columns, scaler = _fit_scaler()
+    encoder = FeatureEncoder.from_scaler(columns, scaler)
+
+    candidates = [
+        {"Experiencia (años)": 7, "Nivel Educativo": "Licenciatura", "Campo Estudio": "Informática"},
+        {"Experiencia (años)": "15", "Nivel Educativo": "Maestría", "Campo Estudio": "Administración"},
+        {"Experiencia (años)": 3.5, "Nivel Educativo": "Otro", "Campo Estudio": "Ingeniería"},
+        {"Nivel Educativo": "Doctorado"},
+    ]
+    for candidate in candidates:
+        expected = _pandas_pipeline(candidate, columns, scaler)
+        assert np.array_equal(encoder.transform_one(candidate), expected)
+
+    X, valid = encoder.transform(candidates + [{"Experiencia (años)": "n/a"}])
+    assert valid.tolist() == [True, True, True, True, False]
+    assert np.array_equal(X, np.vstack([_pandas_pipeline(c, columns, scaler) for c in candidates]))
+
+
+if __name__ == "__main__":
+    test_encoder_matches_pandas_pipeline_bit_for_bit()
+    print("FeatureEncoder matches the pandas pipeline.")
@@ -0,0 +1,44 @@
+import threading
+
+import pytest
+
+from inference_broker import InferenceBroker
+
+
+def test_concurrent_calls_share_batches():
+    calls = []
+
+    def predict(candidates):
+        calls.append(len(candidates))
+        return [c * 2 for c in candidates]
+
+    broker = InferenceBroker(predict, max_batch_size=16, max_wait=0.05)
+    results = {}
+    start = threading.Barrier(32)
+
+    def worker(i):
+        start.wait()
+        results[i] = broker.predict(i, timeout=5)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(32)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == {i: i * 2 for i in range(32)}
+    assert sum(calls) == 32 and max(calls) <= 16
+    assert len(calls) < 32
+    assert broker.stats()['items'] == 32
+
+
+def test_errors_reach_every_caller_and_broker_keeps_running():
+    def predict(candidates):
+        if 'bad' in candidates:
+            raise ValueError('boom')
+        return candidates
+
+    broker = InferenceBroker(predict, max_batch_size=4, max_wait=0)
+    with pytest.raises(ValueError):
+        broker.predict('bad', timeout=5)
+    assert broker.predict('ok', timeout=5) == 'ok'
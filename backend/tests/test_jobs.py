@@ -0,0 +1,115 @@
+import json
+import multiprocessing
+import os
+import threading
+import time
+
+import pytest
+
+from jobs import JobManager
+
+
+def _wait(manager, job_id, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        state = manager.get(job_id)
+        if state['status'] not in ('queued', 'running'):
+            return state
+        time.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+def test_job_reports_progress_and_result(tmp_path):
+    manager = JobManager(str(tmp_path))
+
+    def work(job, n):
+        for i in range(n):
+            job.progress(i + 1, n)
+        return {'done': n}
+
+    state = _wait(manager, manager.submit('count', work, 3)['id'])
+    assert state['status'] == 'done'
+    assert (state['processed'], state['total'], state['result']) == (3, 3, {'done': 3})
+
+
+def test_job_can_be_cancelled_from_another_manager(tmp_path):
+    started = threading.Event()
+
+    def work(job):
+        started.set()
+        while True:
+            job.progress()
+            time.sleep(0.01)
+
+    manager = JobManager(str(tmp_path))
+    job_id = manager.submit('loop', work)['id']
+    started.wait(5)
+
+    # Another worker process would use its own manager over the same directory
+    assert JobManager(str(tmp_path)).cancel(job_id)['cancel_requested']
+    assert _wait(manager, job_id)['status'] == 'cancelled'
+    assert manager.active('loop') is None
+    assert manager.get('../etc/passwd') is None
+
+
+@pytest.mark.skipif(os.name == 'nt', reason="other workers' pids are not probed on Windows")
+def test_active_sees_jobs_of_other_live_workers(tmp_path):
+    manager = JobManager(str(tmp_path))
+    state = {'id': 'a' * 32, 'kind': 'predict_all', 'status': 'running', 'pid': os.getppid()}
+    (tmp_path / f"{state['id']}.json").write_text(json.dumps(state))
+    assert manager.active('predict_all')['id'] == state['id']
+    assert manager.active('other') is None
+
+    # A job whose worker died is not active
+    state['pid'] = 2 ** 22 + 1
+    (tmp_path / f"{state['id']}.json").write_text(json.dumps(state))
+    assert manager.active('predict_all') is None
+
+
+def _submit_from_process(jobs_dir, barrier, results):
+    barrier.wait()
+    _, started = JobManager(jobs_dir).submit_exclusive('predict_all', _slow)
+    results.put(started)
+    time.sleep(0.5)  # stay alive while the other workers check, as a server worker would
+
+
+def _slow(job):
+    time.sleep(0.3)
+
+
+def test_only_one_exclusive_job_starts(tmp_path):
+    manager = JobManager(str(tmp_path))
+    barrier = threading.Barrier(8)
+    outcomes = []
+
+    def request():
+        barrier.wait()
+        outcomes.append(manager.submit_exclusive('predict_all', _slow))
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    started = [state for state, ok in outcomes if ok]
+    assert len(started) == 1
+    assert {state['id'] for state, _ in outcomes} == {started[0]['id']}
+
+    # Once it finished, the next request starts a new job
+    _wait(manager, started[0]['id'])
+    state, ok = manager.submit_exclusive('predict_all', _slow)
+    assert ok and state['id'] != started[0]['id']
+
+
+def test_only_one_exclusive_job_starts_across_processes(tmp_path):
+    context = multiprocessing.get_context('fork' if hasattr(os, 'fork') else 'spawn')
+    barrier = context.Barrier(4)
+    results = context.Queue()
+    processes = [context.Process(target=_submit_from_process, args=(str(tmp_path), barrier, results))
+                 for _ in range(4)]
+    for p in processes:
+        p.start()
+    started = [results.get(timeout=10) for _ in processes]
+    for p in processes:
+        p.join()
+    assert started.count(True) == 1
@@ -0,0 +1,52 @@
+import datetime
+import json
+
+import pytest
+from flask import Flask, jsonify
+
+import jsonio
+
+
+RECORDS = [
+    {'ID': 1, 'Nombre': 'Ana María', 'Campo Estudio': 'Ingeniería', 'Edad': 31, 'Rango Ingreso': 12500.5,
+     'Notas': ['sin', 'datos'], 'Prediccion_IA': None, 'Activo': True},
+    {'ID': 2, 'Nombre': 'Luis "Lu"\n', 'Entidad Federativa': 'CDMX'},
+]
+
+
+@pytest.mark.parametrize('encoder', ['orjson', 'json'])
+def test_output_matches_compact_json(monkeypatch, encoder):
+    monkeypatch.setattr(jsonio, '_orjson', jsonio.orjson if encoder == 'orjson' else None)
+    expected = json.dumps(RECORDS, ensure_ascii=False, separators=(',', ':'))
+    assert jsonio.dumps(RECORDS) == expected.encode('utf-8')
+    assert jsonio.dumps_str(RECORDS, sort_keys=True) == json.dumps(
+        RECORDS, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+    assert jsonio.loads(expected) == RECORDS
+    assert jsonio.loads(expected.encode('utf-8')) == RECORDS
+
+
+def test_falls_back_to_json_for_what_orjson_refuses():
+    assert jsonio.dumps({1: 'a'}) == b'{"1":"a"}'
+    assert jsonio.dumps([2 ** 70]) == str([2 ** 70]).encode()
+    assert jsonio.loads('[NaN]')[0] != jsonio.loads('[NaN]')[0]
+
+
+def test_provider_keeps_flask_behaviour():
+    app = Flask(__name__)
+    app.json = jsonio.FastJSONProvider(app)
+    when = datetime.datetime(2024, 5, 1, 12, 30)
+    with app.app_context():
+        body = jsonify({'b': 'Ñandú', 'a': when}).get_data()
+    assert body == json.dumps({'b': 'Ñandú', 'a': 'Wed, 01 May 2024 12:30:00 GMT'},
+                              ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+    assert app.json.dumps({'x': 1}, indent=2) == '{\n  "x": 1\n}'
+
+
+@pytest.mark.parametrize('encoder', ['orjson', 'json'])
+def test_non_finite_floats_become_null(monkeypatch, encoder):
+    monkeypatch.setattr(jsonio, '_orjson', jsonio.orjson if encoder == 'orjson' else None)
+    record = {'ID': 1, 'Edad': float('nan'), 'Rango': [1.5, float('inf'), (float('-inf'),)]}
+    assert jsonio.dumps(record) == b'{"ID":1,"Edad":null,"Rango":[1.5,null,[null]]}'
+    # Also when orjson hands the object over to the json module
+    assert jsonio.dumps({1: float('nan')}) == b'{"1":null}'
+    assert jsonio.dumps_str([float('nan')], default=str) == '[null]'
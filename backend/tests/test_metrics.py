@@ -0,0 +1,103 @@
+import json
+import os
+
+import metrics
+
+
+def _registry(tmp_path=None):
+    return metrics.Registry(directory=str(tmp_path) if tmp_path else None)
+
+
+def test_counter_and_histogram_render():
+    registry = _registry()
+    requests = registry.counter('t_requests_total', 'Requests', ('route',))
+    latency = registry.histogram('t_latency_seconds', 'Latency', ('route',), buckets=(0.1, 1.0))
+    requests.inc(route='/a')
+    requests.inc(2, route='/a')
+    latency.observe(0.05, route='/a')
+    latency.observe(0.5, route='/a')
+    latency.observe(5, route='/a')
+
+    lines = registry.render().splitlines()
+    assert '# TYPE t_requests_total counter' in lines
+    assert 't_requests_total{route="/a"} 3' in lines
+    assert '# TYPE t_latency_seconds histogram' in lines
+    assert 't_latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 't_latency_seconds_bucket{route="/a",le="1"} 2' in lines
+    assert 't_latency_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 't_latency_seconds_count{route="/a"} 3' in lines
+    assert 't_latency_seconds_sum{route="/a"} 5.55' in lines
+
+
+def test_label_values_are_escaped():
+    registry = _registry()
+    registry.counter('t_total', 'T', ('label',)).inc(label='a"b\\c')
+    assert 't_total{label="a\\"b\\\\c"} 1' in registry.render().splitlines()
+
+
+def test_gauges_are_computed_at_scrape_time():
+    registry = _registry()
+    value = {'n': 1}
+    registry.gauge('t_records', 'Records', lambda: value['n'])
+    registry.gauge('t_cache', 'Cache', lambda: {'hits': 2, 'misses': 1}, ('stat',))
+    registry.gauge('t_broken', 'Broken', lambda: 1 / 0)
+    value['n'] = 7
+
+    lines = registry.render().splitlines()
+    assert 't_records 7' in lines
+    assert 't_cache{stat="hits"} 2' in lines
+    assert 't_cache{stat="misses"} 1' in lines
+    assert '# TYPE t_broken gauge' in lines
+
+
+def test_snapshots_of_live_workers_are_merged(tmp_path):
+    registry = _registry(tmp_path)
+    counter = registry.counter('t_total', 'T', ('kind',))
+    histogram = registry.histogram('t_seconds', 'T', buckets=(1.0,))
+    counter.inc(kind='x')
+    histogram.observe(0.5)
+
+    # Another live worker (the parent process) and a worker that has exited
+    other = _registry(tmp_path)
+    other.counter('t_total', 'T', ('kind',)).inc(4, kind='x')
+    other.histogram('t_seconds', 'T', buckets=(1.0,)).observe(2.0)
+    snapshot = other.snapshot()
+    for pid in (os.getppid(), 2 ** 22 + 1):
+        with open(tmp_path / f'{pid}.json', 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f)
+
+    lines = registry.render().splitlines()
+    assert 't_total{kind="x"} 5' in lines
+    assert 't_seconds_bucket{le="1"} 1' in lines
+    assert 't_seconds_bucket{le="+Inf"} 2' in lines
+    assert not (tmp_path / f'{2 ** 22 + 1}.json').exists()
+    assert (tmp_path / f'{os.getpid()}.json').exists()
+
+
+def test_timed_records_stage_even_on_error():
+    @metrics.timed('t_stage')
+    def fail():
+        raise ValueError('boom')
+
+    before = metrics.STAGE_LATENCY.snapshot().get('["t_stage"]', [0])[:-1]
+    try:
+        fail()
+    except ValueError:
+        pass
+    after = metrics.STAGE_LATENCY.snapshot()['["t_stage"]'][:-1]
+    assert sum(after) == sum(before) + 1
+
+
+def test_metrics_endpoint(server):
+    app_module, client = server
+    client.get('/api/records')
+    client.post('/register', json={'session': 'missing', 'iv': 'x', 'data': 'y'})
+    res = client.get('/metrics')
+
+    assert res.status_code == 200
+    assert res.mimetype == 'text/plain'
+    body = res.get_data(as_text=True)
+    assert 'edu_http_requests_total{method="GET",route="/api/records",status="200"}' in body
+    assert 'edu_errors_total{kind="session_expired"}' in body
+    assert 'edu_stage_duration_seconds_bucket{stage="store_read"' in body
+    assert 'edu_records 0' in body
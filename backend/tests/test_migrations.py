@@ -0,0 +1,129 @@
+import io
+import json
+
+import pytest
+
+import runner
+from runner import JsonFileTarget, Migration, MigrationError, SQLiteTarget, iter_json_array
+from storage import JsonFileStore, SQLiteStore
+
+
+def _records(count):
+    return [{'Nombre': f' ana {i} ', 'Jornada': 'Tiempo Completo' if i % 2 else 'Por Horas',
+             'Entidad Federativa': 'CDMX', 'Edad': i} for i in range(count)]
+
+
+@pytest.fixture(params=['sqlite', 'json'])
+def target(request, tmp_path):
+    if request.param == 'sqlite':
+        path = str(tmp_path / 'records.db')
+        store = SQLiteStore(path)
+        make_target = lambda: SQLiteTarget(path)
+    else:
+        path = str(tmp_path / 'records.json')
+        store = JsonFileStore(path)
+        make_target = lambda: JsonFileTarget(path)
+    store.insert_many(_records(25))
+    yield store, make_target
+    if isinstance(store, SQLiteStore):
+        store.close()
+
+
+def test_migration_one_normalizes_and_records_version(target):
+    store, make_target = target
+    migrations = runner.discover()
+    assert [m.version for m in migrations][:1] == [1]
+
+    t = make_target()
+    applied = runner.migrate(t, migrations, chunk_size=7, log=lambda msg: None)
+    assert applied[0]['scanned'] == 25 and applied[0]['changed'] == 25
+    assert t.current_version() == len(migrations)
+    t.close()
+
+    records = store.all()
+    assert [r['ID'] for r in records] == list(range(1, 26))
+    assert records[1] == {'ID': 2, 'Nombre': 'Ana 1', 'Jornada': 'Asignatura', 'Entidad Federativa': 'CDMX', 'Edad': 1}
+    assert records[0]['Jornada'] == 'Por Horas'
+
+    # Already at the latest version: nothing runs again
+    t = make_target()
+    assert runner.migrate(t, migrations, log=lambda msg: None) == []
+    t.close()
+
+
+def test_interrupted_run_resumes_from_checkpoint(target):
+    store, make_target = target
+    seen = []
+    crash = [True]
+
+    def flaky(record):
+        seen.append(record['Edad'])
+        if crash[0] and len(seen) == 12:
+            raise RuntimeError('crash')
+        record['Nombre'] = record['Nombre'].strip().upper()
+        return record
+
+    migration = Migration(1, 'upper', flaky)
+    t = make_target()
+    with pytest.raises(RuntimeError):
+        runner.migrate(t, [migration], chunk_size=5, log=lambda msg: None)
+    assert t.current_version() == 0
+    t.close()
+
+    seen.clear()
+    crash[0] = False
+    t = make_target()
+    applied = runner.migrate(t, [migration], chunk_size=5, log=lambda msg: None)
+    t.close()
+    # The first two chunks (10 records) were checkpointed and are not read again
+    assert seen == list(range(10, 25))
+    assert applied[0]['scanned'] == 25
+    assert [r['Nombre'] for r in store.all()] == [f'ANA {i}' for i in range(25)]
+
+
+def test_sqlite_catches_up_with_concurrent_writes(tmp_path):
+    path = str(tmp_path / 'records.db')
+    store = SQLiteStore(path)
+    store.insert_many(_records(20))
+    t = SQLiteTarget(path)
+    writes = []
+
+    def server_writes(msg):
+        # The server keeps writing between migration chunks: an update behind the cursor and a new record
+        if not writes:
+            writes.append(store.update(2, {'Nombre': ' pepe '}))
+            writes.append(store.insert({'Nombre': ' luis ', 'Jornada': 'Medio Tiempo', 'Edad': 99}))
+
+    runner.migrate(t, runner.discover()[:1], chunk_size=4, log=server_writes)
+    t.close()
+
+    assert store.get(2)['Nombre'] == 'Pepe'
+    assert store.get(21)['Jornada'] == 'Asignatura'
+    store.close()
+
+
+def test_json_output_matches_store_format(tmp_path):
+    path = tmp_path / 'records.json'
+    JsonFileStore(str(path)).insert_many(_records(3))
+    t = JsonFileTarget(str(path))
+    runner.migrate(t, runner.discover()[:1], log=lambda msg: None)
+
+    data = json.loads(path.read_text(encoding='utf-8'))
+    assert path.read_text(encoding='utf-8') == json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    assert not (tmp_path / 'records.json.migrating').exists()
+
+
+def test_iter_json_array_streams_small_reads():
+    items = [{'a': i, 's': 'x' * i} for i in range(50)] + [1234, 'tail']
+    text = json.dumps(items, indent=2)
+    assert list(iter_json_array(io.StringIO(text), read_size=7)) == items
+    assert list(iter_json_array(io.StringIO('[]'))) == []
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO('[{"a": 1},')))
+
+
+def test_versions_must_be_consecutive(tmp_path):
+    (tmp_path / '0001_a.py').write_text('def transform(r):\n    return r\n')
+    (tmp_path / '0003_c.py').write_text('def transform(r):\n    return r\n')
+    with pytest.raises(MigrationError):
+        runner.discover(str(tmp_path))
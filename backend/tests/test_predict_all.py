@@ -0,0 +1,73 @@
+import time
+
+import pytest
+
+import codigoia
+
+
+def _run(client, query=''):
+    res = client.post(f'/api/predict_all{query}')
+    assert res.status_code == 202
+    job_id = res.get_json()['job']['id']
+    for _ in range(200):
+        job = client.get(f'/api/jobs/{job_id}').get_json()
+        if job['status'] not in ('queued', 'running'):
+            assert job['status'] == 'done', job
+            return job['result']
+        time.sleep(0.05)
+    raise AssertionError('predict_all did not finish')
+
+
+def test_only_stale_records_are_rescored(trained_model, server):
+    app_module, client = server
+    store = app_module.store
+    ids = store.insert_many(
+        [{'Nombre': f'N{i}', 'Experiencia (años)': i, 'Nivel Educativo': 'Maestría', 'Campo Estudio': 'Informática'}
+         for i in range(10)]
+        + [{'Nombre': 'Sin experiencia', 'Experiencia (años)': 'n/a', 'Campo Estudio': 'Informática'}]
+    )
+
+    first = _run(client)
+    assert (first['updated'], first['up_to_date']) == (11, 0)
+    assert store.get(ids[-1])['Prediccion_IA'] == 'Error'
+
+    # Nothing changed: nothing is rescored, not even the record that cannot be encoded
+    again = _run(client)
+    assert (again['updated'], again['up_to_date']) == (0, 11)
+
+    store.update(ids[3], {'Campo Estudio': 'Ingeniería'})
+    edited = _run(client, '?delta=1')
+    assert (edited['updated'], edited['up_to_date']) == (1, 10)
+    assert edited['predictions'] == [{'ID': ids[3], 'Prediccion_IA': store.get(ids[3])['Prediccion_IA']}]
+
+    forced = _run(client, '?force=1&delta=1')
+    assert forced['updated'] == 11
+    assert sorted(p['ID'] for p in forced['predictions']) == ids
+    assert {p['ID']: p['Prediccion_IA'] for p in forced['predictions']} == \
+        {r['ID']: r['Prediccion_IA'] for r in store.all()}
+    assert 'predictions' not in first
+
+
+def test_retraining_rescores_every_record(trained_model, server):
+    app_module, client = server
+    app_module.store.insert_many([{'Nombre': f'N{i}', 'Experiencia (años)': i} for i in range(5)])
+    assert _run(client)['updated'] == 5
+    assert _run(client)['updated'] == 0
+
+    # Same spreadsheet, other hyperparameters: a different model, so every prediction is stale
+    codigoia.train_model(trained_model, params={'C': 1e-4})
+    assert _run(client)['updated'] == 5
+
+
+def test_records_are_scored_in_one_batch(trained_model, server, monkeypatch):
+    app_module, client = server
+    app_module.store.insert_many([{'Nombre': f'N{i}', 'Experiencia (años)': i % 20} for i in range(200)])
+    batches = []
+    predict_batch = codigoia.predict_batch
+    monkeypatch.setattr(codigoia, 'predict_batch', lambda candidates: batches.append(len(candidates)) or
+                        predict_batch(candidates))
+    monkeypatch.setattr(codigoia, 'predict_candidate', pytest.fail)
+
+    assert _run(client)['updated'] == 200
+    # One call for the 20 distinct profiles, not one per record
+    assert batches == [20]
@@ -0,0 +1,95 @@
+import pytest
+
+import artifacts
+import codigoia
+from features import feature_key
+from prediction_cache import PredictionCache
+
+
+def test_lru_eviction_and_counters():
+    cache = PredictionCache(max_size=2)
+    cache.put('a', 'A')
+    cache.put('b', 'B')
+    assert cache.get('a') == 'A'  # 'a' is now the most recent
+    cache.put('c', 'C')           # evicts 'b'
+    assert cache.get('b') is None
+    assert cache.get('c') == 'C'
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['size']) == (2, 1, 2)
+
+    cache.clear()
+    assert cache.get('a') is None
+
+
+def test_feature_key_normalizes_experience():
+    assert feature_key({'Experiencia (años)': '5', 'Nivel Educativo': 'Maestría'}) == \
+        feature_key({'Experiencia (años)': 5.0, 'Nivel Educativo': 'Maestría', 'Nombre': 'Ana'})
+
+
+@pytest.fixture
+def cache(trained_model, monkeypatch):
+    cache = PredictionCache()
+    monkeypatch.setattr(codigoia, '_prediction_cache', cache)
+    return cache
+
+
+CANDIDATE = {'Experiencia (años)': 7, 'Nivel Educativo': 'Maestría', 'Campo Estudio': 'Ingeniería'}
+
+
+def test_cache_key_follows_model_version(trained_model, cache, monkeypatch):
+    label = codigoia.predict_candidate(CANDIDATE)
+    assert cache.get((codigoia.model_version(), *feature_key(CANDIDATE))) == label
+
+    # Entries of another model version are never served
+    monkeypatch.setattr(codigoia, '_model_version', 'otra-version')
+    cache.put(('otra-version', *feature_key(CANDIDATE)), 'Z')
+    assert codigoia.predict_candidate(CANDIDATE) == 'Z'
+    key = artifacts.artifact_key(trained_model, 'logreg')
+    assert codigoia.load_artifacts(key)
+    assert cache.stats()['size'] == 0
+    assert codigoia.predict_candidate(CANDIDATE) == label
+
+    # A retrain on the same spreadsheet is a new version too, e.g. when another worker loads it
+    version = codigoia.model_version()
+    codigoia.train_model(trained_model, save=False, backend='logreg', params={'C': 1e-4})
+    assert codigoia.model_version() != version
+    assert cache.stats()['size'] == 0
+    codigoia.predict_candidate(CANDIDATE)
+    assert cache.get((version, *feature_key(CANDIDATE))) is None
+
+
+def test_predict_batch_dedupes_and_counts_hits(cache, monkeypatch):
+    rows = []
+    predict = codigoia._model.predict
+    monkeypatch.setattr(codigoia._model, 'predict', lambda X, **kwargs: rows.append(len(X)) or predict(X, **kwargs))
+    other = {'Experiencia (años)': '15', 'Nivel Educativo': 'Doctorado', 'Nombre': 'Ana'}
+    batch = [CANDIDATE, dict(CANDIDATE, Nombre='Luis'), other, CANDIDATE, dict(other, Nombre='Eva')]
+
+    results = codigoia.predict_batch(batch)
+    assert rows == [2]  # two distinct profiles reach the model
+    assert results[0] == results[1] == results[3] and results[2] == results[4]
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['size']) == (3, 2, 2)
+
+    # A second pass is answered entirely from the cache
+    assert codigoia.predict_batch(batch) == results
+    assert rows == [2]
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses']) == (8, 2)
+
+
+def test_broker_lookups_are_counted_once(cache, monkeypatch):
+    monkeypatch.setattr(codigoia, 'INFERENCE_BROKER', '1')
+    batch = [CANDIDATE, dict(CANDIDATE, Nombre='Luis'), CANDIDATE]
+
+    # The broker's batches skip the cache lookup, so duplicates add no hits there
+    codigoia.predict_batch(batch, lookup_cache=False)
+    assert (cache.stats()['hits'], cache.stats()['misses']) == (0, 0)
+
+    cache.clear()
+    for candidate in batch:
+        codigoia.predict_candidate_batched(candidate, timeout=5)
+    stats = cache.stats()
+    assert stats['hits'] + stats['misses'] == len(batch)
+    assert (stats['hits'], stats['misses']) == (2, 1)
@@ -0,0 +1,105 @@
+import os
+import threading
+import time
+
+from flask import Flask
+
+import profiling
+from profiling import PROFILE_HEADER, Profiler
+
+
+def _work():
+    data = [str(i) * 10 for i in range(20000)]
+    time.sleep(0.02)
+    return data
+
+
+def _dumps(path):
+    return sorted(name for name in os.listdir(path)) if os.path.isdir(path) else []
+
+
+def test_slow_call_is_dumped_with_summary(tmp_path):
+    profiler = Profiler(str(tmp_path), threshold_ms=10, enabled=True, sample_rate=1.0)
+    result = profiler.wrap('job slow', _work)()
+    assert len(result) == 20000
+
+    files = _dumps(tmp_path)
+    assert [f.rsplit('.', 1)[1] for f in files] == ['prof', 'txt']
+    with open(tmp_path / files[1], encoding='utf-8') as f:
+        summary = f.read()
+    assert summary.startswith('job slow:')
+    assert '_work' in summary
+    assert 'allocation sites' in summary
+
+
+def test_fast_and_unsampled_calls_are_not_dumped(tmp_path):
+    fast = Profiler(str(tmp_path), threshold_ms=10_000, enabled=True, sample_rate=1.0)
+    fast.wrap('fast', _work)()
+    disabled = Profiler(str(tmp_path), threshold_ms=0, enabled=False, sample_rate=1.0)
+    disabled.wrap('off', _work)()
+    assert _dumps(tmp_path) == []
+
+
+def test_forced_profile_ignores_sampling_and_threshold(tmp_path):
+    profiler = Profiler(str(tmp_path), threshold_ms=10_000, enabled=False)
+    profiler.wrap('forced', _work, forced=True)()
+    assert len(_dumps(tmp_path)) == 2
+
+
+def test_dumps_are_rotated(tmp_path):
+    profiler = Profiler(str(tmp_path), threshold_ms=0, enabled=True, sample_rate=1.0, max_profiles=2)
+    for i in range(4):
+        profiler.wrap(f'call {i}', _work)()
+    files = _dumps(tmp_path)
+    assert len(files) == 4
+    assert all('call_2' in f or 'call_3' in f for f in files)
+
+
+def test_only_one_profile_at_a_time(tmp_path):
+    profiler = Profiler(str(tmp_path), threshold_ms=0, enabled=True, sample_rate=1.0)
+    first = profiler.start('first')
+    assert first is not None
+    assert profiler.start('second') is None
+    profiler.finish(first)
+    third = profiler.start('third')
+    assert third is not None
+    profiler.finish(third)
+
+
+def test_header_requires_configured_token(tmp_path, monkeypatch):
+    profiler = Profiler(str(tmp_path), threshold_ms=10_000, enabled=False, token='secret')
+    app = Flask(__name__)
+    profiling.instrument_app(app, profiler)
+
+    @app.route('/slow')
+    def slow():
+        _work()
+        return 'ok'
+
+    client = app.test_client()
+    client.get('/slow', headers={PROFILE_HEADER: 'wrong'})
+    assert _dumps(tmp_path) == []
+    client.get('/slow', headers={PROFILE_HEADER: 'secret'})
+    files = _dumps(tmp_path)
+    assert len(files) == 2 and 'GET_slow' in files[0]
+
+    assert not Profiler(str(tmp_path), token=None).requested({PROFILE_HEADER: ''})
+
+
+def test_concurrent_requests_do_not_fail(tmp_path):
+    profiler = Profiler(str(tmp_path), threshold_ms=0, enabled=True, sample_rate=1.0)
+    errors = []
+
+    def run():
+        try:
+            profiler.wrap('thread', _work)()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert len(_dumps(tmp_path)) >= 2
@@ -0,0 +1,38 @@
+import json
+import os
+
+import storage
+from record_cache import RecordCache
+
+
+def test_cache_hits_until_store_changes(tmp_path):
+    store = storage.SQLiteStore(os.path.join(tmp_path, 'records.db'))
+    store.insert({'Nombre': 'Ana'})
+    cache = RecordCache(store, json.dumps, check_interval=0)
+
+    body, etag = cache.response()
+    assert json.loads(body) == [{'ID': 1, 'Nombre': 'Ana'}]
+    assert cache.response() == (body, etag)
+    assert cache.table() is cache.table()
+
+    # Our own write invalidates immediately
+    store.insert({'Nombre': 'Luis'})
+    body2, etag2 = cache.response()
+    assert etag2 != etag
+    assert len(json.loads(body2)) == 2
+
+
+def test_cache_sees_external_edits(tmp_path):
+    path = os.path.join(tmp_path, 'records.json')
+    store = storage.JsonFileStore(path)
+    store.insert({'Nombre': 'Ana'})
+    cache = RecordCache(store, json.dumps, check_interval=0)
+    _, etag = cache.response()
+
+    # An external tool (e.g. a migration) rewrites the file directly
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump([{'ID': 1, 'Nombre': 'ANA'}, {'ID': 2, 'Nombre': 'Luis'}], f)
+
+    body, new_etag = cache.response()
+    assert new_etag != etag
+    assert [r['Nombre'] for r in json.loads(body)] == ['ANA', 'Luis']
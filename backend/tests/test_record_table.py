@@ -0,0 +1,95 @@
+import itertools
+import json
+
+import pytest
+
+import storage
+from record_table import RecordTable
+from synthetic import generate_applicants
+
+
+class ListStore(storage.RecordStore):
+    """The default (scanning) RecordStore.query over a list, as the JSON store answers it."""
+
+    def __init__(self, records):
+        super().__init__()
+        self.records = records
+
+    def all(self):
+        return self.records
+
+
+@pytest.fixture(scope='module')
+def records():
+    rows = [{'ID': i + 1, **r} for i, r in enumerate(generate_applicants(3000, seed=3))]
+    for r in rows[::5]:
+        r['Prediccion_IA'] = 'B'
+    rows[7]['Edad'] = '31'
+    rows[8]['Edad'] = 31.0
+    rows[9]['Edad'] = True
+    rows[10]['Notas'] = ['sin', 'datos']
+    del rows[11]['Campo Estudio']
+    return rows
+
+
+def test_round_trip_keeps_values_types_and_key_order(records):
+    table = RecordTable(records)
+    decoded = table.to_records()
+    assert decoded == records
+    assert [list(r) for r in decoded] == [list(r) for r in records]
+    assert json.dumps(decoded, ensure_ascii=False) == json.dumps(records, ensure_ascii=False)
+    assert [type(decoded[i]['Edad']) for i in (7, 8, 9)] == [str, float, bool]
+    assert table.row(10) == records[10] and table.row(11) == records[11]
+    assert RecordTable([]).to_records() == []
+
+
+def test_more_key_orders_than_fit_in_16_bits():
+    fields = [f'c{i}' for i in range(9)]
+    orders = itertools.islice(itertools.permutations(fields), (1 << 16) + 10)
+    rows = [{'ID': i + 1, **dict.fromkeys(order, 1)} for i, order in enumerate(orders)]
+    table = RecordTable(rows)
+    assert table.row(len(rows) - 1) == rows[-1]
+    assert list(table.row(len(rows) - 1)) == list(rows[-1])
+
+
+def test_categorical_columns_use_small_codes(records):
+    table = RecordTable(records)
+    assert table.codes('Nivel').itemsize == 1
+    assert table.value('Nivel', table.code('Nivel', 'A')) == 'A'
+    assert table.code('Nivel', 'Z') is None
+    # A few bytes per row for the whole record
+    assert table.nbytes() < len(records) * 64
+
+
+@pytest.mark.parametrize('filters,sort,descending', [
+    ({}, 'ID', False),
+    ({}, 'ID', True),
+    ({'Nivel': 'A'}, 'Campo Estudio', False),
+    ({'Nivel Educativo': 'Maestría', 'Nivel': 'B'}, 'Prediccion_IA', True),
+    ({'Prediccion_IA': ''}, 'Entidad Federativa', False),
+    ({'Campo Estudio': ''}, 'ID', False),
+])
+def test_query_matches_store_scan(records, filters, sort, descending):
+    store, table = ListStore(records), RecordTable(records)
+    expected_cursor = cursor = None
+    for _ in range(4):
+        expected, expected_cursor = store.query(filters, sort, descending, 40, expected_cursor)
+        page, cursor = table.query(filters, sort, descending, 40, cursor)
+        assert page == expected
+        assert cursor == expected_cursor
+        if cursor is None:
+            break
+
+
+def test_query_rejects_unindexed_fields(records):
+    with pytest.raises(storage.QueryError):
+        RecordTable(records).query({'Nombre': 'Ana'})
+
+
+def test_group_by_feature_profiles(records):
+    table = RecordTable(records)
+    fields = ('Experiencia (años)', 'Nivel Educativo', 'Campo Estudio')
+    groups, inverse = table.group_by(fields)
+    assert len(groups) < len(records)
+    for i in (0, 11, 2999):
+        assert groups[inverse[i]] == {f: records[i][f] for f in fields if f in records[i]}
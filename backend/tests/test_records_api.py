@@ -0,0 +1,19 @@
+def test_list_and_pages(server):
+    app_module, client = server
+    app_module.store.insert_many([{'Nombre': f'N{i}', 'Nivel': 'AB'[i % 2]} for i in range(5)])
+
+    full = client.get('/api/records')
+    assert [r['ID'] for r in full.get_json()] == [1, 2, 3, 4, 5]
+    # Parameters the endpoint does not know about keep the legacy list
+    assert client.get('/api/records?_=1700000000').get_json() == full.get_json()
+
+    page = client.get('/api/records?limit=2&sort=-ID&fields=Nombre').get_json()
+    assert page['records'] == [{'ID': 5, 'Nombre': 'N4'}, {'ID': 4, 'Nombre': 'N3'}]
+    assert page['next_cursor']
+
+    filtered = client.get('/api/records?Nivel=B&_=1700000000').get_json()
+    assert [r['ID'] for r in filtered['records']] == [2, 4]
+    assert filtered['next_cursor'] is None
+
+    assert client.get('/api/records?limit=0').status_code == 400
+    assert client.get('/api/records?sort=Nombre').status_code == 400
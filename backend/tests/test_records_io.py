@@ -0,0 +1,131 @@
+import csv
+import io
+import json
+
+
+RECORDS = [
+    {'Nombre': 'Ana', 'Apellidos': 'Pérez', 'Edad': 31, 'Nivel Educativo': 'Licenciatura', 'Rango Ingreso': 12500.5},
+    {'Nombre': 'Luis "Lu"', 'Edad': 24, 'Campo Estudio': 'Ingeniería, Química', 'Experiencia (años)': 3},
+    {'Nombre': 'Eva', 'Jornada': 'Completa\nmixta', 'Nivel': 'B'},
+]
+
+
+def _ndjson(rows):
+    return '\n'.join(row if isinstance(row, str) else json.dumps(row, ensure_ascii=False) for row in rows) + '\n'
+
+
+def _import(client, rows, query=''):
+    res = client.post('/api/records/import' + query, data=_ndjson(rows), content_type='application/x-ndjson')
+    assert res.status_code == 200
+    return res.get_json()
+
+
+def test_ndjson_export_round_trips_through_import(server, monkeypatch):
+    app_module, client = server
+    monkeypatch.setattr(app_module, 'EXPORT_BATCH_SIZE', 2)
+    app_module.store.insert_many([dict(r) for r in RECORDS])
+    stored = app_module.store.all()
+
+    res = client.get('/api/records/export?format=ndjson')
+    assert res.mimetype == 'application/x-ndjson'
+    exported = [json.loads(line) for line in res.get_data(as_text=True).splitlines()]
+    assert exported == stored
+
+    # Exported files carry server fields; a kept-ID import restores the same records
+    for record_id in range(1, 4):
+        app_module.store.delete(record_id)
+    body = _import(client, exported, '?keep_ids=1')
+    assert (body['imported'], body['failed']) == (3, 0)
+    restored = app_module.store.all()
+    assert [r['ID'] for r in restored] == [1, 2, 3]
+    for original, record in zip(RECORDS, restored):
+        assert {k: record[k] for k in original} == original
+
+
+def test_csv_export_writes_selected_columns(server, monkeypatch):
+    app_module, client = server
+    monkeypatch.setattr(app_module, 'EXPORT_BATCH_SIZE', 2)
+    app_module.store.insert_many([dict(r) for r in RECORDS])
+
+    res = client.get('/api/records/export?format=csv')
+    assert res.mimetype == 'text/csv'
+    rows = list(csv.DictReader(io.StringIO(res.get_data(as_text=True))))
+    assert list(rows[0]) == ['ID'] + app_module.RECORD_FIELDS + ['Prediccion_IA']
+    assert len(rows) == 3
+    for original, row in zip(RECORDS, rows):
+        assert {k: row[k] for k in original} == {k: str(v) for k, v in original.items()}
+        assert row['Procedencia'] == ''  # missing fields are left blank
+
+    res = client.get('/api/records/export?format=csv&fields=Nombre,ID,Edad')
+    rows = list(csv.reader(io.StringIO(res.get_data(as_text=True))))
+    assert rows == [['ID', 'Nombre', 'Edad'], ['1', 'Ana', '31'], ['2', 'Luis "Lu"', '24'], ['3', 'Eva', '']]
+
+    assert client.get('/api/records/export?format=xml').status_code == 400
+
+
+def test_import_reports_bad_lines(server, monkeypatch):
+    app_module, client = server
+    monkeypatch.setattr(app_module, 'IMPORT_BATCH_SIZE', 2)
+    body = _import(client, [
+        RECORDS[0],
+        '{"Nombre": "Luis"',
+        {'Nombre': 'Eva', 'Edad': 'treinta'},
+        '',
+        {'Nombre': 'Leo', 'Color': 'azul'},
+        '["no", "es", "un", "registro"]',
+        RECORDS[1],
+        RECORDS[2],
+    ])
+
+    assert (body['imported'], body['failed']) == (3, 4)
+    assert [e['line'] for e in body['errors']] == [2, 3, 5, 6]
+    assert 'Edad' in body['errors'][1]['msg']
+    assert 'Color' in body['errors'][2]['msg']
+    assert [r['Nombre'] for r in app_module.store.all()] == ['Ana', 'Luis "Lu"', 'Eva']
+
+    # The report is capped; the count still covers every bad line
+    monkeypatch.setattr(app_module, 'MAX_IMPORT_ERRORS', 2)
+    body = _import(client, ['nope'] * 5)
+    assert (body['imported'], body['failed'], len(body['errors'])) == (0, 5, 2)
+
+
+def test_failed_batch_is_not_reported_as_imported(server, monkeypatch):
+    app_module, client = server
+    monkeypatch.setattr(app_module, 'IMPORT_BATCH_SIZE', 2)
+    insert_many = app_module.store.insert_many
+    calls = []
+
+    def fail_second_batch(records):
+        calls.append(len(records))
+        if len(calls) == 2:
+            raise OSError('disk full')
+        return insert_many(records)
+
+    monkeypatch.setattr(app_module.store, 'insert_many', fail_second_batch)
+    res = client.post('/api/records/import', data=_ndjson(RECORDS), content_type='application/x-ndjson')
+    assert res.status_code == 500
+    assert res.get_json()['imported'] == 2
+    assert app_module.store.count() == 2
+
+
+def test_keep_ids(server):
+    app_module, client = server
+    app_module.store.insert_many([dict(r) for r in RECORDS])
+
+    # Without keep_ids the IDs in the file are ignored
+    _import(client, [dict(RECORDS[0], ID=1, Nombre='Nueva')])
+    assert app_module.store.get(1)['Nombre'] == 'Ana'
+    assert app_module.store.get(4)['Nombre'] == 'Nueva'
+
+    # With keep_ids existing IDs are overwritten, new ones kept, and rows without an ID get a fresh one
+    body = _import(client, [
+        dict(RECORDS[0], ID=2, Nombre='Reemplazo'),
+        dict(RECORDS[1], ID=50),
+        dict(RECORDS[2], ID='7'),
+    ], '?keep_ids=1')
+    assert body['imported'] == 3
+    assert app_module.store.get(2)['Nombre'] == 'Reemplazo'
+    assert app_module.store.get(50)['Nombre'] == 'Luis "Lu"'
+    assert app_module.store.get(7) is None
+    assert app_module.store.get(51)['Nombre'] == 'Eva'
+    assert app_module.store.insert({'Nombre': 'Otra'}) == 52
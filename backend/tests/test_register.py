@@ -0,0 +1,44 @@
+import base64
+
+import pytest
+
+from conftest import envelope
+
+
+def test_register_ignores_server_fields(server):
+    app_module, client = server
+    payload = {'Nombre': 'Ana', 'Edad': 30, 'ID': 99, 'Prediccion_IA': 'A', 'Prediccion_IA_Firma': 'forged'}
+    res = client.post('/register', json=envelope(payload, app_module.public_key))
+
+    assert res.status_code == 200
+    saved = app_module.store.get(res.get_json()['id'])
+    assert saved['ID'] == 1 and saved['Nombre'] == 'Ana'
+    assert saved['Prediccion_IA'] != 'A'
+    assert saved.get('Prediccion_IA_Firma') != 'forged'
+
+
+@pytest.mark.parametrize('payload', [
+    ['no', 'es', 'un', 'registro'],
+    {'Nombre': 'Luis', 'Edad': 'treinta'},
+    {'Nombre': {'anidado': True}},
+    {},
+])
+def test_register_rejects_invalid_records(server, payload):
+    app_module, client = server
+    res = client.post('/register', json=envelope(payload, app_module.public_key))
+    assert res.status_code == 400
+    assert res.get_json()['msg']
+    assert app_module.store.count() == 0
+
+
+def test_short_rsa_key_is_a_decryption_error(server):
+    app_module, client = server
+    short_key = base64.b64encode(b'\0' * 10).decode()
+    sealed = dict(envelope({'Nombre': 'Ana'}, app_module.public_key), key=short_key)
+
+    assert client.post('/session', json={'key': short_key}).status_code == 400
+    assert client.post('/session', json=['no', 'es', 'un', 'objeto']).status_code == 400
+    assert client.post('/register', json=sealed).status_code == 400
+    batch = {'key': short_key, 'chunks': [{'iv': sealed['iv'], 'data': sealed['data']}]}
+    assert client.post('/register/batch', json=batch).status_code == 400
+    assert app_module.store.count() == 0
@@ -0,0 +1,45 @@
+import base64
+
+from conftest import envelope
+
+
+def test_batch_registers_valid_records_in_order(server, monkeypatch):
+    app_module, client = server
+    monkeypatch.setattr(app_module, 'IMPORT_BATCH_SIZE', 2)
+    unwraps = []
+    original = app_module.crypto.unwrap_key
+    monkeypatch.setattr(app_module.crypto, 'unwrap_key', lambda key: unwraps.append(key) or original(key))
+
+    chunks = [
+        [{'Nombre': 'Ana', 'Edad': 30}, {'Nombre': 'Luis', 'Edad': 'treinta'}],
+        [{'Nombre': 'Eva', 'ID': 99, 'Prediccion_IA': 'A'}, 'no es un registro', {'Nombre': 'Leo'}],
+    ]
+    res = client.post('/register/batch', json=envelope(chunks, app_module.public_key, chunks=True))
+    body = res.get_json()
+
+    assert res.status_code == 200
+    assert len(unwraps) == 1
+    assert (body['registered'], body['failed']) == (3, 2)
+    assert [r['index'] for r in body['results']] == [0, 1, 2, 3, 4]
+    assert [r.get('id') for r in body['results']] == [1, None, 2, None, 3]
+    assert 'Edad' in body['results'][1]['msg']
+
+    saved = app_module.store.get(2)
+    assert saved['Nombre'] == 'Eva' and saved['ID'] == 2
+    assert saved['Prediccion_IA'] != 'A'  # server-computed fields are not taken from the client
+    assert app_module.store.count() == 3
+
+
+def test_batch_rejects_bad_envelopes_before_saving(server, monkeypatch):
+    app_module, client = server
+    tampered = envelope([[{'Nombre': 'Ana'}], [{'Nombre': 'Luis'}]], app_module.public_key, chunks=True)
+    tampered['chunks'][1]['data'] = base64.b64encode(b'\0' * 40).decode()
+    assert client.post('/register/batch', json=tampered).status_code == 400
+    not_a_list = envelope([{'Nombre': 'Ana'}], app_module.public_key, chunks=True)
+    assert client.post('/register/batch', json=not_a_list).status_code == 400
+    assert client.post('/register/batch', json={'session': 'missing', 'chunks': []}).status_code == 401
+
+    monkeypatch.setattr(app_module, 'MAX_BATCH_RECORDS', 2)
+    too_many = envelope([[{'Nombre': str(i)} for i in range(3)]], app_module.public_key, chunks=True)
+    assert client.post('/register/batch', json=too_many).status_code == 413
+    assert app_module.store.count() == 0
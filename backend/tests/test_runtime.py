@@ -0,0 +1,39 @@
+import os
+
+import numpy as np
+import pytest
+
+from runtime import NumpyMLP, export_mlp
+
+
+def test_numpy_mlp_matches_keras(tmp_path):
+    keras = pytest.importorskip("keras")
+
+    # Same architecture as codigoia.train_model, with random weights
+    model = keras.Sequential([
+        keras.Input(shape=(10,)),
+        keras.layers.Dense(64, activation='relu'),
+        keras.layers.Dropout(0.2),
+        keras.layers.Dense(32, activation='relu'),
+        keras.layers.Dense(16, activation='relu'),
+        keras.layers.Dense(3, activation='softmax'),
+    ])
+
+    path = os.path.join(tmp_path, 'inference.npz')
+    export_mlp(model, path)
+    predictor = NumpyMLP.load(path)
+
+    X = np.random.default_rng(0).normal(size=(500, 10))
+    expected = model.predict(X, verbose=0)
+    actual = predictor.predict(X, batch_size=128)
+
+    assert actual.shape == expected.shape
+    assert np.allclose(actual, expected, atol=1e-6)
+    assert np.array_equal(actual.argmax(axis=1), expected.argmax(axis=1))
+
+
+if __name__ == "__main__":
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        test_numpy_mlp_matches_keras(tmp)
+    print("NumPy runtime matches Keras.")
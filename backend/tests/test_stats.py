@@ -0,0 +1,85 @@
+import os
+import sqlite3
+
+import pytest
+
+import storage
+from record_table import RecordTable
+
+
+@pytest.fixture(params=['sqlite', 'json'])
+def store(request, tmp_path):
+    if request.param == 'sqlite':
+        store = storage.SQLiteStore(os.path.join(tmp_path, 'records.db'))
+        yield store
+        store.close()
+    else:
+        yield storage.JsonFileStore(os.path.join(tmp_path, 'records.json'))
+
+
+def _scan(store):
+    return storage.RecordStore.stat_counts(store)
+
+
+def test_counts_follow_every_write(store):
+    store.insert_many([
+        {'Nombre': 'Ana', 'Nivel': 'A', 'Prediccion_IA': 'A', 'Campo Estudio': 'Ingeniería'},
+        {'Nombre': 'Luis', 'Nivel': 'B', 'Prediccion_IA': 'A'},
+        {'Nombre': 'Eva', 'Nivel': 'B'},
+    ])
+    counts = store.stat_counts()
+    assert counts['total'] == 3
+    assert counts['fields']['Nivel'] == {'A': 1, 'B': 2}
+    assert counts['fields']['Campo Estudio'] == {'Ingeniería': 1, '': 2}
+    assert counts['confusion'] == {('A', 'A'): 1, ('B', 'A'): 1, ('B', ''): 1}
+
+    store.update(3, {'Prediccion_IA': 'B'})
+    store.update_many({2: {'Prediccion_IA': 'B'}})
+    store.update(1, {'Nombre': 'Ana María'})
+    store.delete(1)
+    store.import_records([{'ID': 2, 'Nombre': 'Luis', 'Nivel': 'C', 'Prediccion_IA': 'B'}])
+    counts = store.stat_counts()
+    assert counts == _scan(store)
+    assert counts['confusion'] == {('B', 'B'): 1, ('C', 'B'): 1}
+    assert counts['fields']['Nivel'] == {'B': 1, 'C': 1}
+    assert RecordTable(store.all()).stat_counts() == counts
+
+
+def test_sqlite_builds_counts_for_existing_tables(tmp_path):
+    path = os.path.join(tmp_path, 'records.db')
+    store = storage.SQLiteStore(path)
+    store.insert_many([{'Nivel': n, 'Prediccion_IA': 'A'} for n in 'AABC'])
+    store.close()
+
+    # A database from before record_stats existed: no table, no triggers
+    conn = sqlite3.connect(path)
+    names = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")]
+    for name in names:
+        conn.execute(f"DROP TRIGGER {name}")
+    conn.execute("DROP TABLE record_stats")
+    conn.commit()
+    conn.close()
+
+    store = storage.SQLiteStore(path)
+    assert store.stat_counts()['fields']['Nivel'] == {'A': 2, 'B': 1, 'C': 1}
+    store.insert({'Nivel': 'C'})
+    assert store.stat_counts() == _scan(store)
+    store.close()
+
+
+def test_stats_endpoint(server):
+    app_module, client = server
+    app_module.store.insert_many([
+        {'Nivel': 'A', 'Prediccion_IA': 'A'},
+        {'Nivel': 'B', 'Prediccion_IA': 'A'},
+        {'Nivel': 'B', 'Prediccion_IA': 'B'},
+        {'Prediccion_IA': 'C'},
+    ])
+    res = client.get('/api/stats')
+
+    assert res.status_code == 200
+    body = res.get_json()
+    assert body['total'] == 4
+    assert body['counts']['Prediccion_IA'] == {'A': 2, 'B': 1, 'C': 1}
+    assert body['confusion'] == {'': {'C': 1}, 'A': {'A': 1}, 'B': {'A': 1, 'B': 1}}
+    assert body['agreement'] == {'matching': 2, 'compared': 3, 'rate': 0.6667}
@@ -0,0 +1,108 @@
+import json
+import os
+
+import pytest
+
+import storage
+
+
+@pytest.fixture(params=['sqlite', 'json'])
+def store(request, tmp_path):
+    if request.param == 'sqlite':
+        return storage.SQLiteStore(os.path.join(tmp_path, 'records.db'))
+    return storage.JsonFileStore(os.path.join(tmp_path, 'records.json'))
+
+
+def test_crud(store):
+    first = store.insert({'Nombre': 'Ana', 'Nivel': 'A'})
+    second = store.insert({'ID': 99, 'Nombre': 'Luis'})  # client IDs are ignored
+    assert (first, second) == (1, 2)
+    assert store.get(second) == {'ID': 2, 'Nombre': 'Luis'}
+
+    assert store.update(first, {'Nivel': 'B', 'ID': 7})
+    assert store.get(first) == {'ID': 1, 'Nombre': 'Ana', 'Nivel': 'B'}
+    assert not store.update(42, {'Nivel': 'C'})
+
+    assert store.delete(first)
+    assert not store.delete(first)
+    assert [r['ID'] for r in store.all()] == [2]
+    assert store.count() == 1
+
+
+def test_import_json(store, tmp_path):
+    legacy = os.path.join(tmp_path, 'legacy.json')
+    with open(legacy, 'w', encoding='utf-8') as f:
+        json.dump([{'ID': 5, 'Nombre': 'Ana'}, {'ID': 3, 'Nombre': 'Luis'}, {'Nombre': 'Sin ID'}], f)
+
+    assert store.import_json(legacy) == 3
+    assert [r['ID'] for r in store.all()] == [3, 5, 6]
+    assert store.insert({'Nombre': 'Nuevo'}) == 7
+
+
+def test_query_pages_filters_and_sorts(store):
+    niveles = ['B', 'A', 'C', 'A', 'B', 'A', None]
+    store.insert_many([{'Nombre': str(i), 'Nivel': n} for i, n in enumerate(niveles)])
+
+    def collect(**kwargs):
+        ids, cursor = [], None
+        while True:
+            page, cursor = store.query(limit=2, cursor=cursor, **kwargs)
+            ids.extend(r['ID'] for r in page)
+            if cursor is None:
+                return ids
+
+    assert collect() == [1, 2, 3, 4, 5, 6, 7]
+    assert collect(descending=True) == [7, 6, 5, 4, 3, 2, 1]
+    assert collect(filters={'Nivel': 'A'}) == [2, 4, 6]
+    assert collect(sort='Nivel') == [7, 2, 4, 6, 1, 5, 3]
+    assert collect(sort='Nivel', descending=True) == [3, 5, 1, 6, 4, 2, 7]
+
+    with pytest.raises(storage.QueryError):
+        store.query(filters={'Nombre': 'x'})
+    with pytest.raises(storage.QueryError):
+        store.query(cursor='not-a-cursor')
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('', [2, 3, 4]),
+    (None, [2, 3, 4]),
+    ('A', [1]),
+    ('None', []),
+])
+def test_missing_and_null_fields_filter_as_empty(store, value, expected):
+    store.insert_many([{'Nivel': 'A'}, {'Nivel': None}, {'Nombre': 'sin nivel'}, {'Nivel': ''}])
+    page, _ = store.query(filters={'Nivel': value})
+    assert [r['ID'] for r in page] == expected
+
+
+def test_iter_records_in_batches(store):
+    ids = store.insert_many([{'Nombre': str(i)} for i in range(5)])
+    store.delete(ids[2])
+    assert [r['ID'] for r in store.iter_records(batch_size=2)] == [1, 2, 4, 5]
+
+
+def test_legacy_json_is_imported_once(tmp_path):
+    json_path = os.path.join(tmp_path, 'legacy.json')
+    sqlite_path = os.path.join(tmp_path, 'records.db')
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump([{'ID': 1, 'Nombre': 'Ana'}, {'ID': 2, 'Nombre': 'Luis'}], f)
+
+    store = storage.open_store('sqlite', json_path, sqlite_path)
+    assert store.count() == 2
+    store.delete(1)
+    store.delete(2)
+    store.close()
+
+    # Every record was deleted: reopening must not bring them back
+    store = storage.open_store('sqlite', json_path, sqlite_path)
+    assert store.count() == 0
+    store.close()
+
+    # A store from before the import flag that already held records is not re-imported either
+    other = os.path.join(tmp_path, 'old.db')
+    old = storage.SQLiteStore(other)
+    old.delete(old.insert({'Nombre': 'Eva'}))
+    old.close()
+    store = storage.open_store('sqlite', json_path, other)
+    assert store.count() == 0 and store.get_meta(storage.LEGACY_IMPORT_KEY)
+    store.close()
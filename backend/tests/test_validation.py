@@ -0,0 +1,27 @@
+import pytest
+
+from validation import PREDICTION_SIGNATURE_FIELD, ValidationError, validate_record
+
+
+def test_server_fields_are_dropped():
+    record = validate_record({
+        'ID': 7, 'Nombre': 'Ana', 'Edad': '31', 'Prediccion_IA': 'A', PREDICTION_SIGNATURE_FIELD: 'x', 'Nivel': None,
+    })
+    assert record == {'Nombre': 'Ana', 'Edad': '31', 'Nivel': None}
+
+
+@pytest.mark.parametrize('data, field', [
+    ({'Nombre': 'Ana', 'Color': 'azul'}, 'Color'),
+    ({'Nombre': 'Ana', 'nombre': 'ana'}, 'nombre'),
+    ({'Nombre': 'Ana', 'Edad': 'treinta'}, 'Edad'),
+    ({'Nombre': ['Ana']}, 'Nombre'),
+])
+def test_invalid_fields_are_rejected(data, field):
+    with pytest.raises(ValidationError, match=field):
+        validate_record(data)
+
+
+@pytest.mark.parametrize('data', [None, [], 'Ana', {}, {'ID': 3, 'Prediccion_IA': 'A'}])
+def test_non_records_are_rejected(data):
+    with pytest.raises(ValueError):
+        validate_record(data)
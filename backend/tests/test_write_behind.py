@@ -0,0 +1,153 @@
+import multiprocessing
+import os
+import threading
+
+import pytest
+
+import storage
+from write_behind import WriteBehindStore, read_log
+
+
+@pytest.fixture(params=['sqlite', 'json'])
+def make_store(request, tmp_path):
+    opened = []
+
+    def make():
+        if request.param == 'sqlite':
+            store = storage.SQLiteStore(str(tmp_path / 'records.db'))
+        else:
+            store = storage.JsonFileStore(str(tmp_path / 'records.json'))
+        opened.append(store)
+        return store
+
+    yield make
+    for store in opened:
+        if isinstance(store, storage.SQLiteStore):
+            store.close()
+
+
+class CountingStore:
+    """Records how many group commits reach the wrapped store."""
+
+    def __init__(self, store):
+        self.store = store
+        self.commits = []
+
+    def __getattr__(self, name):
+        return getattr(self.store, name)
+
+    def insert_with_ids(self, records):
+        self.commits.append(len(records))
+        return self.store.insert_with_ids(records)
+
+
+def test_inserts_are_acknowledged_then_group_committed(make_store, tmp_path):
+    inner = CountingStore(make_store())
+    inner.store.insert({'Nombre': 'Antes'})
+    store = WriteBehindStore(inner, wal_dir=str(tmp_path / 'wal'), flush_interval=60, batch_size=10_000)
+
+    ids = [store.insert({'Nombre': f'N{i}'}) for i in range(50)]
+    assert ids == list(range(2, 52))
+    assert inner.commits == []
+    assert store.pending_count() == 50
+    logs = [name for name in os.listdir(tmp_path / 'wal') if name.endswith('.log')]
+    assert len(logs) == 1 and len(read_log(str(tmp_path / 'wal' / logs[0]))) == 50
+
+    # Reads through the wrapper see the buffered records (one group commit)
+    assert store.get(30)['Nombre'] == 'N28'
+    assert inner.commits == [50]
+    assert store.count() == 51
+    assert [name for name in os.listdir(tmp_path / 'wal') if name.endswith('.log')] == []
+
+    # IDs keep going after the store's own inserts and are never reused
+    assert inner.store.insert({'Nombre': 'Directo'}) > 51
+    store.close()
+
+
+def test_batch_size_wakes_the_flusher(make_store, tmp_path):
+    inner = CountingStore(make_store())
+    store = WriteBehindStore(inner, wal_dir=str(tmp_path / 'wal'), flush_interval=60, batch_size=20)
+    done = threading.Event()
+    original = inner.insert_with_ids
+
+    def commit(records):
+        result = original(records)
+        done.set()
+        return result
+
+    inner.insert_with_ids = commit
+    store.insert_many([{'Nombre': str(i)} for i in range(25)])
+    assert done.wait(5)
+    assert inner.store.count() == 25
+    store.close()
+
+
+def test_concurrent_inserts_get_unique_ids(make_store, tmp_path):
+    store = WriteBehindStore(make_store(), wal_dir=str(tmp_path / 'wal'), flush_interval=0.01, batch_size=64)
+    ids = []
+    lock = threading.Lock()
+
+    def register(worker):
+        for i in range(40):
+            new_id = store.insert({'Nombre': f'{worker}-{i}'})
+            with lock:
+                ids.append(new_id)
+
+    threads = [threading.Thread(target=register, args=(w,)) for w in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(set(ids)) == 320
+    records = store.all()
+    assert sorted(r['ID'] for r in records) == sorted(ids)
+    store.close()
+
+
+def _crashing_worker(path, backend, wal_dir):
+    inner = storage.SQLiteStore(path) if backend == 'sqlite' else storage.JsonFileStore(path)
+    store = WriteBehindStore(inner, wal_dir=wal_dir, flush_interval=60, batch_size=10_000)
+    store.insert_many([{'Nombre': f'Crash {i}'} for i in range(30)])
+    # Torn append: the process dies mid-write
+    store._file.write('{"ID": 999, "Nombre": "Torn')
+    store._file.flush()
+    os._exit(0)
+
+
+def test_logs_of_dead_processes_are_replayed(make_store, tmp_path):
+    inner = make_store()
+    backend = 'sqlite' if isinstance(inner, storage.SQLiteStore) else 'json'
+    wal_dir = str(tmp_path / 'wal')
+    if isinstance(inner, storage.SQLiteStore):
+        inner.close()  # no SQLite connection across fork
+
+    process = multiprocessing.get_context('fork').Process(
+        target=_crashing_worker, args=(inner.path, backend, wal_dir))
+    process.start()
+    process.join()
+    assert inner.count() == 0
+
+    store = WriteBehindStore(inner, wal_dir=wal_dir)
+    assert [r['Nombre'] for r in inner.all()] == [f'Crash {i}' for i in range(30)]
+    assert store.replay() == 0
+    assert [name for name in os.listdir(wal_dir) if name.endswith('.log')] == []
+    store.close()
+
+
+def test_group_commits_are_fsynced_before_the_log_is_dropped(tmp_path):
+    store = storage.SQLiteStore(str(tmp_path / 'records.db'))
+    conn = store._conn()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    buffered = WriteBehindStore(store, wal_dir=str(tmp_path / 'wal'), flush_interval=60)
+    buffered.insert_many([{'Nombre': 'Ana'}, {'Nombre': 'Luis'}])
+    statements.clear()
+    assert buffered.flush() == 2
+
+    commit = statements.index('COMMIT')
+    assert 'PRAGMA synchronous=FULL' in statements[:commit]
+    # Other writes keep the cheaper setting
+    assert conn.execute('PRAGMA synchronous').fetchone()[0] == 1
+    assert not [name for name in os.listdir(tmp_path / 'wal') if name.endswith('.log')]
+    buffered.close()
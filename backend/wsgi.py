@@ -0,0 +1,6 @@
+# Production entry point: gunicorn -c gunicorn.conf.py wsgi:app
+# Any WSGI server can load `wsgi:app`; with gunicorn's preload_app the model
+# is loaded once in the master and shared by the forked workers.
+from app import create_app
+
+app = create_app()